@@ -1,74 +1,83 @@
 import time
 import os
 
+GEARS = {
+    0: [
+        "####",
+        "#  #",
+        "#  #",
+        "#  #",
+        "####"
+    ],
+    1: [
+        "   #",
+        "  ##",
+        "   #",
+        "   #",
+        "   #"
+    ],
+    2: [
+        "####",
+        "   #",
+        "####",
+        "#   ",
+        "####"
+    ],
+    3: [
+        "####",
+        "   #",
+        "####",
+        "   #",
+        "####"
+    ],
+    4: [
+        "#  #",
+        "#  #",
+        "####",
+        "   #",
+        "   #"
+    ],
+    5: [
+        "####",
+        "#   ",
+        "####",
+        "   #",
+        "####"
+    ],
+    6: [
+        "####",
+        "#   ",
+        "####",
+        "#  #",
+        "####"
+    ],
+    7: [
+        "####",
+        "   #",
+        "  ##",
+        "   #",
+        "   #"
+    ],
+    8: [
+        "####",
+        "#  #",
+        "####",
+        "#  #",
+        "####"
+    ]
+}
+
+
+def validate_gear(n):
+    if not isinstance(n, int):
+        raise ValueError("input gear should be integer!!")
+    if n > 8 or n < 0:
+        raise ValueError("input gear should be between 0 and 8!!!")
+    return n
+
+
 def display_gear(n):
-    gears = {
-        0: [
-            "####",
-            "#  #",
-            "#  #",
-            "#  #",
-            "####"
-        ],
-        1: [
-            "   #",
-            "  ##",
-            "   #",
-            "   #",
-            "   #"
-        ],
-        2: [
-            "####",
-            "   #",
-            "####",
-            "#   ",
-            "####"
-        ],
-        3: [
-            "####",
-            "   #",
-            "####",
-            "   #",
-            "####"
-        ],
-        4: [
-            "#  #",
-            "#  #",
-            "####",
-            "   #",
-            "   #"
-        ],
-        5: [
-            "####",
-            "#   ",
-            "####",
-            "   #",
-            "####"
-        ],
-        6: [
-            "####",
-            "#   ",
-            "####",
-            "#  #",
-            "####"
-        ],
-        7: [
-            "####",
-            "   #",
-            "  ##",
-            "   #",
-            "   #"
-        ],
-        8: [
-            "####",
-            "#  #",
-            "####",
-            "#  #",
-            "####"
-        ]
-    }
-    
-    pattern = gears[n]
+    pattern = GEARS[n]
     for str in pattern:
         print(str)
 
@@ -83,12 +92,12 @@ def clear_screen():
     os.system('cls' if os.name == 'nt' else 'clear')
 
 
-def shift(g1, g2):
+def shift(g1, g2, delay=0.5):
     print(f"shifting from {g1} to {g2}")
     
     display_gear(g1)
 
-    time.sleep(0.5)
+    time.sleep(delay)
 
     clear_screen()
 
@@ -97,19 +106,13 @@ def shift(g1, g2):
 
 if __name__ == "__main__":
     print("Enter gear: ")
-    n = int(input())
-    if not isinstance(n, int):
-        raise ValueError("input gear should be integer!!")
-    elif n > 8 or n < 0:
-        raise Exception("input gear should be between 0 and 8!!!")  
-    else:
-        display_gear(n)
-
-        print("Enter 1 if you wanna select a gear to shift otherwise 0: ")
-        want = int(input())
-
-        if want:
-            print("Enter a gear to shift to: ")
-            n2 = int(input())
-            shift(n, n2)
-        
+    n = validate_gear(int(input()))
+    display_gear(n)
+
+    print("Enter 1 if you wanna select a gear to shift otherwise 0: ")
+    want = int(input())
+
+    if want:
+        print("Enter a gear to shift to: ")
+        n2 = validate_gear(int(input()))
+        shift(n, n2)
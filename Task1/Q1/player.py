@@ -0,0 +1,135 @@
+"""
+    Replays a gearbox trace, a list of (seconds, gear) shifts such as a lap of
+    telemetry, on the gear display at a fixed frame rate.
+
+    Frame k is due at start + k / fps. The player sleeps until then, draws the
+    gear the trace has at that moment and moves on; when it falls behind it
+    jumps to the frame that is due now and counts the ones in between as
+    dropped, so playback never drifts from the trace's clock.
+"""
+from collections import namedtuple
+import bisect
+import csv
+import os
+import sys
+import time
+
+from main import validate_gear
+from renderer import GearRenderer
+
+
+PlaybackReport = namedtuple("PlaybackReport", [
+    "frames", "dropped", "seconds", "fps", "jitter_mean_ms", "jitter_p95_ms", "jitter_max_ms"])
+
+
+def parse_trace(rows):
+    """
+        Checks a trace of (seconds, gear) pairs and returns it as two lists.
+        Fails on the first bad row, before anything is played
+    """
+    times, gears = [], []
+    for i, (t, gear) in enumerate(rows):
+        t = float(t)
+        if times and t < times[-1]:
+            raise ValueError(f"trace row {i}: time {t} goes back before {times[-1]}")
+        try:
+            gears.append(validate_gear(gear))
+        except ValueError as e:
+            raise ValueError(f"trace row {i}: {e}") from None
+        times.append(t)
+    if not times:
+        raise ValueError("trace is empty")
+    return times, gears
+
+
+def read_trace(path):
+    """CSV with a seconds,gear row per shift (a header row is skipped)"""
+    with open(path, newline="") as f:
+        rows = [row for row in csv.reader(f) if row]
+    if rows and not rows[0][0].replace(".", "", 1).isdigit():
+        rows = rows[1:]
+    return parse_trace((t, int(gear)) for t, gear in rows)
+
+
+class GearPlayer:
+    def __init__(self, renderer=None, fps=30, clock=time.perf_counter, sleep=time.sleep):
+        self.renderer = renderer or GearRenderer()
+        self.fps = fps
+        self._clock = clock
+        self._sleep = sleep
+
+    def play(self, trace, speed=1.0):
+        """
+            Plays a trace ((seconds, gear) pairs), speed > 1 plays it faster.
+            Returns a PlaybackReport; jitter is how late each frame was drawn
+        """
+        times, gears = parse_trace(trace)
+        period = 1.0 / self.fps
+        n_frames = int((times[-1] - times[0]) / speed * self.fps) + 1
+        clock, sleep = self._clock, self._sleep
+
+        lateness = []
+        dropped = 0
+        frame = 0
+        start = clock()
+        while frame < n_frames:
+            due = start + frame * period
+            now = clock()
+            if now < due:
+                sleep(due - now)
+                now = clock()
+            elif now - due >= period:
+                # behind schedule: skip to the frame that is due now
+                behind = min(int((now - start) / period), n_frames - 1) - frame
+                dropped += behind
+                frame += behind
+                due = start + frame * period
+
+            trace_time = times[0] + frame * period * speed
+            self.renderer.render(gears[bisect.bisect_right(times, trace_time) - 1])
+            lateness.append(now - due)
+            frame += 1
+
+        seconds = clock() - start
+        lateness.sort()
+        return PlaybackReport(
+            frames=len(lateness),
+            dropped=dropped,
+            seconds=seconds,
+            fps=len(lateness) / seconds if seconds else 0.0,
+            jitter_mean_ms=sum(lateness) / len(lateness) * 1000,
+            jitter_p95_ms=lateness[min(len(lateness) - 1, int(0.95 * len(lateness)))] * 1000,
+            jitter_max_ms=lateness[-1] * 1000,
+        )
+
+
+def synthetic_lap(n_shifts=2000, seed=7):
+    """Up and down shifts every 0.05 to 0.4 s, roughly what a lap of telemetry looks like"""
+    import random
+    rng = random.Random(seed)
+    t, gear, trace = 0.0, 1, []
+    for _ in range(n_shifts):
+        trace.append((round(t, 3), gear))
+        gear = min(8, max(1, gear + rng.choice((-2, -1, 1, 1, 1))))
+        t += rng.uniform(0.05, 0.4)
+    return trace
+
+
+def print_report(label, report):
+    print(f"{label}: {report.frames} frames in {report.seconds:.2f}s, {report.fps:.1f} fps, "
+          f"{report.dropped} dropped, jitter mean {report.jitter_mean_ms:.2f} ms, "
+          f"p95 {report.jitter_p95_ms:.2f} ms, max {report.jitter_max_ms:.2f} ms")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        trace = read_trace(sys.argv[1])
+        with GearRenderer() as renderer:
+            report = GearPlayer(renderer).play(list(zip(*trace)))
+        print_report(sys.argv[1], report)
+    else:
+        lap = synthetic_lap()
+        print(f"Synthetic lap: {len(lap)} shifts over {lap[-1][0]:.0f}s, played 20x at 60 fps")
+        with open(os.devnull, "w") as null:
+            report = GearPlayer(GearRenderer(out=null), fps=60).play(lap, speed=20)
+        print_report("Playback", report)
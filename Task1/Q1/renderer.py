@@ -0,0 +1,142 @@
+"""
+    Dash readout renderer for the gear glyphs: the screen is cleared once with
+    ANSI codes (no 'clear' subprocess) and every frame only rewrites the rows
+    that differ from the previous one, by moving the cursor to them. A frame
+    can hold several gauges (gear, speed, ...), each any number of digits, and
+    is sent to the terminal in a single write.
+"""
+import os
+import sys
+import time
+
+from main import GEARS, shift
+
+
+# gears stop at 8, numeric gauges (speed, rpm) need a 9 as well
+DIGITS = dict(GEARS)
+DIGITS[9] = [
+    "####",
+    "#  #",
+    "####",
+    "   #",
+    "####"
+]
+GLYPH_HEIGHT = len(DIGITS[0])
+
+CLEAR = "\x1b[2J"
+HIDE_CURSOR = "\x1b[?25l"
+SHOW_CURSOR = "\x1b[?25h"
+CLEAR_LINE_END = "\x1b[K"
+
+
+def move_to(row, col=1):
+    return f"\x1b[{row};{col}H"
+
+
+class GearRenderer:
+    def __init__(self, out=None, top=1, left=1, digit_gap=1, gauge_gap=4):
+        self.out = out or sys.stdout
+        self.top = top
+        self.left = left
+        self.digit_gap = " " * digit_gap
+        self.gauge_gap = " " * gauge_gap
+        self._rows = None           # rows on screen, None until the first frame
+        self._gauge_cache = {}      # digits -> rows of that gauge
+        self.rows_written = 0
+
+    def _gauge_rows(self, value):
+        digits = str(value)
+        rows = self._gauge_cache.get(digits)
+        if rows is None:
+            if not digits.isdigit():
+                raise ValueError(f"gauge values should be non-negative integers, got {value!r}")
+            glyphs = [DIGITS[int(d)] for d in digits]
+            rows = tuple(self.digit_gap.join(glyph[i] for glyph in glyphs) for i in range(GLYPH_HEIGHT))
+            self._gauge_cache[digits] = rows
+        return rows
+
+    def frame_rows(self, *values):
+        gauges = [self._gauge_rows(value) for value in values]
+        return [self.gauge_gap.join(gauge[i] for gauge in gauges) for i in range(GLYPH_HEIGHT)]
+
+    def render(self, *values):
+        """Draw one frame with a gauge per value, returns how many rows were rewritten"""
+        rows = self.frame_rows(*values)
+        previous = self._rows or [None] * GLYPH_HEIGHT
+        parts = [] if self._rows is not None else [HIDE_CURSOR + CLEAR]
+        changed = 0
+        for i, row in enumerate(rows):
+            if row != previous[i]:
+                parts.append(move_to(self.top + i, self.left) + row + CLEAR_LINE_END)
+                changed += 1
+        self._rows = rows
+
+        if parts:
+            self.out.write("".join(parts))
+            self.out.flush()
+        self.rows_written += changed
+        return changed
+
+    def close(self):
+        """Puts the cursor back under the readout"""
+        self.out.write(move_to(self.top + GLYPH_HEIGHT + 1) + SHOW_CURSOR)
+        self.out.flush()
+        self._rows = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def benchmark(n_frames=20000, n_shifts=200):
+    """Frames/sec of shift() (without its 0.5s pause) vs the renderer, output thrown away"""
+    sequence = [(i * 3) % 9 for i in range(max(n_frames, n_shifts) + 1)]
+
+    # shift prints with print() and clears the screen through a subprocess writing to fd 1
+    saved = os.dup(1)
+    null_fd = os.open(os.devnull, os.O_WRONLY)
+    saved_stdout = sys.stdout
+    try:
+        os.dup2(null_fd, 1)
+        sys.stdout = open(os.devnull, "w")
+        start = time.perf_counter()
+        for i in range(n_shifts):
+            shift(sequence[i], sequence[i + 1], delay=0)
+        shift_time = time.perf_counter() - start
+
+        renderer = GearRenderer(out=sys.stdout)
+        start = time.perf_counter()
+        for i in range(n_frames):
+            renderer.render(sequence[i])
+        render_time = time.perf_counter() - start
+
+        multi = GearRenderer(out=sys.stdout)
+        start = time.perf_counter()
+        for i in range(n_frames):
+            multi.render(sequence[i], 250 + i % 90, 11000 + i % 500)
+        multi_time = time.perf_counter() - start
+        sys.stdout.close()
+    finally:
+        sys.stdout = saved_stdout
+        os.dup2(saved, 1)
+        os.close(saved)
+        os.close(null_fd)
+
+    print(f"{'Path':<34} {'Frames':>7} {'Frames/sec':>11}")
+    print(f"{'shift (clear subprocess + print)':<34} {n_shifts:>7} {n_shifts / shift_time:>11.0f}")
+    print(f"{'GearRenderer, gear':<34} {n_frames:>7} {n_frames / render_time:>11.0f}")
+    print(f"{'GearRenderer, gear+speed+rpm':<34} {n_frames:>7} {n_frames / multi_time:>11.0f}")
+    print(f"Rows rewritten per frame: {renderer.rows_written / n_frames:.1f} of {GLYPH_HEIGHT}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "demo":
+        with GearRenderer() as renderer:
+            for gear in [1, 2, 3, 4, 5, 6, 7, 8, 7, 6, 5, 4, 3, 2, 1, 0]:
+                renderer.render(gear, 40 * gear)
+                time.sleep(0.15)
+    else:
+        benchmark()
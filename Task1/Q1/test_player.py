@@ -0,0 +1,77 @@
+import pytest
+
+from player import GearPlayer, parse_trace, read_trace, synthetic_lap
+
+
+class FakeClock:
+    """Clock and sleep for the player: sleeping moves time, rendering can cost time too"""
+    def __init__(self, render_cost=0.0):
+        self.now = 0.0
+        self.render_cost = render_cost
+        self.drawn = []         # (time, gear) of every frame
+
+    def clock(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+    def render(self, gear):
+        self.drawn.append((self.now, gear))
+        self.now += self.render_cost
+
+
+def player(clock, fps=10):
+    return GearPlayer(renderer=type("R", (), {"render": staticmethod(clock.render)})(), fps=fps,
+                      clock=clock.clock, sleep=clock.sleep)
+
+
+TRACE = [(0.0, 1), (0.25, 2), (1.0, 3), (1.5, 2)]
+
+
+def test_frames_follow_the_trace_on_time():
+    clock = FakeClock()
+    report = player(clock).play(TRACE)
+    assert report.frames == 16 and report.dropped == 0 and report.jitter_max_ms == 0
+    assert [gear for _, gear in clock.drawn] == [1, 1, 1, 2, 2, 2, 2, 2, 2, 2, 3, 3, 3, 3, 3, 2]
+    assert [t for t, _ in clock.drawn] == pytest.approx([k / 10 for k in range(16)])
+
+
+def test_speed_plays_the_trace_faster():
+    clock = FakeClock()
+    report = player(clock).play(TRACE, speed=2)
+    assert report.frames == 8
+    assert [gear for _, gear in clock.drawn] == [1, 1, 2, 2, 2, 3, 3, 3]
+
+
+def test_slow_frames_are_dropped_without_drifting():
+    clock = FakeClock(render_cost=0.25)     # every frame takes two and a half periods
+    report = player(clock).play(TRACE)
+    assert report.frames + report.dropped == 16 and report.dropped > 0
+    # every frame drawn is the one due at that moment, never one from the past
+    assert report.jitter_max_ms < 100
+    assert clock.drawn[-1][1] == 2 and clock.now <= 1.5 + 0.1 + 0.25 + 1e-9
+
+
+def test_long_lap_keeps_its_frame_count():
+    clock = FakeClock()
+    lap = synthetic_lap(200)
+    report = player(clock, fps=60).play(lap, speed=10)
+    assert report.frames == int(lap[-1][0] / 10 * 60) + 1 and report.dropped == 0
+
+
+@pytest.mark.parametrize("rows, message", [
+    ([], "empty"),
+    ([(0, 1), (1, 9)], "row 1"),
+    ([(0, 1), (1, "2")], "row 1"),
+    ([(1, 1), (0.5, 2)], "goes back"),
+])
+def test_bad_traces_fail_before_playing(rows, message):
+    with pytest.raises(ValueError, match=message):
+        parse_trace(rows)
+
+
+def test_read_trace_skips_the_header(tmp_path):
+    path = tmp_path / "lap.csv"
+    path.write_text("seconds,gear\n0,1\n0.5,2\n\n1.25,3\n")
+    assert read_trace(path) == ([0.0, 0.5, 1.25], [1, 2, 3])
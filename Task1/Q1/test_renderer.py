@@ -0,0 +1,77 @@
+import io
+import random
+import re
+
+import pytest
+
+from renderer import GLYPH_HEIGHT, SHOW_CURSOR, GearRenderer
+
+
+class Screen:
+    """Just enough of a terminal for the renderer's escape codes"""
+    def __init__(self):
+        self.cells = {}
+        self.row = self.col = 1
+        self.cleared = 0
+
+    def feed(self, text):
+        for token in re.findall(r"\x1b\[[0-9;?]*[A-Za-z]|[^\x1b]", text):
+            if token == "\x1b[2J":
+                self.cells.clear()
+                self.cleared += 1
+            elif token == "\x1b[K":
+                for key in [key for key in self.cells if key[0] == self.row and key[1] >= self.col]:
+                    del self.cells[key]
+            elif token.endswith("H"):
+                self.row, self.col = map(int, token[2:-1].split(";"))
+            elif not token.startswith("\x1b"):
+                self.cells[(self.row, self.col)] = token
+                self.col += 1
+
+    def rows(self, top, left, n):
+        width = max((col for _, col in self.cells), default=0)
+        return ["".join(self.cells.get((row, col), " ") for col in range(left, width + 1)).rstrip()
+                for row in range(top, top + n)]
+
+
+def drawn(renderer, out, screen):
+    screen.feed(out.getvalue())
+    out.seek(0)
+    out.truncate()
+    return screen.rows(renderer.top, renderer.left, GLYPH_HEIGHT)
+
+
+@pytest.mark.parametrize("n_gauges", [1, 3])
+def test_screen_always_shows_the_last_frame(n_gauges):
+    out, screen, rng = io.StringIO(), Screen(), random.Random(0)
+    renderer = GearRenderer(out, top=3, left=5)
+    for _ in range(200):
+        values = [rng.choice([rng.randint(0, 8), rng.randint(0, 400)]) for _ in range(n_gauges)]
+        renderer.render(*values)
+        assert drawn(renderer, out, screen) == [row.rstrip() for row in renderer.frame_rows(*values)]
+    assert screen.cleared == 1
+
+
+def test_only_changed_rows_are_written():
+    out = io.StringIO()
+    renderer = GearRenderer(out)
+    assert renderer.render(8) == GLYPH_HEIGHT
+    out.truncate(0)
+    assert renderer.render(8) == 0 and out.getvalue() == ""
+    changed = sum(a != b for a, b in zip(renderer.frame_rows(8), renderer.frame_rows(0)))
+    assert renderer.render(0) == changed < GLYPH_HEIGHT
+    assert renderer.rows_written == GLYPH_HEIGHT + changed
+
+
+def test_close_restores_the_cursor_and_starts_over():
+    out = io.StringIO()
+    with GearRenderer(out) as renderer:
+        renderer.render(3)
+    assert out.getvalue().endswith(SHOW_CURSOR)
+    assert renderer.render(3) == GLYPH_HEIGHT
+
+
+@pytest.mark.parametrize("value", [-1, 2.5, "x"])
+def test_gauges_take_non_negative_integers(value):
+    with pytest.raises(ValueError):
+        GearRenderer(io.StringIO()).render(value)
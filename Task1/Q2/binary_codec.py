@@ -0,0 +1,253 @@
+"""
+    Binary framing for Codec: every command is a varint length (7 bits per
+    byte, LEB128) followed by its UTF-8 bytes, with an optional offsets table
+    at the end so element k can be read without decoding the ones before it.
+
+    Layout:
+        b"CDB1" | flags (1 byte, bit 0 = indexed)
+        frames
+        [indexed only] n + 1 uint32 frame start offsets (the last one is the
+        end of the frames), then a uint32 count and the uint32 offset of the table
+"""
+from array import array
+from itertools import islice
+import operator
+import struct
+import sys
+import time
+
+
+MAGIC = b"CDB1"
+INDEXED = 0x01
+HEADER_SIZE = len(MAGIC) + 1
+_TRAILER = struct.Struct("<II")
+_MAX_OFFSET = 0xFFFFFFFF
+
+
+def encode_varint(n):
+    if n < 0x80:
+        return bytes((n,))
+    out = bytearray()
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+    return bytes(out)
+
+
+def decode_varint(buf, pos):
+    """Returns (value, position after the varint)"""
+    byte = buf[pos]
+    if byte < 0x80:
+        return byte, pos + 1
+    value, shift = 0, 0
+    while True:
+        if pos >= len(buf):
+            raise ValueError("truncated varint")
+        byte = buf[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def _uint32_array(values):
+    table = array("I", values)
+    if table.itemsize != 4:
+        table = array("L", values)
+    if sys.byteorder == "big":
+        table.byteswap()
+    return table
+
+
+class BinaryCodec:
+    def __init__(self, index=True):
+        self.index = index
+
+    def encode(self, commands):
+        parts = [MAGIC, bytes((INDEXED if self.index else 0,))]
+        offsets = []
+        pos = HEADER_SIZE
+        for command in commands:
+            data = command.encode() if isinstance(command, str) else command
+            header = encode_varint(len(data))
+            offsets.append(pos)
+            parts.append(header)
+            parts.append(data)
+            pos += len(header) + len(data)
+
+        if self.index:
+            offsets.append(pos)
+            if pos > _MAX_OFFSET:
+                raise ValueError("indexed messages are limited to 4 GiB")
+            parts.append(_uint32_array(offsets).tobytes())
+            parts.append(_TRAILER.pack(len(offsets) - 1, pos))
+        return b"".join(parts)
+
+    def decode(self, data):
+        return BinaryReader(data).decode_all()
+
+    def reader(self, data, validate=True):
+        return BinaryReader(data, validate)
+
+
+class BinaryReader:
+    """
+        Random access over an encoded message. Indexed messages use the stored
+        offsets; plain ones are scanned once, the first time an element is asked for.
+        reader[k] and reader[i:j] return str, view(k) a zero-copy memoryview.
+        The offsets table is checked when opening (a linear pass, but in C);
+        validate=False skips that for messages this program wrote itself
+    """
+    def __init__(self, data, validate=True):
+        self._data = memoryview(data).cast("B") if not isinstance(data, memoryview) else data
+        if bytes(self._data[:len(MAGIC)]) != MAGIC or len(self._data) < HEADER_SIZE:
+            raise ValueError("not a binary Codec message")
+        self.indexed = bool(self._data[len(MAGIC)] & INDEXED)
+        self._offsets = None
+        self._end = len(self._data)
+
+        if self.indexed:
+            if len(self._data) < HEADER_SIZE + _TRAILER.size:
+                raise ValueError("indexed message is missing its trailer")
+            count, self._end = _TRAILER.unpack_from(self._data, len(self._data) - _TRAILER.size)
+            if not HEADER_SIZE <= self._end <= len(self._data) - _TRAILER.size:
+                raise ValueError(f"offsets table position {self._end} is outside the message")
+            table = self._data[self._end:len(self._data) - _TRAILER.size]
+            if len(table) != 4 * (count + 1):
+                raise ValueError("offsets table doesn't match the element count")
+            offsets = array("I" if array("I").itemsize == 4 else "L")
+            offsets.frombytes(table)
+            if sys.byteorder == "big":
+                offsets.byteswap()
+            if validate:
+                self._check_offsets(offsets)
+            self._offsets = offsets
+
+    def _check_offsets(self, offsets):
+        """The table has to start at the first frame, end at the table and go up: every frame is at least a byte"""
+        if offsets[0] != HEADER_SIZE:
+            raise ValueError(f"offsets table starts at {offsets[0]}, frames start at {HEADER_SIZE}")
+        if offsets[-1] != self._end:
+            raise ValueError(f"offsets table ends at {offsets[-1]}, frames end at {self._end}")
+        if not all(map(operator.lt, offsets, islice(offsets, 1, None))):
+            k = next(k for k in range(len(offsets) - 1) if offsets[k] >= offsets[k + 1])
+            raise ValueError(f"offsets table isn't increasing at element {k}: "
+                             f"{offsets[k]} then {offsets[k + 1]}")
+
+    def _scan(self):
+        data, end = self._data, self._end
+        offsets = array("Q")
+        pos = HEADER_SIZE
+        while pos < end:
+            offsets.append(pos)
+            length, start = decode_varint(data, pos)
+            pos = start + length
+        if pos != end:
+            raise ValueError("last frame runs past the end of the message")
+        offsets.append(pos)
+        self._offsets = offsets
+
+    def __len__(self):
+        if self._offsets is None:
+            self._scan()
+        return len(self._offsets) - 1
+
+    def view(self, k):
+        if self._offsets is None:
+            self._scan()
+        n = len(self._offsets) - 1
+        if k < 0:
+            k += n
+        if not 0 <= k < n:
+            raise IndexError("element index out of range")
+        pos = self._offsets[k]
+        byte = self._data[pos]
+        if byte < 0x80:
+            return self._data[pos + 1:pos + 1 + byte]
+        length, start = decode_varint(self._data, pos)
+        return self._data[start:start + length]
+
+    def __getitem__(self, k):
+        if isinstance(k, slice):
+            return [str(self.view(i), "utf-8") for i in range(*k.indices(len(self)))]
+        return str(self.view(k), "utf-8")
+
+    def decode_all(self):
+        """Every element, in one pass over the offsets (or over the frames when there are none yet)"""
+        if self._offsets is None:
+            return self._decode_frames()
+        data, offsets = self._data, self._offsets
+        out = []
+        append = out.append
+        for k in range(len(offsets) - 1):
+            pos = offsets[k]
+            byte = data[pos]
+            if byte < 0x80:
+                append(str(data[pos + 1:pos + 1 + byte], "utf-8"))
+            else:
+                length, start = decode_varint(data, pos)
+                append(str(data[start:start + length], "utf-8"))
+        return out
+
+    def _decode_frames(self):
+        data, end = self._data, self._end
+        out = []
+        append = out.append
+        pos = HEADER_SIZE
+        while pos < end:
+            byte = data[pos]
+            if byte < 0x80:
+                length, pos = byte, pos + 1
+            else:
+                length, pos = decode_varint(data, pos)
+            append(str(data[pos:pos + length], "utf-8"))
+            pos += length
+        if pos != end:
+            raise ValueError("last frame runs past the end of the message")
+        return out
+
+
+def benchmark(n_commands=50000, lookups=1000):
+    """Text Codec vs the binary one: bulk decode MB/s and reading single elements"""
+    import random
+    from main import Codec
+
+    commands = ["Push", "Box,box", "Overtake", "", "F1: white", "Copy, understood. Box this lap", "Pérez P2"]
+    commands = [commands[i % len(commands)] + str(i) for i in range(n_commands)]
+    text, binary, plain = Codec(), BinaryCodec(), BinaryCodec(index=False)
+    picks = [random.randrange(n_commands) for _ in range(lookups)]
+
+    rows = []
+    for label, codec in (("text", text), ("binary", plain), ("binary+index", binary)):
+        encoded = codec.encode(commands)
+        start = time.perf_counter()
+        assert codec.decode(encoded) == commands
+        decode_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        if codec is text:
+            # no random access: element k means decoding up to it
+            open_time = 0.0
+            got = [codec.decode(encoded)[k] for k in picks[:20]]
+            per_lookup = (time.perf_counter() - start) / 20
+        else:
+            reader = BinaryReader(encoded)
+            open_time = time.perf_counter() - start
+            start = time.perf_counter()
+            got = [reader[k] for k in picks]
+            per_lookup = (time.perf_counter() - start) / lookups
+        assert got == [commands[k] for k in picks[:len(got)]]
+        rows.append((label, len(encoded), decode_time, open_time, per_lookup))
+
+    print(f"{n_commands} commands")
+    print(f"{'Format':<14} {'Bytes':>9} {'Decode MB/s':>12} {'Open (us)':>10} {'Element k (us)':>15}")
+    for label, size, decode_time, open_time, per_lookup in rows:
+        print(f"{label:<14} {size:>9} {size / 1e6 / decode_time:>12.1f} {open_time * 1e6:>10.1f} "
+              f"{per_lookup * 1e6:>15.1f}")
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    benchmark(n)
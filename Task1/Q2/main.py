@@ -1,3 +1,8 @@
+import binary_codec
+import safe_codec
+import stream_codec
+
+
 class Codec:
     def encode(self, commands):
         encoded = []
@@ -18,6 +23,26 @@ class Codec:
             decode.append(encoded[l:r])
             i = r
         return decode
+
+    def decode_safe(self, encoded, max_frame_size=1 << 20, on_error="raise"):
+        """decode for untrusted input: frame size cap plus raise/skip/resync on bad frames (see safe_codec)"""
+        return safe_codec.SafeDecoder(max_frame_size, on_error).decode(encoded)
+
+    def encode_iter(self, commands):
+        """Streaming encode to bytes, lengths count UTF-8 bytes (see stream_codec)"""
+        return stream_codec.encode_iter(commands)
+
+    def decode_iter(self, chunks):
+        """Streaming decode of byte chunks, yields every frame as a memoryview"""
+        return stream_codec.decode_iter(chunks)
+
+    def encode_binary(self, commands, index=True):
+        """Varint framed bytes, with an offsets table for random access when index is set"""
+        return binary_codec.BinaryCodec(index).encode(commands)
+
+    def decode_binary(self, data):
+        """BinaryReader over the message: len(), reader[k], reader[i:j], decode_all()"""
+        return binary_codec.BinaryReader(data)
     
 
 if __name__ == "__main__":
@@ -32,4 +57,12 @@ if __name__ == "__main__":
     if dec == lst:
         print("GGWP")
     else:
-        print("BETTER LUCK NEXT TIME")
\ No newline at end of file
+        print("BETTER LUCK NEXT TIME")
+
+    stream = b"".join(codec.encode_iter(lst))
+    chunks = [stream[i:i + 4] for i in range(0, len(stream), 4)]
+    streamed = [bytes(frame).decode() for frame in codec.decode_iter(chunks)]
+    print(f"\nStreamed in {len(chunks)} chunks of 4 bytes: {streamed}")
+
+    reader = codec.decode_binary(codec.encode_binary(lst))
+    print(f"Binary, element 3: {reader[3]!r}, elements 1-2: {reader[1:3]}")
\ No newline at end of file
@@ -0,0 +1,165 @@
+"""
+    Hardened decoder for Codec's "{len}:{payload}" text format, for feeds that
+    can't be trusted. Lengths are capped (max_frame_size), so nothing the input
+    claims can make the decoder buffer more than one maximal frame, and a bad
+    frame is handled by a policy instead of silently ending the decode:
+
+        raise:  FrameError with the stream offset of the bad frame
+        skip:   drop a frame whose length is readable but too big, using that
+                length; a frame without a readable length falls back to resync
+        resync: scan forward to the next thing that looks like a length prefix
+
+    The input can arrive in any number of chunks, and checkpoint() gives a
+    position to restart from (e.g. after a crash) without decoding the stream
+    again from the start.
+"""
+from collections import namedtuple
+import re
+
+
+ERROR_POLICIES = ("raise", "skip", "resync")
+
+# offset: stream position to feed from when resuming, frames/errors: counts so far
+Checkpoint = namedtuple("Checkpoint", ["offset", "frames", "errors", "resyncing"])
+
+_DIGITS = re.compile(r"[0-9]*")
+_LENGTH_DIGITS = 20     # longest length prefix read as a number, anything longer is garbage
+
+
+class FrameError(ValueError):
+    def __init__(self, message, offset):
+        super().__init__(f"{message} at offset {offset}")
+        self.offset = offset
+
+
+class SafeDecoder:
+    def __init__(self, max_frame_size=1 << 20, on_error="raise"):
+        if on_error not in ERROR_POLICIES:
+            raise ValueError(f"on_error should be one of {ERROR_POLICIES}, got {on_error!r}")
+        self.max_frame_size = max_frame_size
+        self.on_error = on_error
+        self._header = re.compile(r"([0-9]{1,%d}):" % _LENGTH_DIGITS)
+
+        self._pending = ""      # start of a frame that isn't complete yet, at most one frame
+        self._offset = 0        # stream position of _pending[0]
+        self._skip = 0          # chars of a skipped frame that haven't arrived yet
+        self._resyncing = False
+        self.frames = 0
+        self.errors = 0
+        self.last_error = None  # (offset, message)
+
+    @classmethod
+    def resume(cls, checkpoint, **kwargs):
+        """New decoder that continues from checkpoint, feed it the stream from checkpoint.offset on"""
+        decoder = cls(**kwargs)
+        decoder._offset = checkpoint.offset
+        decoder.frames = checkpoint.frames
+        decoder.errors = checkpoint.errors
+        decoder._resyncing = checkpoint.resyncing
+        return decoder
+
+    def checkpoint(self):
+        return Checkpoint(self._offset + self._skip, self.frames, self.errors, self._resyncing)
+
+    def _error(self, message, pos, skip_to=None):
+        """Counts the error and returns where decoding continues"""
+        offset = self._offset + pos
+        self.errors += 1
+        self.last_error = (offset, message)
+        if self.on_error == "raise":
+            raise FrameError(message, offset)
+        if self.on_error == "skip" and skip_to is not None:
+            return skip_to
+        self._resyncing = True
+        return pos + 1
+
+    def feed(self, chunk):
+        """Decode as much as possible, returns the completed frames"""
+        if self._skip:
+            drop = min(self._skip, len(chunk))
+            self._skip -= drop
+            self._offset += drop
+            chunk = chunk[drop:]
+
+        buf = self._pending + chunk if self._pending else chunk
+        n = len(buf)
+        frames = []
+        pos = 0
+        while pos < n:
+            if self._resyncing:
+                match = self._header.search(buf, pos)
+                while match and int(match.group(1)) > self.max_frame_size:
+                    match = self._header.search(buf, match.start() + 1)
+                if match is None:
+                    # keep a tail that could be the start of a split length prefix
+                    pos = max(pos, n - _LENGTH_DIGITS)
+                    break
+                pos = match.start()
+                self._resyncing = False
+
+            match = self._header.match(buf, pos)
+            if match is None:
+                tail_digits = _DIGITS.match(buf, pos).end() - pos
+                if pos + tail_digits == n and tail_digits <= _LENGTH_DIGITS:
+                    break   # length prefix continues in the next chunk
+                pos = self._error("malformed length prefix", pos)
+                continue
+
+            length = int(match.group(1))
+            start = match.end()
+            if length > self.max_frame_size:
+                pos = self._error(f"frame of {length} chars is over max_frame_size", pos, start + length)
+                continue
+            if start + length > n:
+                break
+            frames.append(buf[start:start + length])
+            self.frames += 1
+            pos = start + length
+
+        if pos > n:
+            self._skip = pos - n
+            pos = n
+        self._offset += pos
+        self._pending = buf[pos:]
+        return frames
+
+    def close(self):
+        """End of input, a frame that is still incomplete is an error"""
+        if self._pending and not self._resyncing:
+            self._error("stream ends in the middle of a frame", 0)
+        self._pending = ""
+
+    def decode(self, encoded):
+        frames = self.feed(encoded)
+        self.close()
+        return frames
+
+
+def decode_stream(chunks, max_frame_size=1 << 20, on_error="raise"):
+    decoder = SafeDecoder(max_frame_size, on_error)
+    for chunk in chunks:
+        yield from decoder.feed(chunk)
+    decoder.close()
+
+
+if __name__ == "__main__":
+    from main import Codec
+
+    lst = ["Push", "Box,box", "Overtake", "F1: white"]
+    good = Codec().encode(lst)
+    corrupt = "4:Push" + "x7:Box,box" + "99999:Overtake" + "9:F1: white"
+    print(f"Corrupt input: {corrupt!r}")
+    for policy in ERROR_POLICIES:
+        decoder = SafeDecoder(max_frame_size=64, on_error=policy)
+        try:
+            print(f"{policy:<7}: {decoder.decode(corrupt)}, {decoder.errors} errors")
+        except FrameError as e:
+            print(f"{policy:<7}: FrameError: {e}")
+
+    # decode half, checkpoint, then carry on in a new decoder from the checkpoint
+    decoder = SafeDecoder()
+    first = decoder.feed(good[:15])
+    checkpoint = decoder.checkpoint()
+    rest = SafeDecoder.resume(checkpoint).decode(good[checkpoint.offset:])
+    print(f"\nResumed at offset {checkpoint.offset} after {checkpoint.frames} frames: {first} + {rest}")
+    print("GGWP" if first + rest == lst else "BETTER LUCK NEXT TIME")
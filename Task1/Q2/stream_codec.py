@@ -0,0 +1,183 @@
+"""
+    Streaming version of Codec's "{len}:{payload}" format on bytes.
+
+    Lengths are UTF-8 byte counts (Codec.encode counts code points, so the two
+    only agree on ASCII commands). Frames can be split across any chunk
+    boundaries. A frame that sits inside a single chunk is returned as a
+    memoryview into that chunk (no copy); only frames spanning chunks are
+    copied into a buffer. Copy a view (bytes(frame)) before reusing the chunk
+    it came from, e.g. with readinto.
+
+    Throughput is about Codec's (encode ahead on all-ASCII batches, a little
+    behind when some commands aren't ASCII; decode slightly ahead): what the
+    streaming side buys is bytes for the wire and memory bounded by the chunk
+    size, not raw speed. Both are per-frame Python loops.
+"""
+import re
+import sys
+import time
+
+
+_DIGITS = re.compile(rb"\d*")
+_HEADER = re.compile(rb"(\d+):")
+_COLON = ord(":")
+
+
+def encode_frame(command):
+    data = command.encode() if isinstance(command, str) else command
+    return b"%d:" % len(data), data
+
+
+def encode_iter(commands):
+    """Yields header and payload pieces for every command, payloads aren't copied"""
+    for command in commands:
+        header, data = encode_frame(command)
+        yield header
+        yield data
+
+
+def encode_bytes(commands):
+    """Whole batch at once, str commands are joined first and encoded in one go"""
+    commands = list(commands)
+    try:
+        joined = "".join(commands)
+    except TypeError:
+        # bytes among the commands
+        return b"".join(encode_iter(commands))
+    if joined.isascii():
+        # one check for the batch, then lengths are plain len() like Codec.encode
+        return "".join([f"{len(command)}:{command}" for command in commands]).encode()
+    return "".join([f"{len(command) if command.isascii() else len(command.encode())}:{command}"
+                    for command in commands]).encode()
+
+
+class StreamDecoder:
+    def __init__(self):
+        self._header = b""      # length digits of a header split across chunks
+        self._need = None       # payload bytes still missing for the current frame
+        self._partial = None    # payload collected so far when a frame spans chunks
+
+    @property
+    def in_frame(self):
+        return bool(self._header) or self._need is not None
+
+    def feed(self, chunk):
+        """Decode as much of chunk as possible, returns the completed frames"""
+        view = memoryview(chunk).cast("B") if not isinstance(chunk, memoryview) or chunk.format != "B" else chunk
+        n = len(view)
+        frames = []
+        pos = 0
+        while pos < n:
+            if self._need is None and not self._header:
+                pos = self._whole_frames(view, pos, frames)
+                if pos == n:
+                    break
+            if self._need is not None:
+                take = min(self._need, n - pos)
+                self._partial += view[pos:pos + take]
+                self._need -= take
+                pos += take
+                if self._need == 0:
+                    frames.append(memoryview(bytes(self._partial)))
+                    self._need = self._partial = None
+                continue
+
+            end = _DIGITS.match(view, pos).end()
+            if end == n:
+                # header continues in the next chunk
+                self._header += view[pos:end]
+                break
+            if view[end] != _COLON:
+                raise ValueError(f"expected ':' after frame length, got {bytes(view[end:end + 1])!r}")
+            digits = self._header + view[pos:end]
+            if not digits:
+                raise ValueError("missing frame length")
+            self._header = b""
+            length = int(digits)
+            pos = end + 1
+
+            if pos + length <= n:
+                frames.append(view[pos:pos + length])
+                pos += length
+            else:
+                self._partial = bytearray(view[pos:])
+                self._need = length - (n - pos)
+                pos = n
+        return frames
+
+    @staticmethod
+    def _whole_frames(view, pos, frames):
+        """
+            Fast path over the frames from pos that fit inside the chunk:
+            headers are matched with a regex straight on the view (re reads
+            any buffer, so the chunk isn't copied), payloads are views.
+            Returns where it stopped, feed's loop handles what's left (a
+            frame crossing the chunk end, or bad input)
+        """
+        match, append = _HEADER.match, frames.append
+        n = len(view)
+        while True:
+            header = match(view, pos)
+            if header is None:
+                return pos
+            start = header.end()
+            end = start + int(header[1])
+            if end > n:
+                return pos
+            append(view[start:end])
+            pos = end
+
+    def close(self):
+        if self.in_frame:
+            raise ValueError("stream ended in the middle of a frame")
+
+
+def decode_iter(chunks):
+    """Yields every frame (as a memoryview) from an iterable of byte chunks"""
+    decoder = StreamDecoder()
+    for chunk in chunks:
+        yield from decoder.feed(chunk)
+    decoder.close()
+
+
+def decode_strings(chunks):
+    return [bytes(frame).decode() for frame in decode_iter(chunks)]
+
+
+def chunked(data, size):
+    view = memoryview(data)
+    return (view[i:i + size] for i in range(0, len(view), size))
+
+
+def benchmark(n_commands=200000, chunk_size=64 * 1024):
+    """Throughput in MB/s of Codec vs the streaming functions on the same commands"""
+    from main import Codec
+
+    commands = ["Push", "Box,box", "Overtake", "", "F1: white", "Copy, understood. Box this lap", "Pérez P2"] * (n_commands // 7)
+    codec = Codec()
+
+    start = time.perf_counter()
+    encoded = codec.encode(commands)
+    encode_time = time.perf_counter() - start
+    start = time.perf_counter()
+    assert codec.decode(encoded) == commands
+    decode_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    stream = encode_bytes(commands)
+    stream_encode_time = time.perf_counter() - start
+    start = time.perf_counter()
+    count = sum(1 for _ in decode_iter(chunked(stream, chunk_size)))
+    stream_decode_time = time.perf_counter() - start
+    assert count == len(commands)
+
+    mb = len(stream) / 1e6
+    print(f"{len(commands)} commands, {mb:.1f} MB, {chunk_size // 1024} KB chunks")
+    print(f"{'':<18} {'encode MB/s':>12} {'decode MB/s':>12}")
+    print(f"{'Codec':<18} {mb / encode_time:>12.1f} {mb / decode_time:>12.1f}")
+    print(f"{'stream (bytes)':<18} {mb / stream_encode_time:>12.1f} {mb / stream_decode_time:>12.1f}")
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    benchmark(n)
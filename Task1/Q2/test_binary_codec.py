@@ -0,0 +1,75 @@
+import struct
+
+import pytest
+
+from binary_codec import HEADER_SIZE, BinaryCodec, BinaryReader, decode_varint, encode_varint
+
+
+COMMANDS = ["Push", "", "Box,box", "Pérez P2", "x" * 200, "F1: white" * 50]
+
+
+@pytest.mark.parametrize("n", [0, 1, 127, 128, 300, 2 ** 21, 2 ** 32])
+def test_varint_round_trip(n):
+    encoded = encode_varint(n)
+    assert decode_varint(b"\x00" + encoded, 1) == (n, 1 + len(encoded))
+
+
+@pytest.mark.parametrize("index", [True, False])
+def test_round_trip_and_random_access(index):
+    reader = BinaryReader(BinaryCodec(index).encode(COMMANDS))
+    assert reader.decode_all() == COMMANDS
+    assert len(reader) == len(COMMANDS)
+    assert [reader[k] for k in range(len(COMMANDS))] == COMMANDS
+    assert reader[-1] == COMMANDS[-1] and reader[1:4] == COMMANDS[1:4]
+    with pytest.raises(IndexError):
+        reader[len(COMMANDS)]
+
+
+def test_empty_message():
+    assert BinaryCodec().decode(BinaryCodec().encode([])) == []
+
+
+def with_offsets(offsets, end=None):
+    """An indexed message for COMMANDS with its offsets table replaced"""
+    data = bytearray(BinaryCodec().encode(COMMANDS))
+    table_at = struct.unpack_from("<I", data, len(data) - 4)[0]
+    struct.pack_into(f"<{len(offsets)}I", data, table_at, *offsets)
+    if end is not None:
+        struct.pack_into("<I", data, len(data) - 4, end)
+    return bytes(data)
+
+
+def offsets():
+    return list(BinaryReader(BinaryCodec().encode(COMMANDS))._offsets)
+
+
+@pytest.mark.parametrize("change, message", [
+    (lambda o: o.__setitem__(2, o[1]), "isn't increasing at element 1"),
+    (lambda o: o.__setitem__(3, o[1] - 1), "isn't increasing at element 2"),
+    (lambda o: o.__setitem__(0, 0), "starts at 0"),
+    (lambda o: o.__setitem__(-1, 10 ** 6), "ends at 1000000"),
+])
+def test_corrupt_offsets_table_is_rejected_on_open(change, message):
+    table = offsets()
+    change(table)
+    with pytest.raises(ValueError, match=message):
+        BinaryReader(with_offsets(table))
+    BinaryReader(with_offsets(table), validate=False)
+
+
+@pytest.mark.parametrize("end", [0, HEADER_SIZE - 1, 10 ** 6])
+def test_table_position_outside_the_message_is_rejected(end):
+    with pytest.raises(ValueError, match="outside the message"):
+        BinaryReader(with_offsets(offsets(), end))
+
+
+@pytest.mark.parametrize("data", [b"", b"CDB", b"XXXX\x00", b"CDB1\x01\x00"])
+def test_not_a_message(data):
+    with pytest.raises(ValueError):
+        BinaryReader(data)
+
+
+def test_truncated_frame_is_rejected():
+    data = BinaryCodec(index=False).encode(COMMANDS)
+    with pytest.raises(ValueError, match="past the end"):
+        BinaryReader(data[:-3]).decode_all()
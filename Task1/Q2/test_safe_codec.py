@@ -0,0 +1,77 @@
+import pytest
+
+from main import Codec
+from safe_codec import FrameError, SafeDecoder, decode_stream
+
+
+COMMANDS = ["Push", "Box,box", "", "Overtake", "F1: white", "12:34", "x" * 50]
+GOOD = Codec().encode(COMMANDS)
+# a stray char before a frame, then a frame over the cap whose length is readable
+CORRUPT = "4:Push" + "x7:Box,box" + "99:" + "o" * 99 + "9:F1: white"
+
+
+def chunks(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+@pytest.mark.parametrize("size", [1, 2, 5, 1000])
+def test_good_input_decodes_like_codec_at_any_chunk_size(size):
+    assert list(decode_stream(chunks(GOOD, size))) == COMMANDS == Codec().decode_safe(GOOD)
+
+
+def test_raise_reports_the_offset_of_the_bad_frame():
+    with pytest.raises(FrameError) as error:
+        SafeDecoder(max_frame_size=64).decode(CORRUPT)
+    assert error.value.offset == 6
+
+
+@pytest.mark.parametrize("size", [1, 3, 1000])
+def test_skip_and_resync(size):
+    skipped = list(decode_stream(chunks(CORRUPT, size), max_frame_size=64, on_error="skip"))
+    resynced = list(decode_stream(chunks(CORRUPT, size), max_frame_size=64, on_error="resync"))
+    # skip drops the oversized frame by its length; the stray "x" has no length, so it resyncs
+    assert skipped == ["Push", "Box,box", "F1: white"]
+    # resync looks for the next length prefix, which can be inside the dropped payload
+    assert resynced[:2] == ["Push", "Box,box"] and resynced[-1] == "F1: white"
+
+
+def test_errors_are_counted():
+    decoder = SafeDecoder(max_frame_size=64, on_error="skip")
+    decoder.decode(CORRUPT)
+    assert decoder.errors == 2 and decoder.frames == 3
+    assert decoder.last_error[0] == CORRUPT.index("99:")
+
+
+@pytest.mark.parametrize("policy, text", [("skip", CORRUPT), ("resync", CORRUPT), ("raise", GOOD)])
+def test_resuming_from_any_checkpoint_gives_the_same_frames(policy, text):
+    expected = SafeDecoder(max_frame_size=64, on_error=policy).decode(text)
+    for cut in range(len(text) + 1):
+        decoder = SafeDecoder(max_frame_size=64, on_error=policy)
+        first = decoder.feed(text[:cut])
+        checkpoint = decoder.checkpoint()
+        resumed = SafeDecoder.resume(checkpoint, max_frame_size=64, on_error=policy)
+        assert first + resumed.decode(text[checkpoint.offset:]) == expected, cut
+        assert resumed.frames == len(expected)
+
+
+def test_buffer_never_holds_more_than_one_frame():
+    decoder = SafeDecoder(max_frame_size=100, on_error="resync")
+    decoder.feed("5" * 10000)
+    assert len(decoder._pending) <= 20
+    decoder = SafeDecoder(max_frame_size=100, on_error="skip")
+    decoder.feed("1000000:")
+    for _ in range(100):
+        assert decoder.feed("y" * 10000) == []
+        assert decoder._pending == ""
+    assert decoder.decode("y" * 8 + "2:ok") == ["ok"]
+
+
+@pytest.mark.parametrize("text", ["4:Pu", "12"])
+def test_stream_ending_inside_a_frame(text):
+    with pytest.raises(FrameError):
+        SafeDecoder().decode(text)
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        SafeDecoder(on_error="ignore")
@@ -0,0 +1,54 @@
+import pytest
+
+from main import Codec
+from stream_codec import StreamDecoder, chunked, decode_iter, decode_strings, encode_bytes, encode_iter
+
+
+COMMANDS = ["Push", "Box,box", "Overtake", "", "F1: white", "12:34", "Copy, understood. Box this lap", "Pérez P2"] * 20
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 10000])
+def test_round_trip_at_any_chunk_size(size):
+    assert decode_strings(chunked(encode_bytes(COMMANDS), size)) == COMMANDS
+
+
+def test_encode_bytes_matches_codec_and_encode_iter_on_ascii():
+    ascii_commands = [command for command in COMMANDS if command.isascii()]
+    encoded = encode_bytes(ascii_commands)
+    assert encoded == Codec().encode(ascii_commands).encode()
+    assert encoded == b"".join(encode_iter(ascii_commands))
+
+
+def test_lengths_are_utf8_bytes():
+    assert encode_bytes(["Pérez"]) == "6:Pérez".encode()
+    assert encode_bytes([b"a", "é"]) == b"1:a2:" + "é".encode()
+
+
+def test_frames_inside_a_chunk_are_views_into_it():
+    chunk = bytearray(b"4:Push3:Box")
+    frames = StreamDecoder().feed(chunk)
+    chunk[2:6] = b"Pull"
+    assert [bytes(frame) for frame in frames] == [b"Pull", b"Box"]
+
+
+def test_frame_split_across_chunks_is_copied():
+    decoder = StreamDecoder()
+    assert decoder.feed(b"8:Over") == []
+    assert decoder.in_frame
+    chunk = bytearray(b"take")
+    frames = decoder.feed(chunk)
+    chunk[:] = b"xxxx"
+    assert [bytes(frame) for frame in frames] == [b"Overtake"]
+    decoder.close()
+
+
+@pytest.mark.parametrize("data, message", [(b"4Push", "expected ':'"), (b":Push", "missing frame length")])
+def test_bad_headers_raise(data, message):
+    with pytest.raises(ValueError, match=message):
+        StreamDecoder().feed(data)
+
+
+@pytest.mark.parametrize("data", [b"12", b"8:Over"])
+def test_stream_ending_inside_a_frame_raises(data):
+    with pytest.raises(ValueError, match="middle of a frame"):
+        list(decode_iter([data]))
@@ -0,0 +1,119 @@
+"""
+    Aho-Corasick keyword matcher for voice commands.
+
+    The keyword table is compiled once into a trie with failure links, then a
+    transcript is scanned in a single pass no matter how many aliases there are.
+    When several keywords occur, the longest one wins ("turbo start" beats
+    "start"), then the one that starts first, then the one added first, so the
+    result never depends on dict ordering.
+"""
+from collections import deque
+import difflib
+
+
+class KeywordMatcher:
+    def __init__(self, table=None, fuzzy_cutoff=0.8):
+        """
+            table maps keyword -> value (e.g. alias -> move name).
+            fuzzy_cutoff is the difflib ratio a near-miss word needs to count
+            as a keyword when nothing matches exactly, None turns fuzzy matching off
+        """
+        self.fuzzy_cutoff = fuzzy_cutoff
+        self._keywords = {}     # keyword -> (value, insertion order)
+        self._compiled = False
+        for keyword, value in (table or {}).items():
+            self.add(keyword, value)
+
+    def add(self, keyword, value):
+        keyword = keyword.lower()
+        if keyword not in self._keywords:
+            self._keywords[keyword] = (value, len(self._keywords))
+        else:
+            self._keywords[keyword] = (value, self._keywords[keyword][1])
+        self._compiled = False
+
+    def __len__(self):
+        return len(self._keywords)
+
+    def compile(self):
+        # node i: goto[i] is {char: node}, fail[i] a node, out[i] the keywords ending at i
+        goto, fail, out = [{}], [0], [[]]
+        for keyword in self._keywords:
+            node = 0
+            for char in keyword:
+                if char not in goto[node]:
+                    goto.append({})
+                    fail.append(0)
+                    out.append([])
+                    goto[node][char] = len(goto) - 1
+                node = goto[node][char]
+            out[node].append(keyword)
+
+        # breadth first so every failure link points to an already finished node
+        todo = deque(goto[0].values())
+        while todo:
+            node = todo.popleft()
+            for char, child in goto[node].items():
+                todo.append(child)
+                state = fail[node]
+                while state and char not in goto[state]:
+                    state = fail[state]
+                fail[child] = goto[state].get(char, 0)
+                out[child] = out[child] + out[fail[child]]
+
+        self._goto, self._fail, self._out = goto, fail, out
+        self._word_counts = {keyword: len(keyword.split()) for keyword in self._keywords}
+        self._compiled = True
+
+    def find_all(self, text):
+        """Every (start, keyword) occurring in text, in one pass"""
+        if not self._compiled:
+            self.compile()
+        goto, fail, out = self._goto, self._fail, self._out
+        found = []
+        node = 0
+        for i, char in enumerate(text.lower()):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for keyword in out[node]:
+                found.append((i - len(keyword) + 1, keyword))
+        return found
+
+    def _best(self, found):
+        keywords = self._keywords
+        _, keyword = min(found, key=lambda item: (-len(item[1]), item[0], keywords[item[1]][1]))
+        return keyword
+
+    def match_keyword(self, text):
+        """The keyword picked for text (exact first, then fuzzy), or None"""
+        if not text:
+            return None
+        found = self.find_all(text)
+        if found:
+            return self._best(found)
+        if self.fuzzy_cutoff is not None:
+            return self._fuzzy(text)
+        return None
+
+    def match(self, text):
+        """The value of the keyword picked for text, or None"""
+        keyword = self.match_keyword(text)
+        return self._keywords[keyword][0] if keyword else None
+
+    def _fuzzy(self, text):
+        """
+            Compare every run of transcript words against keywords with the same
+            number of words, e.g. "turbo stat" -> "turbo start", "blok" -> "block"
+        """
+        words = text.lower().split()
+        best, best_key = None, None
+        for keyword, n in self._word_counts.items():
+            for i in range(len(words) - n + 1):
+                ratio = difflib.SequenceMatcher(None, " ".join(words[i:i + n]), keyword).ratio()
+                if ratio < self.fuzzy_cutoff:
+                    continue
+                key = (-ratio, -len(keyword), i, self._keywords[keyword][1])
+                if best_key is None or key < best_key:
+                    best, best_key = keyword, key
+        return best
@@ -0,0 +1,108 @@
+"""
+    Fake microphone and recognizer with the same interface as speech_recognition's,
+    so SpeechHandler can run offline and its latency can be measured without
+    a microphone or the Google API.
+"""
+import sys
+import time
+
+import speech_recognition as sr
+
+
+class FakeAudio:
+    """Stand-in for sr.AudioData, carries the phrase that was 'spoken'"""
+    def __init__(self, text):
+        self.text = text
+
+    def get_raw_data(self):
+        return (self.text or "").encode()
+
+
+class FakeMicrophone:
+    """Context manager like sr.Microphone"""
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class FakeRecognizer:
+    """
+        Plays back a script of phrases. Every listen() takes capture_delay seconds
+        (the time the player speaks) and every recognize_google() takes
+        recognition_delay seconds (the network round-trip). None in the script is
+        a phrase that can't be understood.
+    """
+    def __init__(self, phrases, capture_delay=0.5, recognition_delay=0.5):
+        self._phrases = list(phrases)
+        self.capture_delay = capture_delay
+        self.recognition_delay = recognition_delay
+
+    def adjust_for_ambient_noise(self, source, duration=1):
+        pass
+
+    def listen(self, source, timeout=None, phrase_time_limit=None):
+        if not self._phrases:
+            time.sleep(min(timeout or self.capture_delay, self.capture_delay))
+            raise sr.WaitTimeoutError("listening timed out while waiting for phrase to start")
+        time.sleep(self.capture_delay)
+        return FakeAudio(self._phrases.pop(0))
+
+    def recognize_google(self, audio, **kwargs):
+        time.sleep(self.recognition_delay)
+        if audio.text is None:
+            raise sr.UnknownValueError()
+        return audio.text
+
+
+def measure_latency(n_commands=10, capture_delay=0.5, recognition_delay=0.5):
+    """Time n commands read back to back, sequential listen_for_command vs the pipeline"""
+    from speech_handler import SpeechHandler
+
+    phrases = ["turbo start", "slipstream cut", "mercedes charge", "block", "corner"]
+    script = [phrases[i % len(phrases)] for i in range(n_commands)]
+    results = {}
+
+    for mode in ("sequential", "pipelined"):
+        # cache off so every command pays the full recognition delay
+        handler = SpeechHandler(FakeRecognizer(script, capture_delay, recognition_delay), FakeMicrophone(),
+                                cache_size=0)
+        read = handler.listen_for_command if mode == "sequential" else handler.next_command
+        start = time.perf_counter()
+        commands = [read() for _ in range(n_commands)]
+        results[mode] = time.perf_counter() - start
+        handler.stop_listening()
+        assert commands == script, commands
+
+    print(f"\n{n_commands} commands, capture {capture_delay}s + recognition {recognition_delay}s each")
+    for mode, elapsed in results.items():
+        print(f"{mode:<11}: {elapsed:.2f}s total, {elapsed / n_commands * 1000:.0f} ms per command")
+    print(f"Speedup: {results['sequential'] / results['pipelined']:.2f}x")
+    return results
+
+
+def compare_backends(n_commands=20, recognition_delay=0.2):
+    """
+        Same script through the 'google' backend (simulated round-trip) and the
+        local stub, printing cache hits/misses and recognition latency
+    """
+    from speech_handler import SpeechHandler
+
+    phrases = ["turbo start", "block", "slipstream", "mercedes charge"]
+    script = [phrases[i % len(phrases)] for i in range(n_commands)]
+
+    print(f"\n{'Backend':<8} {'Hits':>5} {'Misses':>7} {'Hit rate':>9} {'Mean ms':>8} {'p95 ms':>7}")
+    for backend in ("google", "stub"):
+        handler = SpeechHandler(FakeRecognizer(script, 0.0, recognition_delay), FakeMicrophone(), backend=backend)
+        for _ in range(n_commands):
+            handler.listen_for_command()
+        stats = handler.recognition_stats()
+        print(f"{backend:<8} {stats['hits']:>5} {stats['misses']:>7} {stats['hit_rate']*100:>8.1f}% "
+              f"{stats['mean_ms']:>8.1f} {stats['p95_ms']:>7.1f}")
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    measure_latency(n)
+    compare_backends()
@@ -1,7 +1,29 @@
 from abc import ABC, abstractmethod 
-from speech_handler import SpeechHandler, VoiceCommandMapper
+from collections import namedtuple
 import random
-import time
+
+
+# move tables, kept as plain data so the headless engine can rebuild
+# fresh moves for every simulated race
+MAX_OFFENSIVE_MOVES = [
+    ("DRS Boost", 45, 12, "Drag Reduction System; temporarily increases straight-line speed."),
+    ("Red Bull Surge", 80, 20, "Aggressive acceleration, high tire wear."),
+    ("Precision Turn", 30, 8, "Tactical turn to gain time with minimal fuel use."),
+]
+MAX_DEFENSIVE_MOVES = [
+    ("Brake Late", 25, 0.30, "Uses ultra-late braking to reduce attack impact. Common but risky."),
+    ("ERS Deployment", 40, 0.50, "Deploys electric recovery system defensively to absorb incoming pressure and recover next turn.", 3),
+]
+
+HASSAN_OFFENSIVE_MOVES = [
+    ("Turbo Start", 50, 10, "Early burst of speed."),
+    ("Mercedes Charge", 90, 22, "Full-throttle attack."),
+    ("Corner Mastery", 25, 7, "Skilled turning for efficiency."),
+]
+HASSAN_DEFENSIVE_MOVES = [
+    ("Slipstream Cut", 20, 0.40, "Cuts into airflow behind the leading car to limit opponent's advantage and reduce damage."),
+    ("Aggressive Block", 35, 1.0, "Swerves defensively to block most incoming damage. Can only be used twice due to high risk.", 2),
+]
 
 
 class Driver(ABC):
@@ -61,16 +83,16 @@ class Driver(ABC):
 
 
 class MaxVerstappen(Driver):
-    def __init__(self):
+    def __init__(self, rng=None):
         super().__init__("Max Verstappen")
+        # pass a random.Random to make the AI reproducible, defaults to the global random module
+        self._rng = rng or random
 
-        self.add_offensive_move(OffensiveMove("DRS Boost", 45, 12, "Drag Reduction System; temporarily increases straight-line speed."))
-        self.add_offensive_move(OffensiveMove("Red Bull Surge", 80, 20, "Aggressive acceleration, high tire wear."))
-        self.add_offensive_move(OffensiveMove("Precision Turn", 30, 8, "Tactical turn to gain time with minimal fuel use."))
-
+        for move in MAX_OFFENSIVE_MOVES:
+            self.add_offensive_move(OffensiveMove(*move))
 
-        self.add_defensive_move(DefensiveMove("Brake Late", 25, 0.30, "Uses ultra-late braking to reduce attack impact. Common but risky."))
-        self.add_defensive_move(DefensiveMove("ERS Deployment", 40, 0.50, "Deploys electric recovery system defensively to absorb incoming pressure and recover next turn.", 3))
+        for move in MAX_DEFENSIVE_MOVES:
+            self.add_defensive_move(DefensiveMove(*move))
 
 
     def choose_offensive_move(self):
@@ -82,7 +104,7 @@ class MaxVerstappen(Driver):
         if not moves:
             return None
 
-        return random.choice(moves)
+        return self._rng.choice(moves)
 
 
     def choose_defensive_move(self, attack_dmg):
@@ -94,21 +116,26 @@ class MaxVerstappen(Driver):
         if not moves:
             return None
      
-        return random.choice(moves)
+        return self._rng.choice(moves)
         
 
 class HassanMostafa(Driver):
-    def __init__(self):
+    def __init__(self, rng=None, speech_handler=None):
         super().__init__("Hassan Mostafa")
+        # used by the random fallback when voice recognition fails
+        self._rng = rng or random
         
-        self.add_offensive_move(OffensiveMove("Turbo Start", 50, 10, "Early burst of speed."))
-        self.add_offensive_move(OffensiveMove("Mercedes Charge", 90, 22, "Full-throttle attack."))
-        self.add_offensive_move(OffensiveMove("Corner Mastery", 25, 7, "Skilled turning for efficiency."))
+        for move in HASSAN_OFFENSIVE_MOVES:
+            self.add_offensive_move(OffensiveMove(*move))
         
-        self.add_defensive_move(DefensiveMove("Slipstream Cut", 20, 0.40, "Cuts into airflow behind the leading car to limit opponent's advantage and reduce damage."))
-        self.add_defensive_move(DefensiveMove("Aggressive Block", 35, 1.0, "Swerves defensively to block most incoming damage. Can only be used twice due to high risk.", 2))
+        for move in HASSAN_DEFENSIVE_MOVES:
+            self.add_defensive_move(DefensiveMove(*move))
 
-        self.speech_handler = SpeechHandler()
+        # imported here so the headless engine can use the drivers and moves
+        # without a microphone or the speech_recognition package
+        from speech_handler import SpeechHandler, VoiceCommandMapper
+
+        self.speech_handler = speech_handler or SpeechHandler()
         self.voice_mapper = VoiceCommandMapper()
 
 
@@ -120,6 +147,10 @@ class HassanMostafa(Driver):
         
         if not moves:
             return None
+
+        # start recording right away, anything said before this prompt is dropped
+        self.speech_handler.start_listening()
+        self.speech_handler.flush()
         
         print(f"\n{self.name}'s Available Offensive Moves: ")
         for i, move in enumerate(moves, 1):
@@ -132,15 +163,13 @@ class HassanMostafa(Driver):
         print("- Say 'Corner Mastery' or 'Corner' or 'corner expert'")
         print("\nTIP: Speak clearly!!")
         
-        # Give player time to read the moves
-        print("\n⏰ Take your time to read the moves above...")
-        print("💡 You have 10 seconds to decide your strategy!")
-        time.sleep(10)
+        # the microphone is already recording, speak as soon as you're ready
+        print("\n🎤 Listening now - say your move whenever you're ready!")
 
         max_attempts = 3
         for attempt in range(max_attempts):
             print(f"\nAttempt {attempt + 1}/{max_attempts} - Say your offensive move:")
-            voice_command = self.speech_handler.listen_for_command()
+            voice_command = self.speech_handler.next_command()
             if voice_command:
                 move_name = self.voice_mapper.map_offensive_command(voice_command)
                 if move_name:
@@ -154,7 +183,7 @@ class HassanMostafa(Driver):
 
         
         print("⚠️ Voice recognition failed. Using random selection as fallback.")
-        return random.choice(moves)
+        return self._rng.choice(moves)
     
 
     def choose_defensive_move(self, attack_dmg):
@@ -165,6 +194,9 @@ class HassanMostafa(Driver):
         
         if not moves:
             return None
+
+        self.speech_handler.start_listening()
+        self.speech_handler.flush()
         
         print(f"\n🚨 INCOMING ATTACK: {attack_dmg} damage!")
         print(f"\n{self.name}'s Available Defensive Moves:")
@@ -179,16 +211,13 @@ class HassanMostafa(Driver):
         print("- Say 'Aggressive Block' or 'Block'")
         print("\nTIP: Speak clearly!!")
         
-        # Give player time to read the defensive options  
-        print("\n⏰ URGENT! You have 10 seconds to choose your defense!")
-        print("💡 Think quickly about which defense to use!")
-        time.sleep(10)
+        print("\n🎤 URGENT! Listening now - say your defense!")
   
         max_attempts = 3
         for attempt in range(max_attempts):
             print(f"\nAttempt {attempt + 1}/{max_attempts} - Say your defensive move:")
             
-            voice_command = self.speech_handler.listen_for_command()
+            voice_command = self.speech_handler.next_command()
             if voice_command:
                 move_name = self.voice_mapper.map_defensive_command(voice_command)
                 if move_name:
@@ -203,7 +232,7 @@ class HassanMostafa(Driver):
             
 
         print("⚠️ Voice recognition failed. Using random selection as fallback.")
-        return random.choice(moves)
+        return self._rng.choice(moves)
 
 class Move(ABC):
     def __init__ (self, name, fuel_cost, description):
@@ -276,42 +305,45 @@ class DefensiveMove(Move):
         return self, reduced_dmg, f"{defender.name} used {self._name} that reduced the attacker damage from {attacker_dmg} to {reduced_dmg:.1f}"
     
 
-class Race:
-    def __init__(self, driver1, driver2):
-        self._driver1 = driver1
-        self._driver2 = driver2
-        self._round_number = 0
-    
-    def print_status(self):
-        print(f"\n--- Round {self._round_number} Status ---")
-        print(f"{self._driver1.name}: Tire Health = {self._driver1.tire_health}, Fuel = {self._driver1.fuel}")
-        print(f"{self._driver2.name}: Tire Health = {self._driver2.tire_health}, Fuel = {self._driver2.fuel}")
+RaceResult = namedtuple("RaceResult", ["winner", "loser", "rounds", "reason"])
+
+
+class ConsoleSink:
+    """
+        Default event sink: prints the race the same way the interactive game always did
+    """
+    def __call__(self, event, **data):
+        getattr(self, "on_" + event)(**data)
+
+    def on_race_start(self, race):
+        print("FORMULA 1 RACE: M.VERSTAPPEN VS H.MOSTAFA")
+        print("="*60)
+        print("🎤 VOICE CONTROL ENABLED!")
+        print(f"📢 {race.driver2.name} will be controlled by voice commands")
+        print(f"🤖 {race.driver1.name} uses AI (random strategy)")
+        print("="*60)
+
+    def on_status(self, race):
+        print(f"\n--- Round {race.round_number} Status ---")
+        print(f"{race.driver1.name}: Tire Health = {race.driver1.tire_health}, Fuel = {race.driver1.fuel}")
+        print(f"{race.driver2.name}: Tire Health = {race.driver2.tire_health}, Fuel = {race.driver2.fuel}")
         print("-" * 50)
 
-    def simulate_turn(self, attacker, defender):
+    def on_turn_start(self, attacker):
         print(f"\n{attacker.name}'s turn:")
-        
-        offensive_move = attacker.choose_offensive_move()
-        if not offensive_move:
-            print(f"{attacker.name} has no available offensive moves!")
-            return
-        
-        if attacker.fuel < offensive_move.fuel_cost:
-            print(f"{attacker.name} doesn't have enough fuel for any moves!")
-            return
-        
+
+    def on_no_moves(self, attacker):
+        print(f"{attacker.name} has no available offensive moves!")
+
+    def on_no_fuel(self, attacker):
+        print(f"{attacker.name} doesn't have enough fuel for any moves!")
+
+    def on_attack(self, attacker, defender, offensive_move):
         print(f"{attacker.name} attempts {offensive_move.name}!")
-        
-        attack_damage = offensive_move.impact
-        
         # Show which defender is about to defend
-        print(f"\n🛡️ {defender.name} prepares to defend against {attack_damage} damage...")
-  
-        defense_move, final_damage, defense_message = defender.defend(attack_damage)
-       
-        attacker._fuel -= offensive_move.fuel_cost
-        defender.take_damage(final_damage)
-        
+        print(f"\n🛡️ {defender.name} prepares to defend against {offensive_move.impact} damage...")
+
+    def on_combat(self, attacker, defender, offensive_move, defense_move, attack_damage, final_damage, defense_message):
         print(f"\n📊 COMBAT SUMMARY:")
         print(f"Attack: {offensive_move.name} - {offensive_move.description}")
         print(defense_message)
@@ -329,16 +361,105 @@ class Race:
             print(f"💀 {defender.name}'s tires are destroyed!")
         elif defender.fuel <= 0:
             print(f"💀 {defender.name} ran out of fuel and is eliminated!")
-    
-    def run_race(self):
-        print("FORMULA 1 RACE: M.VERSTAPPEN VS H.MOSTAFA")
-        print("="*60)
-        print("🎤 VOICE CONTROL ENABLED!")
-        print(f"📢 {self._driver2.name} will be controlled by voice commands")
-        print(f"🤖 {self._driver1.name} uses AI (random strategy)")
+
+    def on_race_end(self, race, result):
+        print("\n" + "="*60)
+        print("**RACE RESULTS**")
+        if result.winner is None:
+            print("🏁 STALEMATE! Nobody can afford a move and both tires are level.")
+        else:
+            print(f"🏆 WINNER: {result.winner.name}!")
+            print(f"Final Stats - Tire Health: {result.winner.tire_health}, Fuel: {result.winner.fuel}")
+
+            # Explain why the other driver lost
+            if result.reason == "tires":
+                print(f"💀 {result.loser.name} lost due to tire destruction!")
+            elif result.reason == "fuel":
+                print(f"⛽ {result.loser.name} lost due to running out of fuel!")
+            else:
+                print(f"🏁 {result.loser.name} lost the stalemate on tire health!")
+
+        print(f"Race lasted {result.rounds} rounds.")
         print("="*60)
+
+
+class Race:
+    def __init__(self, driver1, driver2, sink=None):
+        """
+            sink gets every race event as sink(event, **data); defaults to the
+            console printer, pass sink=False to run silently
+        """
+        self._driver1 = driver1
+        self._driver2 = driver2
+        self._round_number = 0
+        if sink is None:
+            sink = ConsoleSink()
+        self._sink = sink or None
+
+    @property
+    def driver1(self):
+        return self._driver1
+
+    @property
+    def driver2(self):
+        return self._driver2
+
+    @property
+    def round_number(self):
+        return self._round_number
+
+    def _emit(self, event, **data):
+        if self._sink is not None:
+            self._sink(event, **data)
+    
+    def print_status(self):
+        ConsoleSink().on_status(self)
+
+    def simulate_turn(self, attacker, defender):
+        """
+            Play one turn, returns False if the attacker couldn't make a move
+        """
+        self._emit("turn_start", attacker=attacker)
+        
+        offensive_move = attacker.choose_offensive_move()
+        if not offensive_move:
+            self._emit("no_moves", attacker=attacker)
+            return False
+        
+        if attacker.fuel < offensive_move.fuel_cost:
+            self._emit("no_fuel", attacker=attacker)
+            return False
+        
+        self._emit("attack", attacker=attacker, defender=defender, offensive_move=offensive_move)
         
-        self.print_status()
+        attack_damage = offensive_move.impact
+  
+        defense_move, final_damage, defense_message = defender.defend(attack_damage)
+       
+        attacker._fuel -= offensive_move.fuel_cost
+        defender.take_damage(final_damage)
+        
+        self._emit("combat", attacker=attacker, defender=defender, offensive_move=offensive_move,
+                   defense_move=defense_move, attack_damage=attack_damage,
+                   final_damage=final_damage, defense_message=defense_message)
+        return True
+
+    def _result(self):
+        d1, d2 = self._driver1, self._driver2
+        if d1.is_alive and d2.is_alive:
+            # stalemate, higher tire health wins
+            if d1.tire_health == d2.tire_health:
+                return RaceResult(None, None, self._round_number, "stalemate")
+            winner, loser = (d1, d2) if d1.tire_health > d2.tire_health else (d2, d1)
+            return RaceResult(winner, loser, self._round_number, "stalemate")
+
+        winner, loser = (d1, d2) if d1.is_alive else (d2, d1)
+        reason = "tires" if loser.tire_health <= 0 else "fuel"
+        return RaceResult(winner, loser, self._round_number, reason)
+    
+    def run_race(self):
+        self._emit("race_start", race=self)
+        self._emit("status", race=self)
         
         current_attacker = self._driver1
         current_defender = self._driver2
@@ -347,42 +468,27 @@ class Race:
         while self._driver1.is_alive and self._driver2.is_alive:
             self._round_number += 1
             
-            # Simply run the turn without pre-checking
-            consecutive_nomoves = 0
-            self.simulate_turn(current_attacker, current_defender)
+            if self.simulate_turn(current_attacker, current_defender):
+                consecutive_nomoves = 0
+            else:
+                consecutive_nomoves += 1
    
-            self.print_status()
+            self._emit("status", race=self)
 
             # Check win conditions - if either driver is eliminated
             if not self._driver1.is_alive or not self._driver2.is_alive:
                 break
+
+            # neither driver can afford a move anymore
+            if consecutive_nomoves >= 2:
+                break
             
             # toggle turns
             current_attacker, current_defender = current_defender, current_attacker
   
-        print("\n" + "="*60)
-        print("**RACE RESULTS**")
-        if self._driver1.is_alive:
-            print(f"🏆 WINNER: {self._driver1.name}!")
-            print(f"Final Stats - Tire Health: {self._driver1.tire_health}, Fuel: {self._driver1.fuel}")
-            
-            # Explain why the other driver lost
-            if self._driver2.tire_health <= 0:
-                print(f"💀 {self._driver2.name} lost due to tire destruction!")
-            elif self._driver2.fuel <= 0:
-                print(f"⛽ {self._driver2.name} lost due to running out of fuel!")
-                
-        else:
-            print(f"🏆 WINNER: {self._driver2.name}!")
-            print(f"Final Stats - Tire Health: {self._driver2.tire_health}, Fuel: {self._driver2.fuel}")
-          
-            if self._driver1.tire_health <= 0:
-                print(f"💀 {self._driver1.name} lost due to tire destruction!")
-            elif self._driver1.fuel <= 0:
-                print(f"⛽ {self._driver1.name} lost due to running out of fuel!")
-        
-        print(f"Race lasted {self._round_number} rounds.")
-        print("="*60)
+        result = self._result()
+        self._emit("race_end", race=self, result=result)
+        return result
 
 
 if __name__ == "__main__":
@@ -392,4 +498,4 @@ if __name__ == "__main__":
     
     # Create and run race
     race = Race(max_verstappen, hassan_mostafa)
-    race.run_race()
\ No newline at end of file
+    race.run_race()
@@ -0,0 +1,228 @@
+"""
+    Headless batch engine for the Verstappen vs Hassan matchup.
+
+    Runs thousands of races back to back with pluggable move policies instead of
+    the microphone, so we can balance the move tables. Nothing is printed unless
+    an event sink is passed in.
+"""
+from abc import ABC, abstractmethod
+from collections import Counter
+import random
+import sys
+import time
+
+from main import (Driver, OffensiveMove, DefensiveMove, Race,
+                  MAX_OFFENSIVE_MOVES, MAX_DEFENSIVE_MOVES,
+                  HASSAN_OFFENSIVE_MOVES, HASSAN_DEFENSIVE_MOVES)
+
+
+class Policy(ABC):
+    @abstractmethod
+    def choose_offensive(self, driver, moves):
+        pass
+
+    @abstractmethod
+    def choose_defensive(self, driver, moves, attack_dmg):
+        pass
+
+
+class RandomPolicy(Policy):
+    """Same strategy as MaxVerstappen: uniform pick among the affordable moves"""
+    def __init__(self, rng=None):
+        self._rng = rng or random.Random()
+
+    def choose_offensive(self, driver, moves):
+        return self._rng.choice(moves)
+
+    def choose_defensive(self, driver, moves, attack_dmg):
+        return self._rng.choice(moves)
+
+
+class GreedyPolicy(Policy):
+    """Always hit as hard as possible and block as much as possible, cheaper move on ties"""
+    def choose_offensive(self, driver, moves):
+        return max(moves, key=lambda move: (move.impact, -move.fuel_cost))
+
+    def choose_defensive(self, driver, moves, attack_dmg):
+        return max(moves, key=lambda move: (move.dmg_reduction, -move.fuel_cost))
+
+
+class ScriptedPolicy(Policy):
+    """
+        Plays the given move names in order, one per turn, and falls back to
+        another policy when the script runs out or the scripted move isn't available
+    """
+    def __init__(self, offensive=(), defensive=(), fallback=None, loop=False):
+        self._offensive = list(offensive)
+        self._defensive = list(defensive)
+        self._fallback = fallback or RandomPolicy()
+        self._loop = loop
+        self._offensive_turn = 0
+        self._defensive_turn = 0
+
+    def reset(self):
+        self._offensive_turn = 0
+        self._defensive_turn = 0
+
+    def _next(self, script, turn):
+        if not script:
+            return None
+        if self._loop:
+            return script[turn % len(script)]
+        return script[turn] if turn < len(script) else None
+
+    @staticmethod
+    def _find(moves, name):
+        for move in moves:
+            if move.name == name:
+                return move
+        return None
+
+    def choose_offensive(self, driver, moves):
+        name = self._next(self._offensive, self._offensive_turn)
+        self._offensive_turn += 1
+        return self._find(moves, name) or self._fallback.choose_offensive(driver, moves)
+
+    def choose_defensive(self, driver, moves, attack_dmg):
+        name = self._next(self._defensive, self._defensive_turn)
+        self._defensive_turn += 1
+        return self._find(moves, name) or self._fallback.choose_defensive(driver, moves, attack_dmg)
+
+
+class PolicyDriver(Driver):
+    """A driver built from move tables whose choices come from a Policy"""
+    def __init__(self, name, offensive_moves, defensive_moves, policy,
+                 initial_tire_health=100, initial_fuel=500):
+        super().__init__(name, initial_tire_health, initial_fuel)
+        self.policy = policy
+        self.opponent = None  # set by the engine, for policies that look at the other car
+
+        for move in offensive_moves:
+            self.add_offensive_move(OffensiveMove(*move))
+
+        for move in defensive_moves:
+            self.add_defensive_move(DefensiveMove(*move))
+
+    def choose_offensive_move(self):
+        moves = [move for move in self._offensive_moves if self._fuel >= move.fuel_cost]
+        if not moves:
+            return None
+        return self.policy.choose_offensive(self, moves)
+
+    def choose_defensive_move(self, attack_dmg):
+        moves = [move for move in self._defensive_moves
+                 if self._fuel >= move.fuel_cost and move.uses_remaining > 0]
+        if not moves:
+            return None
+        return self.policy.choose_defensive(self, moves, attack_dmg)
+
+
+def max_factory(policy):
+    """Returns a callable that builds a fresh Max Verstappen for every race"""
+    return lambda: PolicyDriver("Max Verstappen", MAX_OFFENSIVE_MOVES, MAX_DEFENSIVE_MOVES, policy)
+
+
+def hassan_factory(policy):
+    """Returns a callable that builds a fresh Hassan Mostafa for every race"""
+    return lambda: PolicyDriver("Hassan Mostafa", HASSAN_OFFENSIVE_MOVES, HASSAN_DEFENSIVE_MOVES, policy)
+
+
+class RaceStats:
+    """Aggregated outcome of many races"""
+    def __init__(self):
+        self.races = 0
+        self.wins = Counter()          # winner name -> races won, None for draws
+        self.reasons = Counter()       # "tires" / "fuel" / "stalemate"
+        self.rounds = Counter()        # race length -> races
+        self.move_usage = Counter()    # (driver name, move name) -> times used
+
+    def record(self, result):
+        self.races += 1
+        self.wins[result.winner.name if result.winner else None] += 1
+        self.reasons[result.reason] += 1
+        self.rounds[result.rounds] += 1
+
+    def merge(self, other):
+        self.races += other.races
+        self.wins.update(other.wins)
+        self.reasons.update(other.reasons)
+        self.rounds.update(other.rounds)
+        self.move_usage.update(other.move_usage)
+        return self
+
+    def as_dict(self):
+        """Plain, sorted representation (JSON friendly, equal for equal sweeps)"""
+        return {
+            "races": self.races,
+            "wins": {str(name): count for name, count in sorted(self.wins.items(), key=lambda item: str(item[0]))},
+            "reasons": dict(sorted(self.reasons.items())),
+            "rounds": {str(rounds): count for rounds, count in sorted(self.rounds.items())},
+            "move_usage": {f"{driver}/{move}": count for (driver, move), count in sorted(self.move_usage.items())},
+        }
+
+    def win_rates(self):
+        return {name: count / self.races for name, count in self.wins.items()} if self.races else {}
+
+    def mean_rounds(self):
+        if not self.races:
+            return 0.0
+        return sum(rounds * count for rounds, count in self.rounds.items()) / self.races
+
+    def summary(self):
+        lines = [f"Races: {self.races}"]
+        for name, rate in sorted(self.win_rates().items(), key=lambda item: -item[1]):
+            lines.append(f"  {name or 'Draw'}: {rate*100:.2f}%")
+        lines.append(f"Average race length: {self.mean_rounds():.2f} rounds")
+        lines.append("Move usage:")
+        for (driver, move), count in sorted(self.move_usage.items()):
+            lines.append(f"  {driver:<16} {move:<18} {count}")
+        return "\n".join(lines)
+
+
+class BatchRaceEngine:
+    """
+        Runs n races between drivers made by the two factories and returns RaceStats.
+        sink (optional) receives every race event, same as Race's sink.
+    """
+    def __init__(self, driver1_factory, driver2_factory, sink=None):
+        self._driver1_factory = driver1_factory
+        self._driver2_factory = driver2_factory
+        self._sink = sink
+
+    def _usage_sink(self, stats):
+        usage = stats.move_usage
+        forward = self._sink
+
+        def sink(event, **data):
+            if event == "combat":
+                usage[(data["attacker"].name, data["offensive_move"].name)] += 1
+                if data["defense_move"]:
+                    usage[(data["defender"].name, data["defense_move"].name)] += 1
+            if forward:
+                forward(event, **data)
+        return sink
+
+    def run(self, n_races, stats=None):
+        stats = stats or RaceStats()
+        sink = self._usage_sink(stats)
+        for _ in range(n_races):
+            driver1 = self._driver1_factory()
+            driver2 = self._driver2_factory()
+            driver1.opponent, driver2.opponent = driver2, driver1
+            for driver in (driver1, driver2):
+                if isinstance(getattr(driver, "policy", None), ScriptedPolicy):
+                    driver.policy.reset()
+            stats.record(Race(driver1, driver2, sink=sink).run_race())
+        return stats
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+
+    engine = BatchRaceEngine(max_factory(RandomPolicy()), hassan_factory(RandomPolicy()))
+    start = time.perf_counter()
+    stats = engine.run(n)
+    elapsed = time.perf_counter() - start
+
+    print(stats.summary())
+    print(f"\n{n} races in {elapsed:.2f}s ({n/elapsed:.0f} races/sec)")
@@ -0,0 +1,258 @@
+"""
+    Binary race event log.
+
+    RaceLogWriter is a Race / BatchRaceEngine sink that turns every "combat"
+    event into one fixed-width record (RECORD below) and appends it to a log
+    file. The file is a 16 byte header followed by the records, so read_log
+    maps it straight into a numpy structured array: stats over millions of
+    turns are column operations, with no text parsing and no re-simulation.
+    A race can be replayed from its records since they hold every move choice.
+
+        with RaceLogWriter("races.rlog") as log:
+            BatchRaceEngine(max_factory(RandomPolicy()), hassan_factory(RandomPolicy()), sink=log).run(10000)
+        turns = read_log("races.rlog")
+        print(move_effectiveness(turns))
+"""
+import os
+import random
+import struct
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from main import (MAX_OFFENSIVE_MOVES, MAX_DEFENSIVE_MOVES, HASSAN_OFFENSIVE_MOVES, HASSAN_DEFENSIVE_MOVES,
+                  Race)
+from race_engine import BatchRaceEngine, RandomPolicy, ScriptedPolicy, hassan_factory, max_factory
+
+
+MAGIC = b"RLOG"
+VERSION = 1
+HEADER = struct.Struct("<4sHH8x")       # magic, version, record size, padding to 16 bytes
+
+# attacker is 0 for the race's driver1 and 1 for driver2; tire/fuel are after the turn
+RECORD = np.dtype([
+    ("race", "<u4"), ("round", "<u2"), ("attacker", "u1"), ("offense", "u1"), ("defense", "u1"),
+    ("raw_damage", "<f4"), ("final_damage", "<f4"),
+    ("tire1", "<f4"), ("fuel1", "<f4"), ("tire2", "<f4"), ("fuel2", "<f4"),
+], align=False)
+NO_DEFENSE = 255
+
+OFFENSIVE_MOVES = [move[0] for move in MAX_OFFENSIVE_MOVES + HASSAN_OFFENSIVE_MOVES]
+DEFENSIVE_MOVES = [move[0] for move in MAX_DEFENSIVE_MOVES + HASSAN_DEFENSIVE_MOVES]
+OFFENSIVE_IDS = {name: i for i, name in enumerate(OFFENSIVE_MOVES)}
+DEFENSIVE_IDS = {name: i for i, name in enumerate(DEFENSIVE_MOVES)}
+
+
+def _read_header(f):
+    data = f.read(HEADER.size)
+    if len(data) < HEADER.size:
+        raise ValueError("not a race log, or one written by another version")
+    magic, version, size = HEADER.unpack(data)
+    if magic != MAGIC or version != VERSION or size != RECORD.itemsize:
+        raise ValueError("not a race log, or one written by another version")
+
+
+class RaceLogWriter:
+    """
+        Sink that appends a record per turn. Records are buffered and written
+        buffer_records at a time; an existing log is appended to, with race
+        numbers carrying on after its last race
+    """
+    def __init__(self, path, buffer_records=8192):
+        self.path = path
+        self.buffer_records = buffer_records
+        self._pending = []
+        self._race = None
+        self.race_id = -1
+        self.records = 0
+
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        exists = size > 0
+        if exists:
+            with open(path, "rb") as f:
+                _read_header(f)
+            whole = HEADER.size + (size - HEADER.size) // RECORD.itemsize * RECORD.itemsize
+            if whole != size:
+                # appending after the partial record would misalign every record that follows
+                os.truncate(path, whole)
+            last = read_log(path)[-1:]
+            self.race_id = int(last["race"][0]) if len(last) else -1
+        self._file = open(path, "ab")
+        if not exists:
+            self._file.write(HEADER.pack(MAGIC, VERSION, RECORD.itemsize))
+
+    def __call__(self, event, **data):
+        if event == "race_start":
+            self._race = data["race"]
+            self.race_id += 1
+        elif event == "combat":
+            self._record(**data)
+
+    def _record(self, attacker, defender, offensive_move, defense_move, attack_damage, final_damage, **_):
+        race = self._race
+        d1, d2 = race.driver1, race.driver2
+        # plain tuples, turned into records a buffer at a time
+        self._pending.append((
+            self.race_id, race.round_number, 0 if attacker is d1 else 1,
+            OFFENSIVE_IDS[offensive_move.name],
+            DEFENSIVE_IDS[defense_move.name] if defense_move else NO_DEFENSE,
+            attack_damage, final_damage, d1.tire_health, d1.fuel, d2.tire_health, d2.fuel,
+        ))
+        self.records += 1
+        if len(self._pending) >= self.buffer_records:
+            self.flush()
+
+    def flush(self):
+        if self._pending:
+            self._file.write(np.array(self._pending, dtype=RECORD).tobytes())
+            self._file.flush()
+            self._pending = []
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class MemoryLog(RaceLogWriter):
+    """Same records, kept in memory (used to check replays)"""
+    def __init__(self, first_race=0):
+        self.buffer_records = float("inf")
+        self._pending = []
+        self._race = None
+        self.race_id = first_race - 1
+        self.records = 0
+
+    @property
+    def turns(self):
+        return np.array(self._pending, dtype=RECORD)
+
+    def close(self):
+        pass
+
+
+def tee(*sinks):
+    """One sink feeding several, e.g. tee(ConsoleSink(), RaceLogWriter(path)) to print and log"""
+    def sink(event, **data):
+        for s in sinks:
+            s(event, **data)
+    return sink
+
+
+def read_log(path):
+    """The log's records as a read-only memory-mapped structured array"""
+    with open(path, "rb") as f:
+        _read_header(f)
+    n = (os.path.getsize(path) - HEADER.size) // RECORD.itemsize
+    if n == 0:
+        return np.zeros(0, dtype=RECORD)
+    return np.memmap(path, dtype=RECORD, mode="r", offset=HEADER.size, shape=(n,))
+
+
+def race_turns(turns, race_id):
+    """Records of one race (records are appended in race order, so this is a binary search)"""
+    start, stop = np.searchsorted(turns["race"], [race_id, race_id + 1])
+    return turns[start:stop]
+
+
+def replay(turns, race_id, sink=False):
+    """
+        Plays a logged race again with every driver making its logged choices.
+        Returns (RaceResult, records of the replay); the records equal the
+        logged ones for logs written by the standard engines
+    """
+    race_log = race_turns(turns, race_id)
+    scripts = {}
+    for slot in (0, 1):
+        attacks = race_log[race_log["attacker"] == slot]
+        defences = race_log[(race_log["attacker"] != slot) & (race_log["defense"] != NO_DEFENSE)]
+        scripts[slot] = ScriptedPolicy([OFFENSIVE_MOVES[i] for i in attacks["offense"]],
+                                       [DEFENSIVE_MOVES[i] for i in defences["defense"]],
+                                       fallback=RandomPolicy(random.Random(0)))
+
+    driver1, driver2 = max_factory(scripts[0])(), hassan_factory(scripts[1])()
+    driver1.opponent, driver2.opponent = driver2, driver1
+    memory = MemoryLog(race_id)
+    result = Race(driver1, driver2, sink=tee(memory, sink) if sink else memory).run_race()
+    return result, memory.turns
+
+
+def move_effectiveness(turns):
+    """Per move usage and damage figures, from bincounts over the move id columns"""
+    lines = [f"{'Offensive move':<18} {'Uses':>9} {'Mean dealt':>11} {'Blocked %':>10}"]
+    offense = turns["offense"]
+    uses = np.bincount(offense, minlength=len(OFFENSIVE_MOVES))
+    dealt = np.bincount(offense, weights=turns["final_damage"], minlength=len(OFFENSIVE_MOVES))
+    raw = np.bincount(offense, weights=turns["raw_damage"], minlength=len(OFFENSIVE_MOVES))
+    for i, name in enumerate(OFFENSIVE_MOVES):
+        if uses[i]:
+            lines.append(f"{name:<18} {uses[i]:>9} {dealt[i] / uses[i]:>11.2f} {(1 - dealt[i] / raw[i]) * 100:>10.1f}")
+
+    lines.append(f"\n{'Defensive move':<18} {'Uses':>9} {'Mean blocked':>13} {'Blocked %':>10}")
+    defended = turns[turns["defense"] != NO_DEFENSE]
+    blocked = defended["raw_damage"] - defended["final_damage"]
+    uses = np.bincount(defended["defense"], minlength=len(DEFENSIVE_MOVES))
+    total = np.bincount(defended["defense"], weights=blocked, minlength=len(DEFENSIVE_MOVES))
+    faced = np.bincount(defended["defense"], weights=defended["raw_damage"], minlength=len(DEFENSIVE_MOVES))
+    for i, name in enumerate(DEFENSIVE_MOVES):
+        if uses[i]:
+            lines.append(f"{name:<18} {uses[i]:>9} {total[i] / uses[i]:>13.2f} {total[i] / faced[i] * 100:>10.1f}")
+    lines.append(f"{'(no defense)':<18} {len(turns) - len(defended):>9}")
+    return "\n".join(lines)
+
+
+def race_lengths(turns):
+    """Turns per race, indexed by race number"""
+    return np.bincount(turns["race"])
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    path = os.path.join(tempfile.mkdtemp(), "races.rlog")
+    try:
+        engine = BatchRaceEngine(max_factory(RandomPolicy(random.Random(1))),
+                                 hassan_factory(RandomPolicy(random.Random(2))))
+        start = time.perf_counter()
+        engine.run(n)
+        plain_time = time.perf_counter() - start
+
+        with RaceLogWriter(path) as log:
+            logged = BatchRaceEngine(max_factory(RandomPolicy(random.Random(1))),
+                                     hassan_factory(RandomPolicy(random.Random(2))), sink=log)
+            start = time.perf_counter()
+            logged.run(n)
+            log_time = time.perf_counter() - start
+
+        turns = read_log(path)
+        print(f"{n} races, {len(turns)} turns, {os.path.getsize(path) / 1e6:.1f} MB "
+              f"({RECORD.itemsize} bytes per turn)")
+        print(f"simulation {plain_time:.2f}s, with logging {log_time:.2f}s")
+
+        start = time.perf_counter()
+        report = move_effectiveness(turns)
+        lengths = race_lengths(turns)
+        analytics_ms = (time.perf_counter() - start) * 1000
+        print(f"\n{report}")
+        print(f"\nmean turns per race {lengths.mean():.2f}, longest {lengths.max()}; "
+              f"analytics over all turns took {analytics_ms:.1f} ms")
+
+        # every tenth race played again from the log must give the same records
+        checked = range(0, n, 10)
+        start = time.perf_counter()
+        same = all(np.array_equal(replay(turns, race_id)[1], race_turns(turns, race_id)) for race_id in checked)
+        print(f"\nreplayed {len(checked)} races in {time.perf_counter() - start:.2f}s, identical records: {same}")
+
+        # appending keeps the race numbering going
+        with RaceLogWriter(path) as log:
+            BatchRaceEngine(max_factory(RandomPolicy()), hassan_factory(RandomPolicy()), sink=log).run(10)
+        print(f"appended 10 races, last race number now {read_log(path)['race'][-1]}")
+    finally:
+        os.remove(path)
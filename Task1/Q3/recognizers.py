@@ -0,0 +1,153 @@
+"""
+    Speech recognition backends behind one interface, plus an LRU cache of
+    recognition results keyed on a hash of the captured audio.
+
+    google: speech_recognition's Google Web Speech API (needs internet)
+    sphinx: CMU Sphinx, runs locally (needs the pocketsphinx package)
+    stub:   deterministic, for tests and offline runs with fake_audio
+"""
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+import hashlib
+import threading
+import time
+
+import speech_recognition as sr
+
+
+class RecognizerBackend(ABC):
+    name = "backend"
+
+    @abstractmethod
+    def recognize(self, audio):
+        """
+            Returns the transcript, raises sr.UnknownValueError if the audio
+            can't be understood or sr.RequestError if the service failed
+        """
+        pass
+
+
+class GoogleBackend(RecognizerBackend):
+    name = "google"
+
+    def __init__(self, recognizer):
+        self.recognizer = recognizer
+
+    def recognize(self, audio):
+        return self.recognizer.recognize_google(audio)
+
+
+class SphinxBackend(RecognizerBackend):
+    name = "sphinx"
+
+    def __init__(self, recognizer):
+        self.recognizer = recognizer
+
+    def recognize(self, audio):
+        return self.recognizer.recognize_sphinx(audio)
+
+
+class StubBackend(RecognizerBackend):
+    """
+        Looks the raw audio bytes up in `transcripts`; without a table it reads
+        the bytes back as text, which is what fake_audio.FakeAudio carries
+    """
+    name = "stub"
+
+    def __init__(self, transcripts=None, delay=0.0):
+        self.transcripts = transcripts
+        self.delay = delay
+
+    def recognize(self, audio):
+        if self.delay:
+            time.sleep(self.delay)
+        raw = audio.get_raw_data()
+        text = self.transcripts.get(raw) if self.transcripts is not None else raw.decode(errors="ignore")
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+
+BACKENDS = {
+    "google": GoogleBackend,
+    "sphinx": SphinxBackend,
+    "stub": lambda recognizer: StubBackend(),
+}
+
+
+def make_backend(name, recognizer):
+    if name not in BACKENDS:
+        raise ValueError(f"unknown recognizer backend {name!r}, pick one of {sorted(BACKENDS)}")
+    return BACKENDS[name](recognizer)
+
+
+class CachedRecognizer:
+    """
+        Wraps a backend with an LRU cache keyed on the BLAKE2 hash of the audio
+        frames. Results that can't be understood are cached too (the same clip
+        gives the same answer), service errors are not. Thread safe, the voice
+        pipeline recognises on several threads.
+    """
+    _UNKNOWN = object()
+
+    def __init__(self, backend, max_entries=256):
+        self.backend = backend
+        self.max_entries = max_entries
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.latencies = []  # seconds per backend call
+
+    @staticmethod
+    def audio_key(audio):
+        return hashlib.blake2b(audio.get_raw_data(), digest_size=16).digest()
+
+    def recognize(self, audio):
+        key = self.audio_key(audio)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                result = self._cache[key]
+                if result is self._UNKNOWN:
+                    raise sr.UnknownValueError()
+                return result
+            self.misses += 1
+
+        start = time.perf_counter()
+        try:
+            result = self.backend.recognize(audio)
+        except sr.UnknownValueError:
+            result = self._UNKNOWN
+        finally:
+            with self._lock:
+                self.latencies.append(time.perf_counter() - start)
+
+        with self._lock:
+            self._cache[key] = result
+            if len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+        if result is self._UNKNOWN:
+            raise sr.UnknownValueError()
+        return result
+
+    def stats(self):
+        with self._lock:
+            latencies = sorted(self.latencies)
+        lookups = self.hits + self.misses
+
+        def percentile(p):
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000 if latencies else 0.0
+
+        return {
+            "backend": self.backend.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "backend_calls": len(latencies),
+            "mean_ms": sum(latencies) / len(latencies) * 1000 if latencies else 0.0,
+            "p50_ms": percentile(0.50),
+            "p95_ms": percentile(0.95),
+        }
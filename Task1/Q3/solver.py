@@ -0,0 +1,366 @@
+"""
+    Exact solver for Max Verstappen (random AI) vs Hassan Mostafa.
+
+    A state is (Max tire, Max fuel, Hassan tire, Hassan fuel, uses left of every
+    limited defensive move, who attacks). Tire health is kept in tenths and fuel
+    in multiples of the smallest fuel step so everything is an integer, and the
+    whole state is packed into one int key.
+
+    The solver walks every reachable state once and stores, in an
+    open-addressing hash table made of flat typed arrays:
+      - the probability that Hassan wins when he plays optimally from there
+      - the best move: Hassan's offensive move when he attacks, or his best
+        defence against each of Max's offensive moves when Max attacks
+
+    After that one-off solve, "best move in state S" is a single table lookup.
+    The table is saved to disk and reused as long as the move tables don't change.
+"""
+from array import array
+from collections import namedtuple
+from math import gcd
+import hashlib
+import json
+import os
+import sys
+import time
+
+from main import (MAX_OFFENSIVE_MOVES, MAX_DEFENSIVE_MOVES,
+                  HASSAN_OFFENSIVE_MOVES, HASSAN_DEFENSIVE_MOVES)
+from race_engine import Policy
+
+
+# tire health is stored in tenths, every damage in the game is a multiple of 0.1
+TIRE_SCALE = 10
+NO_MOVE = 0xF
+EMPTY = -1
+
+GameState = namedtuple("GameState", ["max_tire", "max_fuel", "hassan_tire", "hassan_fuel",
+                                     "max_uses", "hassan_uses", "hassan_to_move"])
+
+
+class TranspositionTable:
+    """Open-addressing hash table (linear probing) over array('q'/'d'/'I') columns"""
+    def __init__(self, bits=20):
+        self.bits = bits
+        self.mask = (1 << bits) - 1
+        self.keys = array("q", [EMPTY]) * (1 << bits)
+        self.values = array("d", [0.0]) * (1 << bits)
+        self.moves = array("I", [0]) * (1 << bits)
+        self.size = 0
+
+    def _slot(self, key):
+        slot = ((key * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF) >> (64 - self.bits)
+        keys = self.keys
+        while keys[slot] != EMPTY and keys[slot] != key:
+            slot = (slot + 1) & self.mask
+        return slot
+
+    def get(self, key):
+        """Slot index of key, or -1 if it isn't stored"""
+        slot = self._slot(key)
+        return slot if self.keys[slot] == key else -1
+
+    def put(self, key, value, move):
+        if (self.size + 1) * 2 > len(self.keys):
+            self._grow()
+        slot = self._slot(key)
+        if self.keys[slot] == EMPTY:
+            self.size += 1
+        self.keys[slot] = key
+        self.values[slot] = value
+        self.moves[slot] = move
+
+    def _grow(self):
+        old = (self.keys, self.values, self.moves)
+        self.__init__(self.bits + 1)
+        for key, value, move in zip(*old):
+            if key != EMPTY:
+                self.put(key, value, move)
+
+
+class GameSolver:
+    def __init__(self, max_moves=(MAX_OFFENSIVE_MOVES, MAX_DEFENSIVE_MOVES),
+                 hassan_moves=(HASSAN_OFFENSIVE_MOVES, HASSAN_DEFENSIVE_MOVES),
+                 initial_tire_health=100, initial_fuel=500):
+        self.max_offensive, self.max_defensive = max_moves
+        self.hassan_offensive, self.hassan_defensive = hassan_moves
+        if len(self.max_offensive) > 8 or len(self.hassan_defensive) >= NO_MOVE:
+            raise ValueError("too many moves to pack Hassan's defensive policy into 32 bits")
+
+        self.initial_tire = self._tenths(initial_tire_health)
+        costs = [move[1] for moves in (*max_moves, *hassan_moves) for move in moves]
+        self.fuel_unit = gcd(initial_fuel, *costs)
+        self.initial_fuel = initial_fuel // self.fuel_unit
+
+        # moves in fuel units and damage kept per (attack, defence) in tenths
+        self._max_off = [(m[1] // self.fuel_unit, self._tenths(m[2])) for m in self.max_offensive]
+        self._hassan_off = [(m[1] // self.fuel_unit, self._tenths(m[2])) for m in self.hassan_offensive]
+        self._max_def = [(m[1] // self.fuel_unit, 1 - m[2]) for m in self.max_defensive]
+        self._hassan_def = [(m[1] // self.fuel_unit, 1 - m[2]) for m in self.hassan_defensive]
+        self._max_limited = [i for i, m in enumerate(self.max_defensive) if len(m) > 4 and m[4]]
+        self._hassan_limited = [i for i, m in enumerate(self.hassan_defensive) if len(m) > 4 and m[4]]
+        self._max_start_uses = tuple(self.max_defensive[i][4] for i in self._max_limited)
+        self._hassan_start_uses = tuple(self.hassan_defensive[i][4] for i in self._hassan_limited)
+
+        # key layout: bit widths of every field, low to high
+        self._tire_bits = self.initial_tire.bit_length()
+        self._fuel_bits = self.initial_fuel.bit_length()
+        self._uses_bits = [uses.bit_length() for uses in self._max_start_uses + self._hassan_start_uses]
+
+        self.table = TranspositionTable()
+        self.fingerprint = hashlib.sha256(json.dumps(
+            [max_moves, hassan_moves, initial_tire_health, initial_fuel]).encode()).hexdigest()
+
+    @staticmethod
+    def _tenths(value):
+        scaled = round(value * TIRE_SCALE)
+        if abs(scaled - value * TIRE_SCALE) > 1e-9:
+            raise ValueError(f"{value} is not a multiple of {1 / TIRE_SCALE}")
+        return scaled
+
+    @staticmethod
+    def _damage(impact, keep):
+        dmg = impact * keep
+        if abs(dmg - round(dmg)) > 1e-6:
+            raise ValueError(f"damage {dmg / TIRE_SCALE} is not a multiple of {1 / TIRE_SCALE}")
+        return round(dmg)
+
+    def initial_state(self):
+        return GameState(self.initial_tire, self.initial_fuel, self.initial_tire, self.initial_fuel,
+                         self._max_start_uses, self._hassan_start_uses, False)
+
+    def state_from_drivers(self, max_driver, hassan_driver, hassan_to_move):
+        """Build the solver state of a live race (drivers from main.py or race_engine)"""
+        def uses(driver, limited):
+            return tuple(int(driver._defensive_moves[i].uses_remaining) for i in limited)
+
+        return GameState(round(max_driver.tire_health * TIRE_SCALE), max_driver.fuel // self.fuel_unit,
+                         round(hassan_driver.tire_health * TIRE_SCALE), hassan_driver.fuel // self.fuel_unit,
+                         uses(max_driver, self._max_limited), uses(hassan_driver, self._hassan_limited),
+                         hassan_to_move)
+
+    def pack(self, state):
+        key = state.max_tire
+        shift = self._tire_bits
+        for value, bits in ((state.hassan_tire, self._tire_bits),
+                            (state.max_fuel, self._fuel_bits),
+                            (state.hassan_fuel, self._fuel_bits),
+                            *zip(state.max_uses + state.hassan_uses, self._uses_bits)):
+            key |= value << shift
+            shift += bits
+        return key | (int(state.hassan_to_move) << shift)
+
+    # --- solving ---------------------------------------------------------
+
+    def _available_defences(self, moves, limited, fuel, uses):
+        available = []
+        for i, (cost, keep) in enumerate(moves):
+            if fuel < cost:
+                continue
+            if i in limited and uses[limited.index(i)] <= 0:
+                continue
+            available.append(i)
+        return available
+
+    @staticmethod
+    def _spend(uses, limited, i):
+        if i not in limited:
+            return uses
+        j = limited.index(i)
+        return uses[:j] + (uses[j] - 1,) + uses[j + 1:]
+
+    def _max_turn(self, s):
+        """Children of a state where Max attacks: {max move: {hassan defence: child}}"""
+        options = {}
+        for i, (cost, impact) in enumerate(self._max_off):
+            if s.max_fuel < cost:
+                continue
+            defences = self._available_defences(self._hassan_def, self._hassan_limited,
+                                                s.hassan_fuel, s.hassan_uses)
+            children = {}
+            for d in defences or [NO_MOVE]:
+                if d == NO_MOVE:
+                    dmg, def_cost, uses = impact, 0, s.hassan_uses
+                else:
+                    def_cost, keep = self._hassan_def[d]
+                    dmg = self._damage(impact, keep)
+                    uses = self._spend(s.hassan_uses, self._hassan_limited, d)
+                children[d] = s._replace(max_fuel=s.max_fuel - cost,
+                                         hassan_tire=max(0, s.hassan_tire - dmg),
+                                         hassan_fuel=s.hassan_fuel - def_cost,
+                                         hassan_uses=uses, hassan_to_move=True)
+            options[i] = children
+        return options
+
+    def _hassan_turn(self, s):
+        """Children of a state where Hassan attacks: {hassan move: [child per Max defence]}"""
+        options = {}
+        for i, (cost, impact) in enumerate(self._hassan_off):
+            if s.hassan_fuel < cost:
+                continue
+            defences = self._available_defences(self._max_def, self._max_limited,
+                                                s.max_fuel, s.max_uses)
+            children = []
+            for d in defences or [NO_MOVE]:
+                if d == NO_MOVE:
+                    dmg, def_cost, uses = impact, 0, s.max_uses
+                else:
+                    def_cost, keep = self._max_def[d]
+                    dmg = self._damage(impact, keep)
+                    uses = self._spend(s.max_uses, self._max_limited, d)
+                children.append(s._replace(max_tire=max(0, s.max_tire - dmg),
+                                           max_fuel=s.max_fuel - def_cost,
+                                           hassan_fuel=s.hassan_fuel - cost,
+                                           max_uses=uses, hassan_to_move=False))
+            options[i] = children
+        return options
+
+    def _value(self, s):
+        """P(Hassan wins) from s under optimal play, memoized in the table"""
+        key = self.pack(s)
+        slot = self.table.get(key)
+        if slot >= 0:
+            return self.table.values[slot]
+
+        move = 0
+        max_alive = s.max_tire > 0 and s.max_fuel > 0
+        if not max_alive or not (s.hassan_tire > 0 and s.hassan_fuel > 0):
+            # same rule as Race._result: driver1 (Max) wins if he's still alive
+            value = 0.0 if max_alive else 1.0
+        else:
+            options = self._hassan_turn(s) if s.hassan_to_move else self._max_turn(s)
+            if not options:
+                other = s._replace(hassan_to_move=not s.hassan_to_move)
+                if (self._max_turn(other) if s.hassan_to_move else self._hassan_turn(other)):
+                    value = self._value(other)
+                else:
+                    # nobody can move anymore, higher tire health wins, draws count as a loss
+                    value = 1.0 if s.hassan_tire > s.max_tire else 0.0
+            elif s.hassan_to_move:
+                # Hassan picks the attack, Max defends at random
+                value = -1.0
+                for i, children in options.items():
+                    v = sum(self._value(child) for child in children) / len(children)
+                    if v > value:
+                        value, move = v, i
+            else:
+                # Max attacks at random, Hassan picks the best defence
+                value = 0.0
+                move = 0xFFFFFFFF
+                for i, children in options.items():
+                    best, best_d = -1.0, NO_MOVE
+                    for d, child in children.items():
+                        v = self._value(child)
+                        if v > best:
+                            best, best_d = v, d
+                    value += best / len(options)
+                    move = (move & ~(NO_MOVE << (4 * i))) | (best_d << (4 * i))
+
+        self.table.put(key, value, move)
+        return value
+
+    def solve(self):
+        """Solve every state reachable from the start, returns Hassan's win probability"""
+        return self._value(self.initial_state())
+
+    # --- queries ---------------------------------------------------------
+
+    def _lookup(self, state):
+        slot = self.table.get(self.pack(state))
+        if slot < 0:
+            raise KeyError(f"state {state} was never reached, call solve() first")
+        return slot
+
+    def win_probability(self, state):
+        return self.table.values[self._lookup(state)]
+
+    def best_offensive_move(self, state):
+        """Name of Hassan's best attack in a state where he attacks"""
+        if not state.hassan_to_move:
+            raise ValueError("it's Max's turn to attack")
+        if not any(state.hassan_fuel >= cost for cost, _ in self._hassan_off):
+            return None
+        return self.hassan_offensive[self.table.moves[self._lookup(state)]][0]
+
+    def best_defensive_move(self, state, attack_dmg):
+        """Name of Hassan's best defence against a Max attack of attack_dmg (None = no defence left)"""
+        if state.hassan_to_move:
+            raise ValueError("it's Hassan's turn to attack")
+        packed = self.table.moves[self._lookup(state)]
+        for i, move in enumerate(self.max_offensive):
+            if move[2] == attack_dmg and state.max_fuel >= self._max_off[i][0]:
+                d = (packed >> (4 * i)) & NO_MOVE
+                return None if d == NO_MOVE else self.hassan_defensive[d][0]
+        raise ValueError(f"Max has no affordable attack dealing {attack_dmg}")
+
+    # --- persistence -----------------------------------------------------
+
+    def save(self, path):
+        table = self.table
+        header = json.dumps({"fingerprint": self.fingerprint, "bits": table.bits,
+                             "size": table.size}).encode()
+        with open(path, "wb") as f:
+            f.write(len(header).to_bytes(4, "little") + header)
+            table.keys.tofile(f)
+            table.values.tofile(f)
+            table.moves.tofile(f)
+
+    def load(self, path):
+        """Load a saved table, returns False if it was built from different move tables"""
+        with open(path, "rb") as f:
+            header = json.loads(f.read(int.from_bytes(f.read(4), "little")))
+            if header["fingerprint"] != self.fingerprint:
+                return False
+            table = TranspositionTable.__new__(TranspositionTable)
+            table.bits = header["bits"]
+            table.mask = (1 << table.bits) - 1
+            table.size = header["size"]
+            for name, typecode in (("keys", "q"), ("values", "d"), ("moves", "I")):
+                column = array(typecode)
+                column.fromfile(f, 1 << table.bits)
+                setattr(table, name, column)
+        self.table = table
+        return True
+
+    @classmethod
+    def load_or_solve(cls, path="solver_table.bin", **kwargs):
+        solver = cls(**kwargs)
+        if os.path.exists(path) and solver.load(path):
+            return solver
+        solver.solve()
+        solver.save(path)
+        return solver
+
+
+class SolverPolicy(Policy):
+    """race_engine policy that plays Hassan's optimal moves from a solved table"""
+    def __init__(self, solver):
+        self._solver = solver
+
+    def choose_offensive(self, driver, moves):
+        state = self._solver.state_from_drivers(driver.opponent, driver, True)
+        name = self._solver.best_offensive_move(state)
+        return next(move for move in moves if move.name == name)
+
+    def choose_defensive(self, driver, moves, attack_dmg):
+        state = self._solver.state_from_drivers(driver.opponent, driver, False)
+        name = self._solver.best_defensive_move(state, attack_dmg)
+        return next(move for move in moves if move.name == name)
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else "solver_table.bin"
+
+    start = time.perf_counter()
+    solver = GameSolver.load_or_solve(path)
+    print(f"Table ready in {time.perf_counter() - start:.2f}s ({solver.table.size} states)")
+
+    state = solver.initial_state()
+    print(f"Hassan's win probability with optimal play: {solver.win_probability(state)*100:.2f}%")
+    for attack in MAX_OFFENSIVE_MOVES:
+        print(f"Best defence against {attack[0]} on the opening turn: {solver.best_defensive_move(state, attack[2])}")
+
+    from race_engine import BatchRaceEngine, RandomPolicy, max_factory, hassan_factory
+    n = 20000
+    stats = BatchRaceEngine(max_factory(RandomPolicy()), hassan_factory(SolverPolicy(solver))).run(n)
+    print(f"Simulated win rate over {n} races: {stats.win_rates().get('Hassan Mostafa', 0)*100:.2f}%")
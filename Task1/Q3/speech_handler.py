@@ -1,9 +1,102 @@
 import speech_recognition as sr
+from concurrent.futures import ThreadPoolExecutor
+import queue
+import threading
+
+from command_matcher import KeywordMatcher
+from recognizers import CachedRecognizer, RecognizerBackend, make_backend
+
+
+class VoicePipeline:
+    """
+        Keeps the microphone open on a background thread and records phrase after
+        phrase. Each recorded phrase is handed to a recognition worker right away,
+        so recognising attempt N overlaps capturing attempt N+1.
+    """
+    def __init__(self, recognizer, microphone, recognize=None, phrase_timeout=8, recognition_workers=2):
+        self.recognizer = recognizer
+        self.microphone = microphone
+        self.recognize = recognize or recognizer.recognize_google
+        self.phrase_timeout = phrase_timeout
+        self._results = queue.Queue()   # futures of recognised text, in capture order
+        self._executor = ThreadPoolExecutor(max_workers=recognition_workers)
+        self._running = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._running.is_set()
+
+    def start(self):
+        if self.running:
+            return
+        self._running.set()
+        self._thread = threading.Thread(target=self._capture, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running.clear()
+        if self._thread:
+            self._thread.join(timeout=self.phrase_timeout + 1)
+        self._executor.shutdown(wait=False)
+
+    def _capture(self):
+        # one microphone context for the whole game instead of one per attempt
+        with self.microphone as source:
+            while self._running.is_set():
+                try:
+                    audio = self.recognizer.listen(source, timeout=self.phrase_timeout)
+                except sr.WaitTimeoutError:
+                    continue
+                try:
+                    self._results.put(self._executor.submit(self._recognize, audio))
+                except RuntimeError:
+                    # executor already shut down (stop() or interpreter exit)
+                    return
+
+    def _recognize(self, audio):
+        try:
+            return self.recognize(audio).lower()
+        except sr.UnknownValueError:
+            return None
+        except sr.RequestError as e:
+            print(f"Error with speech service: {e}")
+            return None
+
+    def flush(self):
+        """Drop phrases captured before now (e.g. talking during Max's turn)"""
+        while True:
+            try:
+                self._results.get_nowait()
+            except queue.Empty:
+                return
+
+    def next_command(self, timeout=8):
+        """
+            Text of the next phrase, None if nothing was said within timeout
+            or it couldn't be recognised
+        """
+        try:
+            future = self._results.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        return future.result()
+
 
 class SpeechHandler:
-    def __init__(self):
-        self.recognizer = sr.Recognizer()
-        self.microphone = sr.Microphone()
+    def __init__(self, recognizer=None, microphone=None, backend="google", cache_size=256):
+        """
+            recognizer / microphone default to speech_recognition's, pass fakes
+            (see fake_audio.py) to run without a microphone or network.
+            backend is "google", "sphinx", "stub" or a RecognizerBackend; its
+            results are cached by audio hash (see recognizers.py)
+        """
+        self.recognizer = recognizer or sr.Recognizer()
+        self.microphone = microphone or sr.Microphone()
+        if not isinstance(backend, RecognizerBackend):
+            backend = make_backend(backend, self.recognizer)
+        self.recognition = CachedRecognizer(backend, cache_size)
+        self._pipeline = None
 
         #check for background noise
         print("Adjusting for background noise...")
@@ -24,7 +117,7 @@ class SpeechHandler:
 
             print("processing you command...")
 
-            command = self.recognizer.recognize_google(audio)
+            command = self.recognition.recognize(audio)
             print(f"You said: {command}")
             return command.lower()
         
@@ -37,8 +130,42 @@ class SpeechHandler:
         except sr.RequestError as e:
             print(f"Error with speech service: {e}")
 
+    def start_listening(self, timeout=8):
+        """Start recording in the background (no-op if already started)"""
+        if self._pipeline is None:
+            self._pipeline = VoicePipeline(self.recognizer, self.microphone, self.recognition.recognize,
+                                           phrase_timeout=timeout)
+        self._pipeline.start()
+
+    def stop_listening(self):
+        if self._pipeline is not None:
+            self._pipeline.stop()
+            self._pipeline = None
+
+    def flush(self):
+        if self._pipeline is not None:
+            self._pipeline.flush()
+
+    def recognition_stats(self):
+        """Cache hits/misses and backend latency, see CachedRecognizer.stats"""
+        return self.recognition.stats()
+
+    def next_command(self, timeout=8):
+        """
+            Pipelined version of listen_for_command, reads the next phrase
+            recorded by the background pipeline
+        """
+        self.start_listening(timeout)
+        print("Listening... Say your command!")
+        command = self._pipeline.next_command(timeout)
+        if command is None:
+            print("Sorry, I didn't catch that. please try again")
+        else:
+            print(f"You said: {command}")
+        return command
+
 class VoiceCommandMapper:
-    def __init__(self):
+    def __init__(self, fuzzy_cutoff=0.8):
         self.offensive_commands = {
             # Hassan's offensive moves
             "turbo start": "Turbo Start",
@@ -70,18 +197,24 @@ class VoiceCommandMapper:
             "defense": "Slipstream Cut",
             "defend":  "Slipstream Cut"
         }
+
+        # compiled once, the longest alias in the transcript wins
+        self._offensive_matcher = KeywordMatcher(self.offensive_commands, fuzzy_cutoff)
+        self._defensive_matcher = KeywordMatcher(self.defensive_commands, fuzzy_cutoff)
+
+    def add_offensive_command(self, keyword, move_name):
+        self.offensive_commands[keyword] = move_name
+        self._offensive_matcher.add(keyword, move_name)
+
+    def add_defensive_command(self, keyword, move_name):
+        self.defensive_commands[keyword] = move_name
+        self._defensive_matcher.add(keyword, move_name)
     
     def map_offensive_command(self, voice_command):
-        for keyword, move_name in self.offensive_commands.items():
-            if keyword in voice_command:
-                return move_name
-        return None
+        return self._offensive_matcher.match(voice_command)
     
     def map_defensive_command(self, voice_command):
-        for keyword, move_name in self.defensive_commands.items():
-            if keyword in voice_command:
-                return move_name
-        return None
+        return self._defensive_matcher.match(voice_command)
     
     def get_available_commands(self):
         """Return list of available voice commands"""
@@ -0,0 +1,94 @@
+"""
+    Multi-core race sweeps.
+
+    The races are cut into fixed size batches and spread over a process pool.
+    Every batch gets its own RNG seeded from (master_seed, batch index), and the
+    RNG is handed to the drivers' policies instead of using the global random
+    module. Since the seed depends on the batch and not on which worker runs it,
+    the same master seed gives bit-identical stats for any number of workers.
+"""
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import os
+import random
+import sys
+import time
+
+from race_engine import (BatchRaceEngine, GreedyPolicy, RandomPolicy, RaceStats,
+                         max_factory, hassan_factory)
+
+
+def derive_seed(master_seed, batch):
+    """Independent 64 bit seed for one batch, derived from the master seed"""
+    digest = hashlib.sha256(f"{master_seed}:{batch}".encode()).digest()
+    return int.from_bytes(digest[:8], "little")
+
+
+def make_policy(spec, rng):
+    """spec is "random", "greedy" or a picklable callable taking the batch RNG"""
+    if spec == "random":
+        return RandomPolicy(rng)
+    if spec == "greedy":
+        return GreedyPolicy()
+    if callable(spec):
+        return spec(rng)
+    raise ValueError(f"unknown policy {spec!r}")
+
+
+def run_batch(task):
+    """Worker entry point: plays one batch and returns its RaceStats"""
+    engine, max_policy, hassan_policy, n_races, seed = task
+
+    if engine == "vector":
+        from vector_engine import VectorRaceEngine, max_side, hassan_side
+        return VectorRaceEngine(max_side(max_policy), hassan_side(hassan_policy), seed=seed).run(n_races)
+
+    rng = random.Random(seed)
+    return BatchRaceEngine(max_factory(make_policy(max_policy, rng)),
+                           hassan_factory(make_policy(hassan_policy, rng))).run(n_races)
+
+
+def run_sweep(n_races, master_seed=0, workers=None, batch_size=10000, engine="object",
+              max_policy="random", hassan_policy="random"):
+    """
+        Plays n_races Max vs Hassan races on `workers` processes (all cores by default)
+        and returns the merged RaceStats. engine is "object" or "vector".
+    """
+    if engine not in ("object", "vector"):
+        raise ValueError(f"engine should be 'object' or 'vector', got {engine!r}")
+
+    tasks = []
+    for batch, start in enumerate(range(0, n_races, batch_size)):
+        size = min(batch_size, n_races - start)
+        tasks.append((engine, max_policy, hassan_policy, size, derive_seed(master_seed, batch)))
+
+    stats = RaceStats()
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for task in tasks:
+            stats.merge(run_batch(task))
+        return stats
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for batch_stats in pool.map(run_batch, tasks):
+            stats.merge(batch_stats)
+    return stats
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+
+    start = time.perf_counter()
+    single = run_sweep(n, master_seed=42, workers=1)
+    single_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    parallel = run_sweep(n, master_seed=42, workers=workers)
+    parallel_time = time.perf_counter() - start
+
+    print(parallel.summary())
+    print(f"\n1 worker:  {single_time:.2f}s ({n/single_time:.0f} races/sec)")
+    print(f"{workers} workers: {parallel_time:.2f}s ({n/parallel_time:.0f} races/sec)")
+    print(f"Speedup: {single_time/parallel_time:.2f}x")
+    print(f"Bit-identical results: {single.as_dict() == parallel.as_dict()}")
@@ -0,0 +1,67 @@
+import random
+
+import pytest
+
+from command_matcher import KeywordMatcher
+from speech_handler import VoiceCommandMapper
+
+
+def naive_find_all(keywords, text):
+    text = text.lower()
+    return sorted((i, keyword) for keyword in keywords
+                  for i in range(len(text) - len(keyword) + 1) if text.startswith(keyword, i))
+
+
+def test_find_all_matches_a_naive_search():
+    rng = random.Random(0)
+    keywords = ["ab", "b", "bab", "abc", "c", "aab", "ba"]
+    matcher = KeywordMatcher({keyword: keyword for keyword in keywords})
+    for _ in range(300):
+        text = "".join(rng.choice("abc ") for _ in range(rng.randint(0, 30)))
+        assert sorted(matcher.find_all(text)) == naive_find_all(keywords, text)
+
+
+@pytest.mark.parametrize("text, move", [
+    ("turbo start", "Turbo Start"),
+    ("START NOW", "Turbo Start"),
+    ("go corner then charge", "Corner Mastery"),       # same length: the one said first
+    ("mercedes attack from the corner", "Mercedes Charge"),
+    ("corner expert mercedes", "Corner Mastery"),       # longest alias wins
+    ("turbo stat", "Turbo Start"),                      # fuzzy
+    ("pit stop", None),
+    ("", None),
+    (None, None),
+])
+def test_offensive_commands(text, move):
+    assert VoiceCommandMapper().map_offensive_command(text) == move
+
+
+@pytest.mark.parametrize("text, move", [
+    ("aggressive block", "Aggressive Block"),
+    ("blok", "Aggressive Block"),
+    ("slipstream cut", "Slipstream Cut"),
+    ("cut and block", "Aggressive Block"),             # "block" is longer than "cut"
+])
+def test_defensive_commands(text, move):
+    assert VoiceCommandMapper().map_defensive_command(text) == move
+
+
+def test_equal_keywords_at_the_same_place_go_to_the_first_added():
+    matcher = KeywordMatcher()
+    matcher.add("go", "first")
+    matcher.add("GO", "second")     # same keyword, new value, keeps its place
+    matcher.add("on", "third")
+    assert matcher.match("go") == "second" and len(matcher) == 2
+    assert matcher.match("on go") == "third"
+
+
+def test_added_keywords_are_matched_after_a_match():
+    mapper = VoiceCommandMapper()
+    assert mapper.map_offensive_command("overtake") is None
+    mapper.add_offensive_command("overtake", "Mercedes Charge")
+    assert mapper.map_offensive_command("overtake now") == "Mercedes Charge"
+
+
+def test_fuzzy_matching_can_be_turned_off():
+    assert KeywordMatcher({"block": 1}, fuzzy_cutoff=None).match("blok") is None
+    assert KeywordMatcher({"block": 1}).match("blok") == 1
@@ -0,0 +1,71 @@
+import random
+
+import pytest
+
+from race_engine import (BatchRaceEngine, GreedyPolicy, RaceStats, RandomPolicy, ScriptedPolicy, hassan_factory,
+                         max_factory)
+
+
+def random_engine(seed, sink=None):
+    return BatchRaceEngine(max_factory(RandomPolicy(random.Random(seed))),
+                           hassan_factory(RandomPolicy(random.Random(seed + 1))), sink=sink)
+
+
+def test_stats_add_up():
+    stats = random_engine(0).run(500)
+    assert stats.races == 500
+    assert sum(stats.wins.values()) == sum(stats.reasons.values()) == sum(stats.rounds.values()) == 500
+    assert set(stats.reasons) <= {"tires", "fuel", "stalemate"}
+    assert sum(stats.win_rates().values()) == pytest.approx(1.0)
+
+
+def test_seeded_policies_repeat_exactly():
+    assert random_engine(3).run(300).as_dict() == random_engine(3).run(300).as_dict()
+    assert random_engine(3).run(300).as_dict() != random_engine(4).run(300).as_dict()
+
+
+def test_runs_merge_like_one_run():
+    engine = random_engine(5)
+    merged = engine.run(100).merge(engine.run(150))
+    engine = random_engine(5)
+    stats = engine.run(100)
+    assert engine.run(150, stats).as_dict() == merged.as_dict()
+
+
+def test_move_usage_counts_every_combat():
+    events = []
+    stats = random_engine(1, sink=lambda event, **data: events.append((event, data))).run(50)
+    combats = [data for event, data in events if event == "combat"]
+    defended = [data for data in combats if data["defense_move"]]
+    assert sum(stats.move_usage.values()) == len(combats) + len(defended)
+    assert sum(1 for event, _ in events if event == "race_start") == 50
+
+
+def test_silent_by_default(capsys):
+    random_engine(0).run(20)
+    assert capsys.readouterr().out == ""
+
+
+def test_greedy_policy_picks_the_biggest_move():
+    stats = BatchRaceEngine(max_factory(GreedyPolicy()), hassan_factory(GreedyPolicy())).run(3)
+    attacks = {move for (driver, move) in stats.move_usage if driver == "Hassan Mostafa"}
+    assert "Mercedes Charge" in attacks and "Corner Mastery" not in attacks
+    assert stats.rounds and len(stats.rounds) == 1        # greedy against greedy is deterministic
+
+
+def test_scripted_policy_restarts_every_race():
+    events = []
+    script = ScriptedPolicy(["Corner Mastery", "Turbo Start"], fallback=GreedyPolicy())
+    engine = BatchRaceEngine(max_factory(GreedyPolicy()), hassan_factory(script),
+                             sink=lambda event, **data: events.append((event, data)))
+    engine.run(2)
+    hassan = [data["offensive_move"].name for event, data in events
+              if event == "combat" and data["attacker"].name == "Hassan Mostafa"]
+    half = len(hassan) // 2
+    assert hassan[:3] == ["Corner Mastery", "Turbo Start", "Mercedes Charge"]
+    assert hassan[:half] == hassan[half:]
+
+
+def test_empty_stats():
+    stats = RaceStats()
+    assert stats.win_rates() == {} and stats.mean_rounds() == 0.0
@@ -0,0 +1,70 @@
+import random
+
+import numpy as np
+import pytest
+
+from race_engine import BatchRaceEngine, RandomPolicy, hassan_factory, max_factory
+from race_log import HEADER, RECORD, MemoryLog, RaceLogWriter, race_lengths, read_log, replay
+
+
+def engine(sink, seed=1):
+    return BatchRaceEngine(max_factory(RandomPolicy(random.Random(seed))),
+                           hassan_factory(RandomPolicy(random.Random(seed + 1))), sink=sink)
+
+
+@pytest.fixture
+def log(tmp_path):
+    path = tmp_path / "races.rlog"
+    with RaceLogWriter(path, buffer_records=50) as writer:
+        engine(writer).run(100)
+    return path
+
+
+def test_log_has_every_turn(log):
+    turns = read_log(log)
+    assert len(turns) > 100
+    assert np.array_equal(np.unique(turns["race"]), np.arange(100))
+    assert race_lengths(turns).sum() == len(turns)
+    assert (np.diff(turns["race"].astype(int)) >= 0).all()
+
+
+def test_memory_log_matches_the_file(log):
+    memory = MemoryLog()
+    engine(memory).run(100)
+    assert np.array_equal(memory.turns, np.asarray(read_log(log)))
+
+
+@pytest.mark.parametrize("race_id", [0, 1, 37, 99])
+def test_replay_gives_the_logged_records(log, race_id):
+    turns = read_log(log)
+    _, replayed = replay(turns, race_id)
+    assert np.array_equal(replayed, np.asarray(turns[turns["race"] == race_id]))
+
+
+def test_appending_continues_the_race_numbers(log):
+    before = len(read_log(log))
+    with RaceLogWriter(log) as writer:
+        engine(writer, seed=5).run(10)
+    turns = read_log(log)
+    assert np.array_equal(np.unique(turns["race"]), np.arange(110))
+    assert len(turns) > before
+
+
+def test_partial_record_is_dropped_before_appending(log):
+    before = np.array(read_log(log))
+    with open(log, "ab") as f:
+        f.write(b"\x01" * (RECORD.itemsize // 2))      # a crash in the middle of a write
+    with RaceLogWriter(log) as writer:
+        engine(writer, seed=5).run(3)
+    turns = read_log(log)
+    assert np.array_equal(np.asarray(turns[:len(before)]), before)
+    assert np.array_equal(np.unique(turns[len(before):]["race"]), [100, 101, 102])
+
+
+def test_not_a_log(tmp_path):
+    path = tmp_path / "other.rlog"
+    path.write_bytes(b"RLOG" + bytes(HEADER.size))
+    with pytest.raises(ValueError):
+        read_log(path)
+    with pytest.raises(ValueError):
+        RaceLogWriter(path)
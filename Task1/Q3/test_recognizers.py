@@ -0,0 +1,79 @@
+import pytest
+import speech_recognition as sr
+
+from fake_audio import FakeAudio, FakeRecognizer
+from recognizers import CachedRecognizer, GoogleBackend, RecognizerBackend, StubBackend, make_backend
+
+
+class CountingBackend(RecognizerBackend):
+    name = "counting"
+
+    def __init__(self, fail=()):
+        self.calls = []
+        self.fail = list(fail)
+
+    def recognize(self, audio):
+        self.calls.append(audio.text)
+        if self.fail:
+            raise self.fail.pop(0)
+        if audio.text is None:
+            raise sr.UnknownValueError()
+        return audio.text
+
+
+def test_repeated_audio_is_recognized_once():
+    backend = CountingBackend()
+    cache = CachedRecognizer(backend)
+    assert [cache.recognize(FakeAudio(text)) for text in ["block", "corner", "block", "block"]] == \
+        ["block", "corner", "block", "block"]
+    assert backend.calls == ["block", "corner"]
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["backend_calls"]) == (2, 2, 2)
+    assert stats["hit_rate"] == 0.5 and stats["backend"] == "counting"
+
+
+def test_least_recently_used_entry_goes_first():
+    backend = CountingBackend()
+    cache = CachedRecognizer(backend, max_entries=2)
+    for text in ["a", "b", "a", "c", "a", "b"]:
+        cache.recognize(FakeAudio(text))
+    # "b" was the oldest when "c" came in, "a" stayed because it was used again
+    assert backend.calls == ["a", "b", "c", "b"]
+
+
+def test_unintelligible_audio_is_cached_service_errors_are_not():
+    backend = CountingBackend()
+    cache = CachedRecognizer(backend)
+    for _ in range(2):
+        with pytest.raises(sr.UnknownValueError):
+            cache.recognize(FakeAudio(None))
+    backend.fail = [sr.RequestError("offline")]
+    with pytest.raises(sr.RequestError):
+        cache.recognize(FakeAudio("block"))
+    assert cache.recognize(FakeAudio("block")) == "block"
+    assert backend.calls == [None, "block", "block"]
+
+
+def test_cache_size_zero_always_calls_the_backend():
+    backend = CountingBackend()
+    cache = CachedRecognizer(backend, max_entries=0)
+    for _ in range(3):
+        cache.recognize(FakeAudio("block"))
+    assert len(backend.calls) == 3
+
+
+def test_stub_backend():
+    assert StubBackend().recognize(FakeAudio("turbo start")) == "turbo start"
+    table = StubBackend({b"x": "block"})
+    assert table.recognize(FakeAudio("x")) == "block"
+    with pytest.raises(sr.UnknownValueError):
+        table.recognize(FakeAudio("y"))
+
+
+def test_make_backend():
+    recognizer = FakeRecognizer([], 0, 0)
+    assert isinstance(make_backend("google", recognizer), GoogleBackend)
+    assert make_backend("google", recognizer).recognize(FakeAudio("block")) == "block"
+    assert isinstance(make_backend("stub", recognizer), StubBackend)
+    with pytest.raises(ValueError):
+        make_backend("whisper", recognizer)
@@ -0,0 +1,88 @@
+import random
+
+import pytest
+
+from main import HASSAN_DEFENSIVE_MOVES, HASSAN_OFFENSIVE_MOVES, MAX_DEFENSIVE_MOVES, MAX_OFFENSIVE_MOVES
+from race_engine import BatchRaceEngine, PolicyDriver, RandomPolicy
+from solver import EMPTY, GameSolver, SolverPolicy, TranspositionTable
+
+
+# Hassan with Max's own moves and shorter races: solves in a moment and Hassan can still lose
+MIRROR = dict(hassan_moves=(MAX_OFFENSIVE_MOVES, MAX_DEFENSIVE_MOVES), initial_tire_health=30, initial_fuel=300)
+
+
+@pytest.fixture(scope="module")
+def solver():
+    solver = GameSolver(**MIRROR)
+    solver.solve()
+    return solver
+
+
+def mirror_race_engine(hassan_policy, seed=0):
+    def driver(name, policy):
+        return lambda: PolicyDriver(name, MAX_OFFENSIVE_MOVES, MAX_DEFENSIVE_MOVES, policy,
+                                    initial_tire_health=30, initial_fuel=300)
+    return BatchRaceEngine(driver("Max Verstappen", RandomPolicy(random.Random(seed))),
+                           driver("Hassan Mostafa", hassan_policy))
+
+
+def test_optimal_play_wins_as_often_as_solved(solver):
+    p = solver.win_probability(solver.initial_state())
+    assert 0.9 < p < 1
+    n = 3000
+    rate = mirror_race_engine(SolverPolicy(solver)).run(n).win_rates().get("Hassan Mostafa", 0.0)
+    assert abs(rate - p) < 4 * (p * (1 - p) / n) ** 0.5
+    random_rate = mirror_race_engine(RandomPolicy(random.Random(1))).run(n).win_rates().get("Hassan Mostafa", 0.0)
+    assert random_rate < rate
+
+
+def test_queries_check_whose_turn_it_is(solver):
+    state = solver.initial_state()
+    with pytest.raises(ValueError):
+        solver.best_offensive_move(state)
+    with pytest.raises(ValueError):
+        solver.best_defensive_move(state, 999)
+    assert solver.best_defensive_move(state, MAX_OFFENSIVE_MOVES[0][2]) in {move[0] for move in MAX_DEFENSIVE_MOVES}
+
+
+def test_unreached_state_raises():
+    fresh = GameSolver(**MIRROR)
+    with pytest.raises(KeyError):
+        fresh.win_probability(fresh.initial_state())
+
+
+def test_save_load_round_trip(solver, tmp_path):
+    path = tmp_path / "table.bin"
+    solver.save(path)
+    loaded = GameSolver(**MIRROR)
+    assert loaded.load(path)
+    state = solver.initial_state()
+    assert loaded.win_probability(state) == solver.win_probability(state)
+    assert loaded.table.size == solver.table.size
+
+
+def test_table_from_other_moves_is_not_loaded(solver, tmp_path):
+    path = tmp_path / "table.bin"
+    solver.save(path)
+    other = GameSolver(hassan_moves=(HASSAN_OFFENSIVE_MOVES, HASSAN_DEFENSIVE_MOVES),
+                       initial_tire_health=30, initial_fuel=300)
+    assert not other.load(path)
+
+
+def test_load_or_solve_writes_once(tmp_path):
+    path = str(tmp_path / "table.bin")
+    first = GameSolver.load_or_solve(path, **MIRROR)
+    second = GameSolver.load_or_solve(path, **MIRROR)
+    assert second.table.keys == first.table.keys
+
+
+def test_transposition_table_grows_and_keeps_every_key():
+    table = TranspositionTable(bits=2)
+    keys = [k * 7919 for k in range(1, 500)]
+    for key in keys:
+        table.put(key, key / 2, key % 16)
+    table.put(keys[0], 0.25, 3)
+    assert table.size == len(keys) and table.bits > 2
+    assert all(table.values[table.get(key)] == key / 2 for key in keys[1:])
+    assert table.values[table.get(keys[0])] == 0.25
+    assert table.get(1) == -1 and table.keys.count(EMPTY) == len(table.keys) - len(keys)
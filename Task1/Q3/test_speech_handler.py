@@ -0,0 +1,64 @@
+import random
+import time
+
+import pytest
+
+from fake_audio import FakeMicrophone, FakeRecognizer, measure_latency
+from main import HassanMostafa
+from speech_handler import SpeechHandler
+
+
+@pytest.fixture
+def handler_for():
+    handlers = []
+
+    def make(script, capture_delay=0.01, recognition_delay=0.01, **kwargs):
+        handler = SpeechHandler(FakeRecognizer(script, capture_delay, recognition_delay), FakeMicrophone(), **kwargs)
+        handlers.append(handler)
+        return handler
+    yield make
+    for handler in handlers:
+        handler.stop_listening()
+
+
+def test_pipeline_returns_phrases_in_order(handler_for):
+    script = ["Turbo Start", None, "block", "corner", "turbo start"]
+    handler = handler_for(script, recognition_delay=0.03, cache_size=0)
+    assert [handler.next_command(timeout=2) for _ in script] == ["turbo start", None, "block", "corner", "turbo start"]
+
+
+def test_sequential_listen_returns_the_same(handler_for):
+    handler = handler_for(["Turbo Start", None, "block"])
+    assert [handler.listen_for_command() for _ in range(3)] == ["turbo start", None, "block"]
+
+
+def test_silence_times_out(handler_for):
+    handler = handler_for([])
+    start = time.perf_counter()
+    assert handler.next_command(timeout=0.2) is None
+    assert time.perf_counter() - start < 2
+
+
+def test_flush_drops_what_was_said_before(handler_for):
+    handler = handler_for(["block", "corner"], capture_delay=0.001)
+    handler.start_listening(timeout=0.05)
+    time.sleep(0.3)
+    handler.flush()
+    assert handler.next_command(timeout=0.2) is None
+
+
+def test_capture_and_recognition_overlap():
+    results = measure_latency(6, capture_delay=0.05, recognition_delay=0.05)
+    assert results["pipelined"] < results["sequential"] * 0.8
+
+
+def test_hassan_plays_the_spoken_move(handler_for):
+    hassan = HassanMostafa(speech_handler=handler_for(["mercedes charge", "slipstream"]))
+    assert hassan.choose_offensive_move().name == "Mercedes Charge"
+    assert hassan.choose_defensive_move(20).name == "Slipstream Cut"
+
+
+def test_hassan_falls_back_to_random_after_three_misses(handler_for):
+    hassan = HassanMostafa(rng=random.Random(0), speech_handler=handler_for([None, "pit stop", None, "block"]))
+    move = hassan.choose_offensive_move()
+    assert move.name in {"Turbo Start", "Mercedes Charge", "Corner Mastery"}
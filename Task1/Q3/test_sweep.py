@@ -0,0 +1,28 @@
+import pytest
+
+from sweep import derive_seed, run_sweep
+
+
+@pytest.mark.parametrize("engine", ["object", "vector"])
+def test_results_do_not_depend_on_the_worker_count(engine):
+    one = run_sweep(3000, master_seed=42, workers=1, batch_size=700, engine=engine)
+    for workers in (2, 3):
+        assert run_sweep(3000, master_seed=42, workers=workers, batch_size=700, engine=engine).as_dict() == one.as_dict()
+    assert one.races == 3000
+
+
+def test_master_seed_changes_the_results():
+    assert run_sweep(2000, master_seed=1, workers=1).as_dict() != run_sweep(2000, master_seed=2, workers=1).as_dict()
+
+
+def test_batch_seeds_are_distinct_and_stable():
+    seeds = [derive_seed(42, batch) for batch in range(1000)]
+    assert len(set(seeds)) == 1000 and all(0 <= seed < 2 ** 64 for seed in seeds)
+    assert derive_seed(42, 3) == derive_seed(42, 3) != derive_seed(43, 3)
+
+
+def test_policies_and_engine_are_checked():
+    with pytest.raises(ValueError):
+        run_sweep(10, engine="gpu")
+    with pytest.raises(ValueError):
+        run_sweep(10, workers=1, max_policy="clever")
@@ -0,0 +1,43 @@
+import random
+
+import pytest
+
+from race_engine import BatchRaceEngine, GreedyPolicy, RandomPolicy, hassan_factory, max_factory
+from vector_engine import VectorRaceEngine, VectorSide, hassan_side, max_side
+
+
+def test_greedy_races_match_the_object_engine_exactly():
+    vector = VectorRaceEngine(max_side("greedy"), hassan_side("greedy")).run(10)
+    objects = BatchRaceEngine(max_factory(GreedyPolicy()), hassan_factory(GreedyPolicy())).run(10)
+    assert vector.as_dict() == objects.as_dict()
+
+
+@pytest.mark.parametrize("max_policy, hassan_policy", [("random", "random"), ("greedy", "random")])
+def test_random_outcomes_match_the_object_engine(max_policy, hassan_policy):
+    policies = {"random": lambda seed: RandomPolicy(random.Random(seed)), "greedy": lambda seed: GreedyPolicy()}
+    n_object, n_vector = 4000, 40000
+    objects = BatchRaceEngine(max_factory(policies[max_policy](1)),
+                              hassan_factory(policies[hassan_policy](2))).run(n_object)
+    vector = VectorRaceEngine(max_side(max_policy), hassan_side(hassan_policy), seed=0).run(n_vector)
+    p = objects.win_rates().get("Hassan Mostafa", 0.0)
+    q = vector.win_rates().get("Hassan Mostafa", 0.0)
+    stderr = (p * (1 - p) / n_object + q * (1 - q) / n_vector) ** 0.5
+    assert abs(p - q) < 5 * stderr + 1e-9
+    assert vector.mean_rounds() == pytest.approx(objects.mean_rounds(), rel=0.05)
+    assert set(vector.move_usage) == set(objects.move_usage)
+
+
+def test_stats_add_up_across_batches():
+    stats = VectorRaceEngine(max_side(), hassan_side(), seed=1, batch_size=300).run(1000)
+    assert stats.races == sum(stats.wins.values()) == sum(stats.rounds.values()) == 1000
+
+
+def test_same_seed_same_stats():
+    run = lambda seed: VectorRaceEngine(max_side(), hassan_side(), seed=seed).run(2000).as_dict()
+    assert run(7) == run(7)
+    assert run(7) != run(8)
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        VectorSide("Max Verstappen", [], [], policy="clever")
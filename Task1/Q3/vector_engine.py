@@ -0,0 +1,220 @@
+"""
+    NumPy Monte Carlo version of the headless engine.
+
+    Instead of one Driver object per race, every driver stat lives in an array
+    with one row per race (tire health, fuel, uses left of every defensive move),
+    and each round is played for all unfinished races at once with masked array
+    ops. The rules are the same as Race.simulate_turn / DefensiveMove.execute, so
+    the outcome distribution matches race_engine.BatchRaceEngine with the same
+    policies (the two engines consume random numbers differently, so individual
+    races don't line up one to one).
+"""
+import sys
+import time
+
+import numpy as np
+
+from main import (MAX_OFFENSIVE_MOVES, MAX_DEFENSIVE_MOVES,
+                  HASSAN_OFFENSIVE_MOVES, HASSAN_DEFENSIVE_MOVES)
+from race_engine import RaceStats
+
+
+POLICIES = ("random", "greedy")
+
+
+class VectorSide:
+    """Move tables of one driver as arrays plus the policy used to pick among them"""
+    def __init__(self, name, offensive_moves, defensive_moves, policy="random",
+                 initial_tire_health=100, initial_fuel=500):
+        if policy not in POLICIES:
+            raise ValueError(f"policy should be one of {POLICIES}, got {policy!r}")
+        self.name = name
+        self.policy = policy
+        self.initial_tire_health = initial_tire_health
+        self.initial_fuel = initial_fuel
+
+        self.offensive_names = [move[0] for move in offensive_moves]
+        self.off_cost = np.array([move[1] for move in offensive_moves], dtype=np.int64)
+        self.off_impact = np.array([move[2] for move in offensive_moves], dtype=np.float64)
+
+        self.defensive_names = [move[0] for move in defensive_moves]
+        self.def_cost = np.array([move[1] for move in defensive_moves], dtype=np.int64)
+        self.def_reduction = np.array([move[2] for move in defensive_moves], dtype=np.float64)
+        max_uses = [move[4] if len(move) > 4 else None for move in defensive_moves]
+        # unlimited moves start with one use that is never taken away
+        self.def_limited = np.array([1 if uses else 0 for uses in max_uses], dtype=np.int64)
+        self.def_max_uses = np.array([uses if uses else 1 for uses in max_uses], dtype=np.int64)
+
+        # greedy preference order, same tie breaks as race_engine.GreedyPolicy
+        self.off_order = np.lexsort((self.off_cost, -self.off_impact))
+        self.def_order = np.lexsort((self.def_cost, -self.def_reduction))
+
+    def new_state(self, k):
+        tire = np.full(k, float(self.initial_tire_health))
+        fuel = np.full(k, self.initial_fuel, dtype=np.int64)
+        uses = np.tile(self.def_max_uses, (k, 1))
+        return tire, fuel, uses
+
+
+def max_side(policy="random"):
+    return VectorSide("Max Verstappen", MAX_OFFENSIVE_MOVES, MAX_DEFENSIVE_MOVES, policy)
+
+
+def hassan_side(policy="random"):
+    return VectorSide("Hassan Mostafa", HASSAN_OFFENSIVE_MOVES, HASSAN_DEFENSIVE_MOVES, policy)
+
+
+def _choose(avail, policy, order, rng):
+    """
+        Pick one move per row among the available ones (rows without any
+        available move get index 0, callers mask them out)
+    """
+    if policy == "greedy":
+        return order[np.argmax(avail[:, order], axis=1)]
+
+    counts = avail.sum(axis=1)
+    r = (rng.random(len(avail)) * counts).astype(np.int64)
+    return np.argmax(avail.cumsum(axis=1) > r[:, None], axis=1)
+
+
+class VectorRaceEngine:
+    """
+        Plays races in lockstep, batch_size races at a time, and returns the
+        same RaceStats as the object engine
+    """
+    def __init__(self, side1, side2, seed=None, batch_size=65536):
+        self._sides = (side1, side2)
+        self._rng = np.random.default_rng(seed)
+        self._batch_size = batch_size
+
+    def run(self, n_races, stats=None):
+        stats = stats or RaceStats()
+        done = 0
+        while done < n_races:
+            k = min(self._batch_size, n_races - done)
+            self._run_batch(k, stats)
+            done += k
+        return stats
+
+    def _run_batch(self, k, stats):
+        rng = self._rng
+        sides = self._sides
+        states = [side.new_state(k) for side in sides]
+        off_usage = [np.zeros(len(side.off_cost), dtype=np.int64) for side in sides]
+        def_usage = [np.zeros(len(side.def_cost), dtype=np.int64) for side in sides]
+
+        active = np.ones(k, dtype=bool)
+        rounds = np.zeros(k, dtype=np.int64)
+        nomoves = np.zeros(k, dtype=np.int64)
+        winner = np.full(k, -1, dtype=np.int64)    # 0 / 1 side index, -1 draw
+        reason = np.zeros(k, dtype=np.int64)       # 0 tires, 1 fuel, 2 stalemate
+
+        attacker = 0
+        while active.any():
+            defender = 1 - attacker
+            a_side, d_side = sides[attacker], sides[defender]
+            a_tire, a_fuel, _ = states[attacker]
+            d_tire, d_fuel, d_uses = states[defender]
+            rounds += active
+
+            # attacker picks among the offensive moves it can afford
+            a_avail = (a_fuel[:, None] >= a_side.off_cost) & active[:, None]
+            has_move = a_avail.any(axis=1)
+            off = _choose(a_avail, a_side.policy, a_side.off_order, rng)
+            dmg = np.where(has_move, a_side.off_impact[off], 0.0)
+
+            # defender picks among moves with enough fuel and uses left
+            d_avail = (d_fuel[:, None] >= d_side.def_cost) & (d_uses > 0) & has_move[:, None]
+            has_def = d_avail.any(axis=1)
+            de = _choose(d_avail, d_side.policy, d_side.def_order, rng)
+
+            rows = np.flatnonzero(has_def)
+            d_fuel[rows] -= d_side.def_cost[de[rows]]
+            d_uses[rows, de[rows]] -= d_side.def_limited[de[rows]]
+            final = np.where(has_def, np.maximum(0.0, dmg * (1 - d_side.def_reduction[de])), dmg)
+
+            a_fuel -= np.where(has_move, a_side.off_cost[off], 0)
+            np.maximum(d_tire - final, 0.0, out=d_tire)
+
+            off_usage[attacker] += np.bincount(off[has_move], minlength=len(a_side.off_cost))
+            def_usage[defender] += np.bincount(de[rows], minlength=len(d_side.def_cost))
+
+            nomoves = np.where(has_move, 0, nomoves + 1)
+            self._finish(states, active, nomoves, winner, reason)
+            attacker = defender
+
+        self._record(stats, k, winner, reason, rounds, off_usage, def_usage)
+
+    @staticmethod
+    def _finish(states, active, nomoves, winner, reason):
+        (tire1, fuel1, _), (tire2, fuel2, _) = states
+        alive1 = (tire1 > 0) & (fuel1 > 0)
+        alive2 = (tire2 > 0) & (fuel2 > 0)
+
+        # someone got eliminated: driver1 wins if still alive, like Race._result
+        out = active & ~(alive1 & alive2)
+        winner[out] = np.where(alive1[out], 0, 1)
+        loser_tire = np.where(alive1, tire2, tire1)
+        reason[out] = np.where(loser_tire[out] <= 0, 0, 1)
+
+        # nobody could move for two turns: higher tire health wins
+        stale = active & alive1 & alive2 & (nomoves >= 2)
+        winner[stale] = np.where(tire1[stale] > tire2[stale], 0,
+                                 np.where(tire2[stale] > tire1[stale], 1, -1))
+        reason[stale] = 2
+
+        active &= ~(out | stale)
+
+    def _record(self, stats, k, winner, reason, rounds, off_usage, def_usage):
+        names = [side.name for side in self._sides]
+        stats.races += k
+
+        for index, count in zip(*np.unique(winner, return_counts=True)):
+            stats.wins[names[index] if index >= 0 else None] += int(count)
+        for index, count in zip(*np.unique(reason, return_counts=True)):
+            stats.reasons[("tires", "fuel", "stalemate")[index]] += int(count)
+        for length, count in zip(*np.unique(rounds, return_counts=True)):
+            stats.rounds[int(length)] += int(count)
+
+        for side, offs, defs in zip(self._sides, off_usage, def_usage):
+            for name, count in zip(side.offensive_names, offs):
+                if count:
+                    stats.move_usage[(side.name, name)] += int(count)
+            for name, count in zip(side.defensive_names, defs):
+                if count:
+                    stats.move_usage[(side.name, name)] += int(count)
+
+
+def benchmark(n_object=20000, n_vector=1000000, seed=42):
+    """Races/sec of the per-object loop vs the vectorized engine, random vs random"""
+    import random
+    from race_engine import BatchRaceEngine, RandomPolicy, max_factory, hassan_factory
+
+    rng = random.Random(seed)
+    engine = BatchRaceEngine(max_factory(RandomPolicy(rng)), hassan_factory(RandomPolicy(rng)))
+    start = time.perf_counter()
+    object_stats = engine.run(n_object)
+    object_time = time.perf_counter() - start
+
+    engine = VectorRaceEngine(max_side("random"), hassan_side("random"), seed=seed)
+    start = time.perf_counter()
+    vector_stats = engine.run(n_vector)
+    vector_time = time.perf_counter() - start
+
+    print(f"{'Engine':<10} {'Races':>9} {'Seconds':>9} {'Races/sec':>11} {'Hassan win %':>13} {'Avg rounds':>11}")
+    for label, n, elapsed, stats in (("object", n_object, object_time, object_stats),
+                                     ("vector", n_vector, vector_time, vector_stats)):
+        rate = stats.win_rates().get("Hassan Mostafa", 0.0)
+        print(f"{label:<10} {n:>9} {elapsed:>9.2f} {n/elapsed:>11.0f} {rate*100:>13.2f} {stats.mean_rounds():>11.2f}")
+
+    # the two win rates should agree within sampling noise
+    p = object_stats.win_rates().get("Hassan Mostafa", 0.0)
+    q = vector_stats.win_rates().get("Hassan Mostafa", 0.0)
+    stderr = (p * (1 - p) / n_object + q * (1 - q) / n_vector) ** 0.5
+    print(f"\nWin rate difference: {abs(p - q)*100:.2f}% ({abs(p - q)/stderr if stderr else 0:.1f} standard errors)")
+    print(f"Speedup: {(n_vector/vector_time)/(n_object/object_time):.1f}x")
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    benchmark(n_vector=n)
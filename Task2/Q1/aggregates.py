@@ -0,0 +1,250 @@
+"""
+    Materialized driver / constructor aggregates for the EDA questions.
+
+    Instead of re-running groupby over the whole merged results table, the store
+    keeps per (driver, season) and (constructor, season) sums: points, starts,
+    classified finishes and their position sum, finishes, points finishes, DNFs
+    and positions lost. All of them add up, so career totals, per-era numbers
+    and averages are sums over a few thousand rows, and new races are folded in
+    by aggregating only the rows appended to results.csv since the last update.
+"""
+import hashlib
+import io
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+import ergast
+
+
+STATS = ["points", "starts", "classified", "position_sum", "finished", "points_finishes", "dnf",
+         "positions_lost_sum", "positions_lost_count"]
+KEYS = {"driver": "driverId", "constructor": "constructorId"}
+DNF_CODES = ["R", "D", "F", "W"]
+STORE_NAME = "aggregates.pkl"         # saved in the store's cache_dir unless a path is given
+_FINGERPRINT_BYTES = 4096
+
+
+def era_of(year):
+    return f"{year // 10 * 10}s"
+
+
+def year_lookup(races):
+    """Array indexed by raceId holding the race's season, -1 for ids that aren't races"""
+    lookup = np.full(int(races["raceId"].max()) + 1, -1, dtype=np.int32)
+    lookup[races["raceId"].to_numpy()] = races["year"].to_numpy()
+    return lookup
+
+
+def lookup_years(race_ids, years):
+    race_ids = np.asarray(race_ids)
+    if len(race_ids) and (race_ids.max() >= len(years) or (years[race_ids] < 0).any()):
+        raise ValueError("results reference races missing from races.csv")
+    return years[race_ids]
+
+
+def result_stats(results, years):
+    """
+        One row of additive stats per result, with its driver, constructor and
+        season (years is a year_lookup array)
+    """
+    position = results["position"].astype("Float64")
+    lost = results["grid"] - position
+    stats = pd.DataFrame({
+        "driverId": results["driverId"].to_numpy(),
+        "constructorId": results["constructorId"].to_numpy(),
+        "year": lookup_years(results["raceId"], years),
+        "points": results["points"].to_numpy(),
+        "starts": 1,
+        "classified": position.notna().to_numpy(),
+        "position_sum": position.fillna(0).to_numpy(dtype=float),
+        "finished": (results["statusId"] == 1).to_numpy(),
+        "points_finishes": (results["points"] > 0).to_numpy(),
+        "dnf": results["positionText"].isin(DNF_CODES).to_numpy(),
+        "positions_lost_sum": lost.fillna(0).to_numpy(dtype=float),
+        "positions_lost_count": lost.notna().to_numpy(),
+    })
+    stats[STATS] = stats[STATS].astype(float)
+    return stats
+
+
+def _fingerprint(path, offset):
+    """Hash of the bytes just before offset, to notice the file was rewritten rather than appended to"""
+    with open(path, "rb") as f:
+        f.seek(max(0, offset - _FINGERPRINT_BYTES))
+        return hashlib.sha256(f.read(min(offset, _FINGERPRINT_BYTES))).hexdigest()
+
+
+class AggregateStore:
+    def __init__(self, data_dir=ergast.DATA_DIR, cache_dir=None):
+        """cache_dir is the ergast column cache for data_dir's CSVs, by default next to them"""
+        self.data_dir = data_dir
+        self.cache_dir = cache_dir or os.path.join(data_dir, os.path.basename(ergast.CACHE_DIR))
+        self.tables = {kind: pd.DataFrame(columns=STATS, dtype=float,
+                                          index=pd.MultiIndex.from_arrays([[], []], names=[key, "year"]))
+                       for kind, key in KEYS.items()}
+        self.offset = 0             # bytes of results.csv already folded in
+        self.fingerprint = None
+        self.rows = 0
+
+    @property
+    def source(self):
+        return os.path.join(self.data_dir, "results.csv")
+
+    @property
+    def path(self):
+        return os.path.join(self.cache_dir, STORE_NAME)
+
+    @classmethod
+    def build(cls, data_dir=ergast.DATA_DIR, cache_dir=None):
+        store = cls(data_dir, cache_dir)
+        store.update()
+        return store
+
+    def apply(self, stats):
+        """Adds the stats rows of new results into the tables"""
+        for kind, key in KEYS.items():
+            delta = stats.groupby([key, "year"])[STATS].sum()
+            self.tables[kind] = self.tables[kind].add(delta, fill_value=0)
+        self.rows += len(stats)
+
+    def update(self):
+        """
+            Folds in the rows appended to results.csv since the last update and
+            returns how many there were. A file that was rewritten instead of
+            appended to is rebuilt from scratch
+        """
+        size = os.path.getsize(self.source)
+        if self.offset and (size < self.offset or _fingerprint(self.source, self.offset) != self.fingerprint):
+            fresh = AggregateStore.build(self.data_dir, self.cache_dir)
+            self.__dict__.update(fresh.__dict__)
+            return self.rows
+        if size == self.offset:
+            return 0
+
+        with open(self.source, "rb") as f:
+            f.seek(self.offset)
+            data = f.read()
+        # a row that is still being written is left for the next update
+        data = data[:data.rfind(b"\n") + 1]
+        if not data:
+            return 0
+
+        columns = list(ergast.SCHEMAS["results"])
+        header = 0 if self.offset == 0 else None
+        results = ergast.parse_csv("results", io.BytesIO(data), header=header, names=columns)
+        years = year_lookup(ergast.load("races", self.data_dir, self.cache_dir))
+        self.apply(result_stats(results, years))
+
+        self.offset += len(data)
+        self.fingerprint = _fingerprint(self.source, self.offset)
+        return len(results)
+
+    def save(self, path=None):
+        path = path or self.path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        pd.to_pickle({"data_dir": os.path.abspath(self.data_dir), "tables": self.tables, "offset": self.offset,
+                      "fingerprint": self.fingerprint, "rows": self.rows}, path)
+
+    @classmethod
+    def load(cls, path=None, data_dir=ergast.DATA_DIR, cache_dir=None):
+        """
+            Saved store brought up to date with results.csv. A new one is built
+            if nothing was saved at path (by default in cache_dir) or what was
+            saved there came from another data_dir
+        """
+        store = cls(data_dir, cache_dir)
+        path = path or store.path
+        state = pd.read_pickle(path) if os.path.exists(path) else None
+        if state is not None and state.get("data_dir") == os.path.abspath(data_dir):
+            store.tables, store.offset = state["tables"], state["offset"]
+            store.fingerprint, store.rows = state["fingerprint"], state["rows"]
+        store.update()
+        store.save(path)
+        return store
+
+    def totals(self, kind="driver", years=None, era=None):
+        """
+            Per driver (or constructor) totals over all seasons, a (first, last)
+            range of years or an era like "1990s", with the same derived
+            columns as the notebook's driver_stats
+        """
+        table = self.tables[kind]
+        seasons = table.index.get_level_values("year")
+        if era is not None:
+            start = int(era[:4])
+            years = (start, start + 9)
+        if years is not None:
+            table = table[(seasons >= years[0]) & (seasons <= years[1])]
+            seasons = table.index.get_level_values("year")
+
+        key = KEYS[kind]
+        totals = table.groupby(level=key).sum()
+        span = pd.Series(seasons, index=table.index.get_level_values(key)).groupby(level=0).agg(["min", "max"])
+        totals["first_year"] = span["min"]
+        totals["last_year"] = span["max"]
+        totals["points_per_race"] = totals["points"] / totals["starts"]
+        totals["avg_position"] = totals["position_sum"] / totals["classified"].replace(0, np.nan)
+        totals["completion_rate"] = totals["finished"] / totals["starts"] * 100
+        totals["points_rate"] = totals["points_finishes"] / totals["starts"] * 100
+        totals["avg_positions_lost"] = totals["positions_lost_sum"] / totals["positions_lost_count"].replace(0, np.nan)
+        return totals
+
+    def top(self, kind="driver", by="points_per_race", n=10, min_starts=100, years=None, era=None):
+        totals = self.totals(kind, years, era)
+        return totals[totals["starts"] >= min_starts].nlargest(n, by)
+
+    def eras(self):
+        """Per era averages over every start, like the notebook's era_comparison"""
+        table = self.tables["driver"]
+        era = pd.Index(table.index.get_level_values("year")).map(era_of).rename("era")
+        sums = table.groupby(era).sum()
+        return pd.DataFrame({
+            "avg_points": sums["points"] / sums["starts"],
+            "dnf_rate": sums["dnf"] / sums["starts"] * 100,
+            "points_rate": sums["points_finishes"] / sums["starts"] * 100,
+            "avg_positions_lost": sums["positions_lost_sum"] / sums["positions_lost_count"],
+        })
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+
+if __name__ == "__main__":
+    import shutil
+    import tempfile
+
+    store, build_ms = _timed(lambda: AggregateStore.build())
+    top, top_ms = _timed(lambda: store.top("driver", "points_per_race"))
+    print(f"Built from {store.rows} results in {build_ms:.0f} ms")
+    print(f"\nTop 10 drivers by points per race, min 100 starts ({top_ms:.1f} ms):")
+    print(top[["points", "starts", "points_per_race", "avg_position", "first_year", "last_year"]].round(2))
+    print("\nTop 5 constructors by points per entry in the 2000s:")
+    print(store.top("constructor", era="2000s", n=5)[["points", "starts", "points_per_race"]].round(2))
+    print("\nEras:")
+    print(store.eras().round(2))
+
+    # incremental: build on 90% of results.csv, append the rest, update and compare with a full build
+    folder = tempfile.mkdtemp()
+    try:
+        for name in ("races", "status"):
+            shutil.copy(os.path.join(ergast.DATA_DIR, f"{name}.csv"), folder)
+        with open(os.path.join(ergast.DATA_DIR, "results.csv"), "rb") as f:
+            lines = f.readlines()
+        cut = int(len(lines) * 0.9)
+        with open(os.path.join(folder, "results.csv"), "wb") as f:
+            f.writelines(lines[:cut])
+        partial = AggregateStore.build(folder)
+        with open(os.path.join(folder, "results.csv"), "ab") as f:
+            f.writelines(lines[cut:])
+        added, update_ms = _timed(partial.update)
+        pd.testing.assert_frame_equal(partial.totals(), store.totals())
+        print(f"\nAppended {added} results, incremental update took {update_ms:.0f} ms "
+              f"(full build {build_ms:.0f} ms), totals match the full build")
+    finally:
+        shutil.rmtree(folder)
@@ -0,0 +1,214 @@
+"""
+    Typed loader for the Ergast CSVs used in EDA.ipynb.
+
+    \\N is read as missing while parsing, every column gets an explicit dtype
+    (nullable ints where \\N shows up, categoricals for repeated labels), and the
+    parsed frame is cached as one .npy file per column under .ergast_cache/.
+    A cache is used as long as the CSV has the same size and mtime, or the same
+    SHA-256 if only the mtime moved; otherwise it is rebuilt.
+
+        from ergast import load, load_all
+        results_df, races_df, status_df = load_all()
+"""
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(DATA_DIR, ".ergast_cache")
+CACHE_VERSION = 1
+
+SCHEMAS = {
+    "results": {
+        "resultId": "int32", "raceId": "int32", "driverId": "int32", "constructorId": "int32",
+        "number": "Int32", "grid": "int32", "position": "Int32", "positionText": "category",
+        "positionOrder": "int32", "points": "float64", "laps": "int32", "time": "string",
+        "milliseconds": "Int64", "fastestLap": "Int32", "rank": "Int32", "fastestLapTime": "string",
+        "fastestLapSpeed": "Float64", "statusId": "int32",
+    },
+    "races": {
+        "raceId": "int32", "year": "int32", "round": "int32", "circuitId": "int32",
+        "name": "category", "date": "datetime", "time": "string", "url": "string",
+        "fp1_date": "datetime", "fp1_time": "string", "fp2_date": "datetime", "fp2_time": "string",
+        "fp3_date": "datetime", "fp3_time": "string", "quali_date": "datetime", "quali_time": "string",
+        "sprint_date": "datetime", "sprint_time": "string",
+    },
+    "status": {
+        "statusId": "int32", "status": "category",
+    },
+}
+
+
+def parse_csv(name, source, **kwargs):
+    """
+        Parses a path or file object holding rows of table name with its
+        schema, an iterator of frames when chunksize is given
+    """
+    schema = SCHEMAS[name]
+    dates = [column for column, dtype in schema.items() if dtype == "datetime"]
+    dtypes = {column: dtype for column, dtype in schema.items() if dtype != "datetime"}
+    df = pd.read_csv(source, na_values=["\\N"], keep_default_na=False, dtype=dtypes, **kwargs)
+    if kwargs.get("chunksize"):
+        return (_parse_dates(chunk, dates) for chunk in df)
+    return _parse_dates(df, dates)
+
+
+def _parse_dates(df, dates):
+    for column in dates:
+        df[column] = pd.to_datetime(df[column], format="%Y-%m-%d")
+    return df
+
+
+def read_csv(name, data_dir=DATA_DIR, **kwargs):
+    """Parses <name>.csv with its schema, no cache"""
+    return parse_csv(name, os.path.join(data_dir, f"{name}.csv"), **kwargs)
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _source_info(path):
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _save_column(folder, column, series):
+    """Writes one column as .npy files and returns how to read it back"""
+    base = os.path.join(folder, column)
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype) or pd.api.types.is_string_dtype(dtype):
+        codes, categories = pd.factorize(series, use_na_sentinel=True)
+        np.save(base + ".codes.npy", codes.astype(np.int32))
+        np.save(base + ".categories.npy", np.asarray(categories, dtype=str))
+        kind = "category" if isinstance(dtype, pd.CategoricalDtype) else "string"
+    elif isinstance(dtype, (pd.Int64Dtype, pd.Int32Dtype, pd.Float64Dtype)):
+        np.save(base + ".values.npy", series.to_numpy(dtype=dtype.numpy_dtype, na_value=0))
+        np.save(base + ".mask.npy", series.isna().to_numpy())
+        kind = "masked"
+    else:
+        np.save(base + ".npy", series.to_numpy())
+        kind = "numpy"
+    return {"name": column, "kind": kind, "dtype": str(dtype)}
+
+
+def _load_column(folder, spec):
+    base = os.path.join(folder, spec["name"])
+    kind = spec["kind"]
+    if kind == "numpy":
+        return np.load(base + ".npy", mmap_mode="r")
+    if kind == "masked":
+        values = np.load(base + ".values.npy")
+        mask = np.load(base + ".mask.npy")
+        array_type = pd.arrays.IntegerArray if values.dtype.kind in "iu" else pd.arrays.FloatingArray
+        return array_type(values, mask)
+    codes = np.load(base + ".codes.npy")
+    categorical = pd.Categorical.from_codes(codes, categories=np.load(base + ".categories.npy"))
+    return categorical if kind == "category" else categorical.astype("string")
+
+
+def _cache_valid(folder, source):
+    meta_path = os.path.join(folder, "meta.json")
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path) as f:
+        meta = json.load(f)
+    if meta.get("version") != CACHE_VERSION:
+        return None
+
+    info = _source_info(source)
+    cached = meta["source"]
+    if info["size"] == cached["size"] and info["mtime_ns"] == cached["mtime_ns"]:
+        return meta
+    if info["size"] == cached["size"] and file_sha256(source) == cached["sha256"]:
+        # touched but not changed, remember the new mtime
+        meta["source"].update(info)
+        with open(meta_path, "w") as f:
+            json.dump(meta, f)
+        return meta
+    return None
+
+
+def _write_cache(folder, source, df):
+    tmp = folder + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    meta = {
+        "version": CACHE_VERSION,
+        "source": dict(_source_info(source), sha256=file_sha256(source)),
+        "rows": len(df),
+        "columns": [_save_column(tmp, column, df[column]) for column in df.columns],
+    }
+    with open(os.path.join(tmp, "meta.json"), "w") as f:
+        json.dump(meta, f)
+    # swap the finished folder in so a crash never leaves a half written cache
+    shutil.rmtree(folder, ignore_errors=True)
+    os.replace(tmp, folder)
+
+
+def load(name, data_dir=DATA_DIR, cache_dir=CACHE_DIR, use_cache=True):
+    """Typed frame for results, races or status, from the cache when it is still fresh"""
+    if name not in SCHEMAS:
+        raise ValueError(f"unknown table {name!r}, pick one of {sorted(SCHEMAS)}")
+    source = os.path.join(data_dir, f"{name}.csv")
+    if not use_cache:
+        return read_csv(name, data_dir)
+
+    folder = os.path.join(cache_dir, name)
+    meta = _cache_valid(folder, source)
+    if meta is None:
+        df = read_csv(name, data_dir)
+        _write_cache(folder, source, df)
+        return df
+    return pd.DataFrame({spec["name"]: _load_column(folder, spec) for spec in meta["columns"]})
+
+
+def load_all(data_dir=DATA_DIR, cache_dir=CACHE_DIR, use_cache=True):
+    return tuple(load(name, data_dir, cache_dir, use_cache) for name in ("results", "races", "status"))
+
+
+def benchmark():
+    """Untyped read + replace + to_numeric (what the notebook does) vs cold and warm typed loads"""
+    def untyped():
+        df = pd.read_csv(os.path.join(DATA_DIR, "results.csv")).replace("\\N", np.nan)
+        for column in ("milliseconds", "fastestLap", "rank", "fastestLapSpeed"):
+            df[column] = pd.to_numeric(df[column], errors="coerce")
+        return df
+
+    def timed(fn):
+        start = time.perf_counter()
+        df = fn()
+        return df, time.perf_counter() - start
+
+    shutil.rmtree(os.path.join(CACHE_DIR, "results"), ignore_errors=True)
+    rows = [
+        ("notebook (object + replace)",) + timed(untyped),
+        ("typed, cold (parse + cache)",) + timed(lambda: load("results")),
+        ("typed, warm (cache)",) + timed(lambda: load("results")),
+    ]
+    print(f"{'results.csv':<30} {'Seconds':>8} {'Memory MB':>10}")
+    for label, df, elapsed in rows:
+        print(f"{label:<30} {elapsed:>8.3f} {df.memory_usage(deep=True).sum() / 1e6:>10.1f}")
+
+    warm, cold = rows[2][1], rows[1][1]
+    pd.testing.assert_frame_equal(warm, cold, check_categorical=False)
+    print("\nwarm frame matches the parsed one")
+    print(warm.dtypes.to_string())
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "clear":
+        shutil.rmtree(CACHE_DIR, ignore_errors=True)
+    else:
+        benchmark()
@@ -0,0 +1,141 @@
+"""
+    Out-of-core version of the EDA pipeline: results.csv (or any bigger table
+    with the same columns) is read in chunks, each chunk is joined to races and
+    status through lookup arrays indexed by id instead of DataFrame merges, the
+    derived columns are added to that chunk only, and everything is folded into
+    running aggregates. Memory depends on the chunk size, not on the table.
+
+    Derived columns follow the notebook, except performance_category: positions
+    4-10 are "TOP 10" here (the notebook's condition for it is never true).
+"""
+from collections import Counter
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import ergast
+from aggregates import AggregateStore, DNF_CODES, era_of, lookup_years, result_stats, year_lookup
+
+
+PERFORMANCE_CATEGORIES = ["TOP 3", "TOP 10", "No Points", "DNF"]
+
+
+def derive_columns(chunk, years):
+    """Adds year, positions_lost, decade, era and performance_category to a chunk of results"""
+    position = chunk["position"].astype("Float64")
+    chunk["year"] = lookup_years(chunk["raceId"], years)
+    chunk["positions_lost"] = chunk["grid"] - position
+    chunk["decade"] = chunk["year"] // 10 * 10
+    chunk["era"] = chunk["decade"].map(era_of).astype("category")
+
+    place = position.to_numpy(dtype=float, na_value=np.nan)
+    category = np.select([np.isnan(place), place <= 3, place <= 10], [3, 0, 1], default=2)
+    chunk["performance_category"] = pd.Categorical.from_codes(category, PERFORMANCE_CATEGORIES)
+    chunk["is_dnf"] = chunk["positionText"].isin(DNF_CODES)
+    return chunk
+
+
+class StreamingAnalysis:
+    def __init__(self, races, status):
+        self.years = year_lookup(races)
+        self.status = pd.Series(status["status"].astype(str).to_numpy(), index=status["statusId"].to_numpy())
+        self.store = AggregateStore()
+        self.categories = Counter()     # (era, performance_category) -> starts
+        self.dnf_causes = np.zeros(int(status["statusId"].max()) + 1, dtype=np.int64)
+        self.season_starts = np.zeros(int(races["year"].max()) + 1, dtype=np.int64)
+        self.season_dnfs = np.zeros_like(self.season_starts)
+        self.races_seen = np.zeros(len(self.years), dtype=bool)
+        self.rows = 0
+
+    def fold(self, chunk):
+        chunk = derive_columns(chunk, self.years)
+        self.store.apply(result_stats(chunk, self.years))
+
+        counts = chunk.groupby(["era", "performance_category"], observed=True).size()
+        self.categories.update(dict(counts.items()))
+
+        dnf = chunk["is_dnf"].to_numpy()
+        self.dnf_causes += np.bincount(chunk["statusId"].to_numpy()[dnf], minlength=len(self.dnf_causes))
+        year = chunk["year"].to_numpy()
+        self.season_starts += np.bincount(year, minlength=len(self.season_starts))
+        self.season_dnfs += np.bincount(year[dnf], minlength=len(self.season_dnfs))
+        self.races_seen[chunk["raceId"].to_numpy()] = True
+        self.rows += len(chunk)
+
+    def run(self, source=os.path.join(ergast.DATA_DIR, "results.csv"), chunksize=100000):
+        for chunk in ergast.parse_csv("results", source, chunksize=chunksize):
+            self.fold(chunk)
+        return self
+
+    def seasons(self):
+        """Per season DNFs, like the notebook's dnf_by_year"""
+        races = np.bincount(self.years[np.flatnonzero(self.races_seen)], minlength=len(self.season_starts))
+        played = np.flatnonzero(self.season_starts)
+        df = pd.DataFrame({
+            "starts": self.season_starts[played],
+            "total_dnfs": self.season_dnfs[played],
+            "races": races[played],
+        }, index=pd.Index(played, name="year"))
+        df["dnf_rate"] = df["total_dnfs"] / df["starts"]
+        df["dnf_per_race"] = df["total_dnfs"] / df["races"]
+        return df
+
+    def causes(self, n=10):
+        """Most common status of DNF starts"""
+        ids = np.flatnonzero(self.dnf_causes)
+        counts = pd.Series(self.dnf_causes[ids], index=self.status.reindex(ids).to_numpy())
+        return counts.nlargest(n)
+
+    def performance(self):
+        counts = pd.Series(self.categories).unstack(fill_value=0)
+        return counts.reindex(columns=PERFORMANCE_CATEGORIES, fill_value=0).rename_axis(index="era", columns=None)
+
+
+def in_memory():
+    """The notebook's way: whole merged frame with full-width derived columns"""
+    results, races, status = ergast.load_all(use_cache=False)
+    merged = results.merge(races[["raceId", "year", "name", "date"]], on="raceId", how="left")
+    merged = merged.merge(status, on="statusId", how="left")
+    merged["position_numeric"] = merged["position"].astype("Float64")
+    merged["positions_lost"] = merged["grid"] - merged["position_numeric"]
+    merged["decade"] = merged["year"] // 10 * 10
+    merged["era"] = merged["decade"].map(era_of)
+    merged["is_dnf"] = merged["positionText"].isin(DNF_CODES)
+    return merged.groupby("driverId").agg({"points": "sum", "raceId": "count"})
+
+
+def measure(fn):
+    """Result, seconds and peak traced MB of fn (timed on a separate run, tracing slows it down)"""
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    result = fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+if __name__ == "__main__":
+    chunksize = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    races, status = ergast.read_csv("races"), ergast.read_csv("status")
+
+    _, memory_time, memory_peak = measure(in_memory)
+    analysis, stream_time, stream_peak = measure(lambda: StreamingAnalysis(races, status).run(chunksize=chunksize))
+
+    print(f"{'Pipeline':<24} {'Seconds':>8} {'Peak MB':>8}")
+    print(f"{'in memory (merge)':<24} {memory_time:>8.2f} {memory_peak / 1e6:>8.1f}")
+    print(f"{f'streaming ({chunksize} rows)':<24} {stream_time:>8.2f} {stream_peak / 1e6:>8.1f}")
+
+    pd.testing.assert_frame_equal(analysis.store.totals(), AggregateStore.build().totals())
+    print(f"\n{analysis.rows} results folded, driver totals match the in-memory store")
+    print("\nTop 5 seasons by DNFs:")
+    print(analysis.seasons().nlargest(5, "total_dnfs").round(2))
+    print("\nMost common DNF causes:")
+    print(analysis.causes(5))
+    print("\nPerformance categories by era:")
+    print(analysis.performance())
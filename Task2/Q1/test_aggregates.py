@@ -0,0 +1,90 @@
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+import ergast
+from aggregates import STORE_NAME, AggregateStore
+
+
+@pytest.fixture(scope="module")
+def full():
+    return AggregateStore.build(cache_dir=None)
+
+
+def copy_data(folder, fraction=1.0):
+    """races/status/results CSVs in folder, results cut to its first fraction of rows"""
+    for name in ("races", "status"):
+        shutil.copy(os.path.join(ergast.DATA_DIR, f"{name}.csv"), folder)
+    with open(os.path.join(ergast.DATA_DIR, "results.csv"), "rb") as f:
+        lines = f.readlines()
+    cut = int(len(lines) * fraction)
+    with open(os.path.join(folder, "results.csv"), "wb") as f:
+        f.writelines(lines[:cut])
+    return lines[cut:]
+
+
+@pytest.mark.parametrize("steps", [1, 3])
+def test_incremental_updates_match_a_full_build(tmp_path, full, steps):
+    rest = copy_data(tmp_path, 0.8)
+    store = AggregateStore.build(str(tmp_path))
+    size = -(-len(rest) // steps)
+    for start in range(0, len(rest), size):
+        with open(tmp_path / "results.csv", "ab") as f:
+            f.writelines(rest[start:start + size])
+        store.update()
+    assert store.rows == full.rows
+    for kind in ("driver", "constructor"):
+        pd.testing.assert_frame_equal(store.totals(kind), full.totals(kind))
+
+
+def test_half_written_row_waits_for_the_next_update(tmp_path):
+    rest = copy_data(tmp_path, 0.9)
+    store = AggregateStore.build(str(tmp_path))
+    with open(tmp_path / "results.csv", "ab") as f:
+        f.write(rest[0][:10])
+    assert store.update() == 0
+    with open(tmp_path / "results.csv", "ab") as f:
+        f.write(rest[0][10:])
+    assert store.update() == 1
+
+
+def test_rewritten_file_is_rebuilt(tmp_path, full):
+    copy_data(tmp_path, 0.5)
+    store = AggregateStore.build(str(tmp_path))
+    copy_data(tmp_path)
+    with open(tmp_path / "results.csv", "rb") as f:
+        header, *rows = f.readlines()
+    with open(tmp_path / "results.csv", "wb") as f:
+        # same rows, different order: longer than before, but not an append
+        f.writelines([header, *rows[::-1]])
+    store.update()
+    pd.testing.assert_frame_equal(store.totals(), full.totals())
+
+
+def test_shrunk_file_is_rebuilt(tmp_path):
+    copy_data(tmp_path, 0.5)
+    store = AggregateStore.build(str(tmp_path))
+    copy_data(tmp_path, 0.25)
+    store.update()
+    assert store.rows == AggregateStore.build(str(tmp_path)).rows
+
+
+def test_load_saves_next_to_its_own_data(tmp_path, full):
+    copy_data(tmp_path)
+    store = AggregateStore.load(data_dir=str(tmp_path))
+    assert os.path.exists(tmp_path / ".ergast_cache" / STORE_NAME)
+    assert AggregateStore.load(data_dir=str(tmp_path)).rows == store.rows == full.rows
+
+
+def test_load_rebuilds_a_store_saved_for_another_data_dir(tmp_path, full):
+    copy_data(tmp_path, 0.5)
+    shared = str(tmp_path / "store.pkl")
+    half = AggregateStore.load(shared, data_dir=str(tmp_path))
+    other = tmp_path / "other"
+    other.mkdir()
+    copy_data(other)
+    store = AggregateStore.load(shared, data_dir=str(other))
+    assert half.rows < store.rows == full.rows
+    pd.testing.assert_frame_equal(store.totals(), full.totals())
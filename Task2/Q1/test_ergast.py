@@ -0,0 +1,120 @@
+import io
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+import ergast
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    folder = tmp_path / "data"
+    folder.mkdir()
+    for name in ergast.SCHEMAS:
+        shutil.copy(os.path.join(ergast.DATA_DIR, f"{name}.csv"), folder)
+    return str(folder)
+
+
+@pytest.mark.parametrize("name", sorted(ergast.SCHEMAS))
+def test_columns_get_their_schema_dtypes(name):
+    df = ergast.read_csv(name)
+    for column, dtype in ergast.SCHEMAS[name].items():
+        if dtype == "datetime":
+            assert pd.api.types.is_datetime64_dtype(df[column])
+        else:
+            assert str(df[column].dtype) == dtype, column
+
+
+def test_backslash_n_is_missing_and_nothing_else():
+    source = io.StringIO(
+        "resultId,raceId,driverId,constructorId,number,grid,position,positionText,positionOrder,points,"
+        "laps,time,milliseconds,fastestLap,rank,fastestLapTime,fastestLapSpeed,statusId\n"
+        '1,18,1,1,22,1,1,"1",1,10,58,"1:34:50.616",5690616,39,2,"1:27.452","218.300",1\n'
+        '2,18,2,2,\\N,5,\\N,"R",2,0,30,\\N,\\N,\\N,\\N,\\N,\\N,5\n'
+        '3,18,3,3,7,6,3,"NA",3,0,58,"",5696094,41,3,"1:27.739","217.586",1\n')
+    df = ergast.parse_csv("results", source)
+    assert df["position"].isna().tolist() == [False, True, False]
+    assert df["milliseconds"].isna().tolist() == [False, True, False]
+    assert df["time"].isna().tolist() == [False, True, False]
+    assert df["time"][2] == ""                  # an empty string is not \N
+    assert df["positionText"].tolist() == ["1", "R", "NA"]
+
+
+def test_chunks_concatenate_to_the_whole_table():
+    source = os.path.join(ergast.DATA_DIR, "results.csv")
+    chunks = list(ergast.parse_csv("results", source, chunksize=5000))
+    assert len(chunks) > 1
+    whole = ergast.parse_csv("results", source)
+    joined = pd.concat(chunks, ignore_index=True)
+    # chunks can see different label sets, compare categoricals as labels
+    joined["positionText"] = joined["positionText"].astype(str)
+    whole["positionText"] = whole["positionText"].astype(str)
+    pd.testing.assert_frame_equal(joined, whole)
+
+
+@pytest.mark.parametrize("name", sorted(ergast.SCHEMAS))
+def test_cached_frame_equals_a_fresh_parse(data_dir, tmp_path, name):
+    cache_dir = str(tmp_path / "cache")
+    built = ergast.load(name, data_dir, cache_dir)
+    assert os.path.exists(os.path.join(cache_dir, name, "meta.json"))
+    cached = ergast.load(name, data_dir, cache_dir)
+    fresh = ergast.read_csv(name, data_dir)
+    pd.testing.assert_frame_equal(built, fresh)
+    pd.testing.assert_frame_equal(cached, fresh, check_categorical=False)
+    for column in fresh.columns:
+        assert cached[column].dtype == fresh[column].dtype, column
+
+
+def test_touched_file_keeps_its_cache(data_dir, tmp_path, monkeypatch):
+    cache_dir = str(tmp_path / "cache")
+    ergast.load("status", data_dir, cache_dir)
+    path = os.path.join(data_dir, "status.csv")
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    def no_parse(*args, **kwargs):
+        raise AssertionError("reparsed a file that did not change")
+    monkeypatch.setattr(ergast, "read_csv", no_parse)
+    assert len(ergast.load("status", data_dir, cache_dir)) == len(ergast.parse_csv("status", path))
+    # the new mtime is remembered, so the next load doesn't hash the file again
+    assert ergast._cache_valid(os.path.join(cache_dir, "status"), path)["source"]["mtime_ns"] == \
+        os.stat(path).st_mtime_ns
+
+
+def test_changed_file_is_reparsed(data_dir, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    before = ergast.load("status", data_dir, cache_dir)
+    with open(os.path.join(data_dir, "status.csv"), "a") as f:
+        f.write('999,"Test status"\n')
+    after = ergast.load("status", data_dir, cache_dir)
+    assert len(after) == len(before) + 1
+    assert after["status"].iloc[-1] == "Test status"
+    cached = ergast.load("status", data_dir, cache_dir)
+    assert cached["statusId"].tolist() == after["statusId"].tolist()
+
+
+def test_same_size_edit_is_reparsed(data_dir, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    ergast.load("status", data_dir, cache_dir)
+    path = os.path.join(data_dir, "status.csv")
+    with open(path, "rb") as f:
+        text = f.read()
+    with open(path, "wb") as f:
+        f.write(text.replace(b"Finished", b"FINISHED", 1))
+    assert "FINISHED" in ergast.load("status", data_dir, cache_dir)["status"].astype(str).tolist()
+
+
+def test_old_cache_version_is_rebuilt(data_dir, tmp_path, monkeypatch):
+    cache_dir = str(tmp_path / "cache")
+    ergast.load("status", data_dir, cache_dir)
+    monkeypatch.setattr(ergast, "CACHE_VERSION", ergast.CACHE_VERSION + 1)
+    assert ergast._cache_valid(os.path.join(cache_dir, "status"), os.path.join(data_dir, "status.csv")) is None
+    ergast.load("status", data_dir, cache_dir)
+    assert ergast._cache_valid(os.path.join(cache_dir, "status"), os.path.join(data_dir, "status.csv"))
+
+
+def test_unknown_table_raises(data_dir, tmp_path):
+    with pytest.raises(ValueError):
+        ergast.load("drivers", data_dir, str(tmp_path / "cache"))
@@ -0,0 +1,98 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import ergast
+from aggregates import DNF_CODES, AggregateStore, year_lookup
+from streaming import PERFORMANCE_CATEGORIES, StreamingAnalysis, derive_columns
+
+
+def results_csv(rows):
+    """A results.csv in memory with (raceId, grid, position, positionText) rows"""
+    lines = [",".join(ergast.SCHEMAS["results"])]
+    for i, (race_id, grid, position, text) in enumerate(rows, 1):
+        lines.append(f"{i},{race_id},{i},1,{i},{grid},{position},{text},{i},0,50,\\N,\\N,\\N,\\N,\\N,\\N,1")
+    return io.StringIO("\n".join(lines) + "\n")
+
+
+@pytest.fixture(scope="module")
+def tables():
+    return ergast.load_all(use_cache=False)
+
+
+@pytest.fixture(scope="module")
+def merged(tables):
+    results, races, status = tables
+    df = results.merge(races[["raceId", "year"]], on="raceId", how="left")
+    df = df.merge(status, on="statusId", how="left")
+    df["is_dnf"] = df["positionText"].isin(DNF_CODES)
+    return df
+
+
+@pytest.fixture(scope="module")
+def analysis(tables):
+    _, races, status = tables
+    return StreamingAnalysis(races, status).run(chunksize=3000)
+
+
+@pytest.mark.parametrize("chunksize", [997, 20000, 10 ** 7])
+def test_streamed_totals_match_the_full_store(tables, chunksize):
+    _, races, status = tables
+    streamed = StreamingAnalysis(races, status).run(chunksize=chunksize)
+    full = AggregateStore.build(cache_dir=None)
+    assert streamed.rows == len(tables[0])
+    for kind in ("driver", "constructor"):
+        pd.testing.assert_frame_equal(streamed.store.totals(kind), full.totals(kind))
+
+
+def test_seasons_match_a_groupby(analysis, merged):
+    by_year = merged.groupby("year")
+    expected = pd.DataFrame({
+        "starts": by_year.size(),
+        "total_dnfs": by_year["is_dnf"].sum(),
+        "races": by_year["raceId"].nunique(),
+    })
+    seasons = analysis.seasons()
+    assert seasons.index.tolist() == expected.index.tolist()
+    for column in expected.columns:
+        assert seasons[column].tolist() == expected[column].tolist(), column
+    assert np.allclose(seasons["dnf_rate"], expected["total_dnfs"] / expected["starts"])
+
+
+def test_causes_match_value_counts(analysis, merged):
+    expected = merged.loc[merged["is_dnf"], "status"].astype(str).value_counts()
+    causes = analysis.causes(len(expected))
+    assert dict(causes.items()) == dict(expected.items())
+    assert causes.is_monotonic_decreasing
+
+
+def test_performance_counts_every_start_once(analysis, merged):
+    performance = analysis.performance()
+    assert list(performance.columns) == PERFORMANCE_CATEGORIES
+    assert performance.to_numpy().sum() == len(merged)
+    assert performance["DNF"].sum() == merged["position"].isna().sum()
+
+
+def test_derive_columns_categories(tables):
+    _, races, _ = tables
+    race_id = int(races.loc[races["year"] == 1995, "raceId"].iloc[0])
+    chunk = ergast.parse_csv("results", results_csv([
+        (race_id, 3, "1", "1"), (race_id, 2, "3", "3"), (race_id, 1, "4", "4"),
+        (race_id, 5, "10", "10"), (race_id, 12, "11", "11"), (race_id, 7, "\\N", "R"),
+    ]))
+    chunk = derive_columns(chunk, year_lookup(races))
+    assert chunk["performance_category"].tolist() == ["TOP 3", "TOP 3", "TOP 10", "TOP 10", "No Points", "DNF"]
+    assert chunk["is_dnf"].tolist() == [False] * 5 + [True]
+    assert chunk["positions_lost"].tolist()[:5] == [2, -1, -3, -5, 1]
+    assert pd.isna(chunk["positions_lost"].iloc[5])
+    assert set(chunk["decade"]) == {1990} and set(chunk["era"].astype(str)) == {"1990s"}
+
+
+def test_unknown_race_raises(tables):
+    _, races, _ = tables
+    chunk = ergast.parse_csv("results", results_csv([(int(races["raceId"].max()) + 1, 1, "1", "1")]))
+    with pytest.raises(ValueError):
+        derive_columns(chunk, year_lookup(races))
+
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from pca import PCA
+
+
+def data(n=2000, d=12, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.standard_normal((n, d)) @ rng.standard_normal((d, d)) + rng.uniform(-5, 5, d)
+
+
+@pytest.mark.parametrize("solver", ["svd", "randomized"])
+def test_solvers_match_eigh(solver):
+    X = data()
+    exact = PCA(3, solver="eigh").fit(X)
+    model = PCA(3, solver=solver, random_state=0).fit(X)
+    assert np.allclose(model.components_, exact.components_, atol=1e-6)
+    assert np.allclose(model.explained_variance_ratio_, exact.explained_variance_ratio_)
+
+
+def test_partial_fit_batches_match_fit():
+    X = data()
+    streamed = PCA(3)
+    for start in range(0, len(X), 300):
+        streamed.partial_fit(X[start:start + 300])
+    full = PCA(3, solver="eigh").fit(X)
+    assert np.allclose(streamed.components_, full.components_, atol=1e-8)
+    assert np.allclose(streamed.explained_variance_, full.explained_variance_)
+
+
+@pytest.mark.parametrize("solver", ["eigh", "svd", "randomized"])
+def test_partial_fit_after_fit_ignores_later_changes_to_the_fit_rows(solver):
+    X, more = data(seed=0), data(500, seed=1)
+    reference = PCA(3, solver="eigh").fit(X.copy()).partial_fit(more)
+
+    model = PCA(3, solver=solver, random_state=0).fit(X)
+    X[:] = 0
+    model.partial_fit(more)
+    assert np.allclose(model.components_, reference.components_, atol=1e-8)
+    assert np.allclose(model.explained_variance_, reference.explained_variance_)
+
+
+def test_partial_fit_needs_the_scatter():
+    model = PCA(3, solver="randomized", random_state=0, keep_scatter=False).fit(data())
+    with pytest.raises(ValueError):
+        model.partial_fit(data(10, seed=1))
+
+
+def test_save_load_round_trip(tmp_path):
+    X, more = data(), data(200, seed=1)
+    model = PCA(2, solver="svd").fit(X)
+    model.save(tmp_path / "pca.npz")
+    restored = PCA.load(tmp_path / "pca.npz")
+    assert np.allclose(restored.transform(X[:10]), model.transform(X[:10]))
+    assert np.allclose(restored.partial_fit(more).components_, model.partial_fit(more).components_)
+
+
+def test_save_unfitted_raises(tmp_path):
+    with pytest.raises(ValueError):
+        PCA(2).save(tmp_path / "pca.npz")
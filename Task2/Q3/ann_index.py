@@ -0,0 +1,349 @@
+"""
+    Nearest-neighbour indexes for trait profiles (the 7-dim vectors in
+    main.ipynb or averaged Word2Vec vectors from bonus.ipynb).
+
+    BruteForceIndex: exact, one matrix product per query batch.
+    IVFIndex: approximate inverted file. k-means splits the catalogue into
+        n_lists cells; a query only scans the n_probe cells whose centroids are
+        closest, then ranks those candidates exactly. More probes means better
+        recall and slower queries. train() it on a sample before adding.
+
+    Both take metric="cosine" or "l2", accept inserts at any time (ids must
+    be unique), return (ids, distances) sorted nearest first (cosine distance
+    is 1 - similarity, l2 the euclidean distance; id -1 pads rows with fewer
+    than k hits) and save / load to a single .npz file.
+"""
+import sys
+import time
+
+import numpy as np
+
+
+METRICS = ("cosine", "l2")
+
+
+class VectorIndex:
+    kind = None
+
+    def __init__(self, dim, metric="cosine"):
+        if metric not in METRICS:
+            raise ValueError(f"metric should be one of {METRICS}, got {metric!r}")
+        self.dim = dim
+        self.metric = metric
+        self._next_id = 0
+
+    def _prepare(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[None, :]
+        if X.shape[1] != self.dim:
+            raise ValueError(f"expected vectors of dimension {self.dim}, got {X.shape[1]}")
+        if self.metric == "cosine":
+            norms = np.linalg.norm(X, axis=1, keepdims=True)
+            norms[norms == 0] = 1
+            X = X / norms
+        return X
+
+    def _new_ids(self, n, ids):
+        if ids is None:
+            ids = np.arange(self._next_id, self._next_id + n, dtype=np.int64)
+        ids = np.asarray(ids, dtype=np.int64)
+        if len(ids) != n:
+            raise ValueError("need one id per vector")
+        if len(np.unique(ids)) != n:
+            raise ValueError("ids repeat within the batch")
+        # ids at or past _next_id can't be stored yet, only older ones need the lookup
+        old = ids[ids < self._next_id]
+        if len(old):
+            taken = old[np.isin(old, self._stored_ids())]
+            if len(taken):
+                raise ValueError(f"ids already in the index: {taken[:10].tolist()}")
+        self._next_id = max(self._next_id, int(ids.max()) + 1) if n else self._next_id
+        return ids
+
+    def _distances(self, q, X, norms):
+        """Distance-like scores of one query to rows X, smaller is nearer"""
+        if self.metric == "cosine":
+            return 1 - X @ q
+        return norms - 2 * (X @ q) + q @ q
+
+    def _finish(self, d):
+        if self.metric == "l2":
+            return np.sqrt(np.maximum(d, 0))
+        return d
+
+    @staticmethod
+    def _top(d, ids, k):
+        if len(d) > k:
+            part = np.argpartition(d, k - 1)[:k]
+            d, ids = d[part], ids[part]
+        order = np.argsort(d, kind="stable")
+        return ids[order], d[order]
+
+
+class BruteForceIndex(VectorIndex):
+    kind = "brute"
+
+    def __init__(self, dim, metric="cosine"):
+        super().__init__(dim, metric)
+        self._data = np.empty((0, dim), dtype=np.float32)
+        self._norms = np.empty(0, dtype=np.float32)
+        self._ids = np.empty(0, dtype=np.int64)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def _stored_ids(self):
+        return self._ids[:self._size]
+
+    def add(self, X, ids=None):
+        X = self._prepare(X)
+        ids = self._new_ids(len(X), ids)
+        need = self._size + len(X)
+        if need > len(self._data):
+            # grow geometrically so repeated inserts stay amortized O(1) per vector
+            capacity = max(need, 2 * len(self._data), 1024)
+            self._data = np.resize(self._data, (capacity, self.dim))
+            self._norms = np.resize(self._norms, capacity)
+            self._ids = np.resize(self._ids, capacity)
+        self._data[self._size:need] = X
+        self._norms[self._size:need] = (X * X).sum(axis=1)
+        self._ids[self._size:need] = ids
+        self._size = need
+        return ids
+
+    def search(self, Q, k=10):
+        Q = self._prepare(Q)
+        X, ids = self._data[:self._size], self._ids[:self._size]
+        out_ids = np.full((len(Q), k), -1, dtype=np.int64)
+        out_d = np.full((len(Q), k), np.inf, dtype=np.float32)
+        if not self._size:
+            return out_ids, out_d
+        # queries in blocks so the (queries x catalogue) matrix stays bounded
+        block = max(1, (1 << 24) // self._size)
+        for start in range(0, len(Q), block):
+            q = Q[start:start + block]
+            if self.metric == "cosine":
+                D = 1 - q @ X.T
+            else:
+                D = self._norms[:self._size][None, :] - 2 * (q @ X.T) + (q * q).sum(axis=1)[:, None]
+            for i, row in enumerate(D):
+                found, dist = self._top(row, ids, k)
+                out_ids[start + i, :len(found)] = found
+                out_d[start + i, :len(found)] = self._finish(dist)
+        return out_ids, out_d
+
+    def save(self, path):
+        np.savez(path, kind=self.kind, dim=self.dim, metric=self.metric, next_id=self._next_id,
+                 data=self._data[:self._size], ids=self._ids[:self._size])
+
+    @classmethod
+    def _from_file(cls, f):
+        index = cls(int(f["dim"]), str(f["metric"]))
+        index._next_id = int(f["next_id"])
+        index._data = f["data"].copy()
+        index._norms = (index._data * index._data).sum(axis=1)
+        index._ids = f["ids"].copy()
+        index._size = len(index._data)
+        return index
+
+
+def kmeans(X, k, n_iter=10, rng=None):
+    """Plain Lloyd's k-means, returns the centroids"""
+    rng = np.random.default_rng(rng)
+    centroids = X[rng.choice(len(X), k, replace=False)].copy()
+    for _ in range(n_iter):
+        labels = assign(X, centroids)
+        sums = np.zeros_like(centroids, dtype=np.float64)
+        np.add.at(sums, labels, X)
+        counts = np.bincount(labels, minlength=k)
+        empty = counts == 0
+        centroids[~empty] = (sums[~empty] / counts[~empty, None]).astype(np.float32)
+        # restart empty cells on random points so no list stays unused
+        centroids[empty] = X[rng.choice(len(X), int(empty.sum()), replace=False)]
+    return centroids
+
+
+def assign(X, centroids, block=65536):
+    """Index of the nearest centroid (l2) for every row"""
+    c_norms = (centroids * centroids).sum(axis=1)
+    labels = np.empty(len(X), dtype=np.int64)
+    for start in range(0, len(X), block):
+        x = X[start:start + block]
+        labels[start:start + len(x)] = np.argmin(c_norms[None, :] - 2 * (x @ centroids.T), axis=1)
+    return labels
+
+
+class IVFIndex(VectorIndex):
+    kind = "ivf"
+
+    def __init__(self, dim, metric="cosine", n_lists=1024, n_probe=8, seed=0):
+        super().__init__(dim, metric)
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.seed = seed
+        self.centroids = None
+        self._lists = [np.empty((0, dim), dtype=np.float32) for _ in range(n_lists)]
+        self._list_ids = [np.empty(0, dtype=np.int64) for _ in range(n_lists)]
+        self._list_norms = [np.empty(0, dtype=np.float32) for _ in range(n_lists)]
+        self._sizes = np.zeros(n_lists, dtype=np.int64)
+
+    def __len__(self):
+        return int(self._sizes.sum())
+
+    def _stored_ids(self):
+        return np.concatenate([self._list_ids[c][:self._sizes[c]] for c in range(self.n_lists)])
+
+    @property
+    def trained(self):
+        return self.centroids is not None
+
+    def train(self, X, sample=100000):
+        """Learns the cells from X (or a random sample of it)"""
+        X = self._prepare(X)
+        if len(X) < self.n_lists:
+            raise ValueError(f"need at least n_lists={self.n_lists} vectors to train, got {len(X)}")
+        rng = np.random.default_rng(self.seed)
+        if len(X) > sample:
+            X = X[rng.choice(len(X), sample, replace=False)]
+        self.centroids = kmeans(X, self.n_lists, rng=rng)
+        return self
+
+    def add(self, X, ids=None):
+        """Inserts vectors into the trained cells"""
+        if not self.trained:
+            raise ValueError(f"train() the index first, on a representative sample "
+                             f"(a few times n_lists={self.n_lists} vectors)")
+        X = self._prepare(X)
+        ids = self._new_ids(len(X), ids)
+        labels = assign(X, self.centroids)
+        order = np.argsort(labels, kind="stable")
+        labels, X, ids = labels[order], X[order], ids[order]
+        cells, starts = np.unique(labels, return_index=True)
+        ends = np.append(starts[1:], len(labels))
+        for cell, start, end in zip(cells, starts, ends):
+            self._append(cell, X[start:end], ids[start:end])
+        return ids[np.argsort(order)]
+
+    def _append(self, cell, X, ids):
+        size, need = self._sizes[cell], self._sizes[cell] + len(X)
+        if need > len(self._lists[cell]):
+            capacity = max(need, 2 * len(self._lists[cell]), 16)
+            self._lists[cell] = np.resize(self._lists[cell], (capacity, self.dim))
+            self._list_ids[cell] = np.resize(self._list_ids[cell], capacity)
+            self._list_norms[cell] = np.resize(self._list_norms[cell], capacity)
+        self._lists[cell][size:need] = X
+        self._list_ids[cell][size:need] = ids
+        self._list_norms[cell][size:need] = (X * X).sum(axis=1)
+        self._sizes[cell] = need
+
+    def search(self, Q, k=10, n_probe=None):
+        n_probe = min(n_probe or self.n_probe, self.n_lists)
+        Q = self._prepare(Q)
+        out_ids = np.full((len(Q), k), -1, dtype=np.int64)
+        out_d = np.full((len(Q), k), np.inf, dtype=np.float32)
+        if not self.trained:
+            return out_ids, out_d
+
+        c_norms = (self.centroids * self.centroids).sum(axis=1)
+        probes = np.argpartition(c_norms[None, :] - 2 * (Q @ self.centroids.T), n_probe - 1, axis=1)[:, :n_probe]
+        for i, (q, cells) in enumerate(zip(Q, probes)):
+            cells = [cell for cell in cells if self._sizes[cell]]
+            if not cells:
+                continue
+            X = np.concatenate([self._lists[cell][:self._sizes[cell]] for cell in cells])
+            ids = np.concatenate([self._list_ids[cell][:self._sizes[cell]] for cell in cells])
+            norms = np.concatenate([self._list_norms[cell][:self._sizes[cell]] for cell in cells])
+            found, dist = self._top(self._distances(q, X, norms), ids, k)
+            out_ids[i, :len(found)] = found
+            out_d[i, :len(found)] = self._finish(dist)
+        return out_ids, out_d
+
+    def save(self, path):
+        offsets = np.concatenate([[0], np.cumsum(self._sizes)])
+        data = np.concatenate([self._lists[c][:self._sizes[c]] for c in range(self.n_lists)])
+        ids = np.concatenate([self._list_ids[c][:self._sizes[c]] for c in range(self.n_lists)])
+        np.savez(path, kind=self.kind, dim=self.dim, metric=self.metric, next_id=self._next_id,
+                 n_lists=self.n_lists, n_probe=self.n_probe, seed=self.seed,
+                 centroids=self.centroids if self.trained else np.empty((0, self.dim), np.float32),
+                 data=data, ids=ids, offsets=offsets)
+
+    @classmethod
+    def _from_file(cls, f):
+        index = cls(int(f["dim"]), str(f["metric"]), int(f["n_lists"]), int(f["n_probe"]), int(f["seed"]))
+        index._next_id = int(f["next_id"])
+        if len(f["centroids"]):
+            index.centroids = f["centroids"].copy()
+        data, ids, offsets = f["data"], f["ids"], f["offsets"]
+        for cell in range(index.n_lists):
+            index._lists[cell] = data[offsets[cell]:offsets[cell + 1]].copy()
+            index._list_ids[cell] = ids[offsets[cell]:offsets[cell + 1]].copy()
+            index._list_norms[cell] = (index._lists[cell] ** 2).sum(axis=1)
+            index._sizes[cell] = offsets[cell + 1] - offsets[cell]
+        return index
+
+
+INDEXES = {cls.kind: cls for cls in (BruteForceIndex, IVFIndex)}
+
+
+def load_index(path):
+    with np.load(path) as f:
+        return INDEXES[str(f["kind"])]._from_file(f)
+
+
+def synthetic_profiles(n, dim=7, n_styles=200, seed=0):
+    """Trait profiles scored 1-10 around a few hundred driving styles, like the notebook's vectors"""
+    rng = np.random.default_rng(seed)
+    styles = rng.uniform(1, 10, size=(n_styles, dim))
+    profiles = styles[rng.integers(0, n_styles, n)] + rng.normal(0, 0.7, size=(n, dim))
+    return np.clip(profiles, 1, 10).astype(np.float32)
+
+
+def benchmark(n=1000000, n_queries=200, k=10, metric="cosine"):
+    """Recall@k against the exact index and per-query latency for several n_probe values"""
+    catalogue = synthetic_profiles(n)
+    queries = synthetic_profiles(n_queries, seed=1)
+
+    exact = BruteForceIndex(catalogue.shape[1], metric)
+    exact.add(catalogue)
+    start = time.perf_counter()
+    truth, _ = exact.search(queries, k)
+    brute_ms = (time.perf_counter() - start) / n_queries * 1000
+
+    start = time.perf_counter()
+    ivf = IVFIndex(catalogue.shape[1], metric, n_lists=1024)
+    ivf.train(catalogue).add(catalogue)
+    build = time.perf_counter() - start
+
+    print(f"{n} profiles, {n_queries} queries, k={k}, {metric}; IVF built in {build:.1f}s")
+    print(f"{'Index':<16} {'ms/query':>9} {'recall@k':>9}")
+    print(f"{'brute force':<16} {brute_ms:>9.3f} {1.0:>9.3f}")
+    for n_probe in (1, 2, 4, 8, 16, 32):
+        start = time.perf_counter()
+        found, _ = ivf.search(queries, k, n_probe=n_probe)
+        ms = (time.perf_counter() - start) / n_queries * 1000
+        recall = np.mean([len(set(a) & set(b)) / k for a, b in zip(found, truth)])
+        print(f"{f'ivf n_probe={n_probe}':<16} {ms:>9.3f} {recall:>9.3f}")
+    return ivf
+
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    metric = sys.argv[2] if len(sys.argv) > 2 else "cosine"
+    ivf = benchmark(n, metric=metric)
+
+    # new profiles go into the existing cells, then the index survives a save / load
+    newcomers = synthetic_profiles(1000, seed=2)
+    ids = ivf.add(newcomers)
+    found, _ = ivf.search(newcomers[:50], 1, n_probe=32)
+    print(f"\nInserted {len(ids)} profiles, {np.mean(found[:, 0] == ids[:50]) * 100:.0f}% find themselves first")
+    path = os.path.join(tempfile.mkdtemp(), "profiles_ivf.npz")
+    ivf.save(path)
+    restored = load_index(path)
+    print(f"Saved and reloaded {len(restored)} profiles, same answers: "
+          f"{np.array_equal(restored.search(newcomers, 10)[0], ivf.search(newcomers, 10)[0])}")
+    os.remove(path)
@@ -0,0 +1,218 @@
+"""
+    Word2Vec profile encoder for bonus.ipynb.
+
+    The model is trained once per corpus: its word vectors are written to
+    .w2v_cache/<hash>/ as vectors.npy + vocab.json, where the hash covers the
+    training sentences and the Word2Vec parameters. Later runs memory-map the
+    vectors instead of training again, and only training needs gensim.
+
+    ProfileEncoder maps every trait to its row id once, then encodes a whole
+    batch of profiles with one gather and one mean instead of a Python loop
+    per profile. Traits missing from the vocabulary follow the oov policy:
+        "zero"  - count as a zero vector, like the notebook meant to do
+        "skip"  - left out of the mean
+        "raise" - KeyError naming the missing traits
+
+        encoder = load_encoder()
+        vectors = encoder.encode([hassan, redbull, ferrari, mercedes])
+"""
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from similarity import cosine_matrix
+
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".w2v_cache")
+PARAMS = {"vector_size": 100, "window": 5, "min_count": 1, "epochs": 100}
+OOV_POLICIES = ("zero", "skip", "raise")
+
+# the notebook's traits and training sentences
+PROFILES = {
+    "Hassan": ["speed", "aggression", "adaptability", "technical_skill", "teamwork", "risk_taking", "consistency"],
+    "Red_Bull": ["speed", "aggression", "adaptability", "technical_skill", "teamwork", "risk_taking", "inconsistency"],
+    "Ferrari": ["passion", "emotion", "adaptability", "technical_skill", "teamwork", "risk_taking", "inconsistency"],
+    "Mercedes": ["precision", "discipline", "adaptability", "technical_skill", "teamwork", "control", "consistency"],
+}
+TRAINING = [
+    ["speed", "fast", "quick", "racing", "velocity", "rapid"],
+    ["speed", "acceleration", "swift", "performance"],
+    ["aggression", "aggressive", "bold", "fierce", "attacking"],
+    ["aggression", "intensity", "forceful", "dynamic"],
+    ["adaptability", "flexible", "adjustable", "versatile"],
+    ["adaptability", "responsive", "adaptive", "changeable"],
+    ["technical_skill", "expertise", "precision", "engineering"],
+    ["technical_skill", "knowledge", "competence", "proficiency"],
+    ["teamwork", "collaboration", "cooperation", "unity"],
+    ["teamwork", "collective", "partnership", "together"],
+    ["risk_taking", "bold", "daring", "brave", "adventurous"],
+    ["risk_taking", "courage", "fearless", "gambling"],
+    ["consistency", "reliable", "steady", "dependable", "stable"],
+    ["consistency", "regular", "uniform", "predictable"],
+    ["inconsistency", "unpredictable", "erratic", "variable"],
+    ["inconsistency", "irregular", "unreliable", "unstable"],
+    ["passion", "emotion", "love", "enthusiasm", "dedication"],
+    ["passion", "fervor", "intensity", "commitment"],
+    ["emotion", "feeling", "passionate", "expressive", "heart"],
+    ["emotion", "sentiment", "emotional", "intense"],
+    ["precision", "accuracy", "exact", "meticulous", "careful"],
+    ["precision", "detailed", "systematic", "methodical"],
+    ["discipline", "control", "order", "systematic", "structured"],
+    ["discipline", "focus", "dedication", "commitment"],
+    ["control", "management", "regulation", "command", "mastery"],
+    ["control", "restraint", "discipline", "governance"],
+]
+
+
+def corpus_hash(sentences, params=PARAMS):
+    """Key of a trained model: changes when the sentences or the Word2Vec parameters do"""
+    payload = json.dumps({"sentences": sentences, "params": params}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def train(sentences=TRAINING, params=PARAMS, cache_dir=CACHE_DIR, workers=None):
+    """
+        Folder with the trained vectors, training Word2Vec on all cores only
+        if this corpus hasn't been trained before
+    """
+    folder = os.path.join(cache_dir, corpus_hash(sentences, params))
+    if os.path.exists(os.path.join(folder, "vocab.json")):
+        return folder
+
+    from gensim.models import Word2Vec
+    model = Word2Vec(sentences=sentences, workers=workers or os.cpu_count() or 1, **params)
+
+    # written next to the final folder and renamed, so a crash never leaves half a model behind
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = tempfile.mkdtemp(dir=cache_dir)
+    np.save(os.path.join(tmp, "vectors.npy"), model.wv.vectors.astype(np.float32))
+    with open(os.path.join(tmp, "vocab.json"), "w") as f:
+        json.dump(model.wv.index_to_key, f)
+    try:
+        os.replace(tmp, folder)
+    except OSError:
+        # another run finished the same corpus first
+        shutil.rmtree(tmp)
+    return folder
+
+
+class ProfileEncoder:
+    def __init__(self, vectors, vocab, oov="zero"):
+        if oov not in OOV_POLICIES:
+            raise ValueError(f"oov should be one of {OOV_POLICIES}, got {oov!r}")
+        self.vectors = vectors
+        self.vocab = list(vocab)
+        self.index = {word: i for i, word in enumerate(self.vocab)}
+        self.oov = oov
+
+    @classmethod
+    def load(cls, folder, oov="zero"):
+        with open(os.path.join(folder, "vocab.json")) as f:
+            vocab = json.load(f)
+        return cls(np.load(os.path.join(folder, "vectors.npy"), mmap_mode="r"), vocab, oov)
+
+    @property
+    def dim(self):
+        return self.vectors.shape[1]
+
+    def __contains__(self, word):
+        return word in self.index
+
+    def missing(self, profiles):
+        """Traits of the profiles that aren't in the vocabulary"""
+        return sorted({trait for traits in profiles for trait in traits if trait not in self.index})
+
+    def to_ids(self, profiles):
+        """
+            (n, longest profile) array of vocabulary ids: -1 for missing traits,
+            -2 for padding. Encoding the same profiles again can reuse it
+        """
+        if self.oov == "raise":
+            missing = self.missing(profiles)
+            if missing:
+                raise KeyError(f"traits not in the vocabulary: {missing}")
+        width = max((len(traits) for traits in profiles), default=0)
+        ids = np.full((len(profiles), width), -2, dtype=np.int64)
+        for row, traits in enumerate(profiles):
+            ids[row, :len(traits)] = [self.index.get(trait, -1) for trait in traits]
+        return ids
+
+    def encode_ids(self, ids, block=8192):
+        """Mean vector of every row of to_ids, in blocks so the gathered vectors stay small"""
+        out = np.zeros((len(ids), self.dim), dtype=np.float32)
+        for start in range(0, len(ids), block):
+            rows = ids[start:start + block]
+            known = rows >= 0
+            gathered = np.asarray(self.vectors)[np.where(known, rows, 0)]
+            sums = np.einsum("nkd,nk->nd", gathered, known.astype(np.float32))
+            counts = known.sum(axis=1) if self.oov == "skip" else (rows != -2).sum(axis=1)
+            # a profile with no known traits stays a zero vector
+            out[start:start + len(rows)] = sums / np.maximum(counts, 1)[:, None]
+        return out
+
+    def encode(self, profiles):
+        return self.encode_ids(self.to_ids(profiles))
+
+    def encode_one(self, traits):
+        return self.encode([traits])[0]
+
+
+def load_encoder(sentences=TRAINING, params=PARAMS, cache_dir=CACHE_DIR, oov="zero"):
+    return ProfileEncoder.load(train(sentences, params, cache_dir), oov)
+
+
+def profile_loop(encoder, profiles):
+    """The notebook's get_embedding per profile (with np.zeros), for comparison"""
+    out = []
+    for traits in profiles:
+        embeddings = []
+        for trait in traits:
+            if trait in encoder:
+                embeddings.append(encoder.vectors[encoder.index[trait]])
+            else:
+                embeddings.append(np.zeros(encoder.dim))
+        out.append(np.mean(embeddings, axis=0))
+    return np.array(out)
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+
+    start = time.perf_counter()
+    encoder = load_encoder()
+    print(f"Vectors for {len(encoder.vocab)} words ready in {(time.perf_counter() - start) * 1000:.0f} ms "
+          f"(cached per corpus hash in {CACHE_DIR}/)")
+
+    names = list(PROFILES)
+    vectors = encoder.encode([PROFILES[name] for name in names])
+    sims = cosine_matrix(vectors[:1], vectors[1:])[0]
+    for name, sim in zip(names[1:], sims):
+        print(f"Hassan and {name} similarity: {sim:.4f}")
+    print(f"Best semantic match: {names[1 + int(np.argmax(sims))]}")
+
+    # random profiles from the vocabulary plus a few unknown traits
+    rng = np.random.default_rng(0)
+    words = encoder.vocab + ["unknown_trait"]
+    profiles = [[words[i] for i in rng.integers(0, len(words), rng.integers(3, 10))] for _ in range(n)]
+
+    start = time.perf_counter()
+    looped = profile_loop(encoder, profiles)
+    loop_time = time.perf_counter() - start
+    start = time.perf_counter()
+    ids = encoder.to_ids(profiles)
+    ids_time = time.perf_counter() - start
+    start = time.perf_counter()
+    batched = encoder.encode_ids(ids)
+    batch_time = time.perf_counter() - start
+
+    assert np.allclose(looped, batched, atol=1e-6)
+    print(f"\n{n} profiles: per-profile loop {loop_time * 1000:.0f} ms, "
+          f"batched {(ids_time + batch_time) * 1000:.0f} ms ({ids_time * 1000:.0f} ms mapping to ids, "
+          f"{batch_time * 1000:.0f} ms gather + mean), same vectors")
+    print(f"OOV policy {encoder.oov!r}, missing traits: {encoder.missing(profiles)}")
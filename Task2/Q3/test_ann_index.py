@@ -0,0 +1,140 @@
+import numpy as np
+import pytest
+
+from ann_index import BruteForceIndex, IVFIndex, METRICS, assign, kmeans, load_index, synthetic_profiles
+
+
+def exact(catalogue, queries, k, metric):
+    """Reference neighbours by sorting every distance, as float64"""
+    X, Q = catalogue.astype(float), queries.astype(float)
+    if metric == "cosine":
+        X = X / np.linalg.norm(X, axis=1, keepdims=True)
+        Q = Q / np.linalg.norm(Q, axis=1, keepdims=True)
+        D = 1 - Q @ X.T
+    else:
+        D = np.sqrt(((Q[:, None, :] - X[None, :, :]) ** 2).sum(axis=2))
+    order = np.argsort(D, axis=1, kind="stable")[:, :k]
+    return order, np.take_along_axis(D, order, axis=1)
+
+
+def build(kind, catalogue, metric="cosine", n_lists=8):
+    if kind is IVFIndex:
+        # probing every cell, so the IVF index answers exactly too
+        return IVFIndex(7, metric, n_lists=n_lists, n_probe=n_lists).train(catalogue)
+    return BruteForceIndex(7, metric)
+
+
+@pytest.fixture(scope="module")
+def catalogue():
+    # continuous values so no two profiles tie
+    return np.random.default_rng(0).uniform(1, 10, size=(3000, 7)).astype(np.float32)
+
+
+@pytest.fixture(scope="module")
+def queries():
+    return np.random.default_rng(1).uniform(1, 10, size=(40, 7)).astype(np.float32)
+
+
+@pytest.mark.parametrize("metric", METRICS)
+def test_brute_force_is_exact(catalogue, queries, metric):
+    index = BruteForceIndex(7, metric)
+    index.add(catalogue)
+    ids, distances = index.search(queries, 5)
+    expected_ids, expected_distances = exact(catalogue, queries, 5, metric)
+    assert np.array_equal(ids, expected_ids)
+    assert np.allclose(distances, expected_distances, atol=1e-3)
+
+
+@pytest.mark.parametrize("metric", METRICS)
+def test_ivf_probing_every_cell_is_exact(catalogue, queries, metric):
+    index = IVFIndex(7, metric, n_lists=16).train(catalogue)
+    index.add(catalogue)
+    ids, distances = index.search(queries, 5, n_probe=16)
+    expected_ids, expected_distances = exact(catalogue, queries, 5, metric)
+    assert np.array_equal(ids, expected_ids)
+    assert np.allclose(distances, expected_distances, atol=1e-3)
+
+
+def test_ivf_recall_grows_with_probes():
+    catalogue = synthetic_profiles(5000)
+    queries = synthetic_profiles(100, seed=1)
+    truth, _ = exact(catalogue, queries, 10, "l2")
+    index = IVFIndex(7, "l2", n_lists=64).train(catalogue)
+    index.add(catalogue)
+    recalls = []
+    for n_probe in (1, 4, 16, 64):
+        found, _ = index.search(queries, 10, n_probe=n_probe)
+        recalls.append(np.mean([len(set(a) & set(b)) / 10 for a, b in zip(found, truth)]))
+    assert recalls == sorted(recalls)
+    assert recalls[-1] == 1.0 and recalls[1] > 0.8
+
+
+@pytest.mark.parametrize("kind", [BruteForceIndex, IVFIndex])
+def test_inserts_later_are_found(catalogue, kind):
+    index = build(kind, catalogue, "l2")
+    first = index.add(catalogue[:1000])
+    second = index.add(catalogue[1000:1010])
+    assert first.tolist() == list(range(1000)) and second.tolist() == list(range(1000, 1010))
+    assert len(index) == 1010
+    ids, distances = index.search(catalogue[1000:1010], 1)
+    assert ids[:, 0].tolist() == second.tolist()
+    # |x|^2 - 2 x.x + |x|^2 in float32 leaves a few 1e-5 of |x|^2 ~ 300, so ~0.005 after the sqrt
+    assert np.allclose(distances[:, 0], 0, atol=1e-2)
+
+
+@pytest.mark.parametrize("kind", [BruteForceIndex, IVFIndex])
+def test_repeated_ids_are_rejected(catalogue, kind):
+    index = build(kind, catalogue)
+    index.add(catalogue[:3], ids=[5, 9, 2])
+    with pytest.raises(ValueError):
+        index.add(catalogue[3:5], ids=[9, 20])
+    with pytest.raises(ValueError):
+        index.add(catalogue[3:5], ids=[30, 30])
+    with pytest.raises(ValueError):
+        index.add(catalogue[3:5], ids=[31])
+    assert len(index) == 3
+    # automatic ids start after the largest one given
+    assert index.add(catalogue[3:4]).tolist() == [10]
+
+
+def test_short_rows_are_padded():
+    index = BruteForceIndex(3, "l2")
+    index.add([[0, 0, 1], [0, 1, 0]])
+    ids, distances = index.search([0, 0, 1], 4)
+    assert ids[0].tolist() == [0, 1, -1, -1]
+    assert np.isinf(distances[0, 2:]).all()
+    assert (BruteForceIndex(3).search([1, 0, 0], 2)[0] == -1).all()
+
+
+def test_wrong_dimension_and_metric_raise():
+    with pytest.raises(ValueError):
+        BruteForceIndex(3, "manhattan")
+    with pytest.raises(ValueError):
+        BruteForceIndex(3).add(np.ones((2, 4)))
+
+
+def test_ivf_needs_training(catalogue):
+    index = IVFIndex(7, n_lists=8)
+    with pytest.raises(ValueError):
+        index.add(catalogue[:10])
+    with pytest.raises(ValueError):
+        index.train(catalogue[:4])
+
+
+@pytest.mark.parametrize("kind", [BruteForceIndex, IVFIndex])
+def test_save_load_round_trip(tmp_path, catalogue, queries, kind):
+    index = build(kind, catalogue, n_lists=16)
+    index.add(catalogue)
+    index.save(tmp_path / "index.npz")
+    restored = load_index(tmp_path / "index.npz")
+    assert type(restored) is kind and len(restored) == len(index)
+    assert np.array_equal(restored.search(queries, 10)[0], index.search(queries, 10)[0])
+    # ids keep counting from where the saved index stopped
+    assert restored.add(queries[:1]).tolist() == [len(catalogue)]
+
+
+def test_kmeans_cells_cover_every_point(catalogue):
+    centroids = kmeans(catalogue, 12, rng=0)
+    labels = assign(catalogue, centroids, block=500)
+    assert np.array_equal(labels, np.argmin(((catalogue[:, None] - centroids[None]) ** 2).sum(axis=2), axis=1))
+    assert len(np.unique(labels)) == 12
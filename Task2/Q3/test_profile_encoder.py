@@ -0,0 +1,88 @@
+import json
+import os
+import sys
+
+import numpy as np
+import pytest
+
+from profile_encoder import PARAMS, TRAINING, ProfileEncoder, corpus_hash, load_encoder, profile_loop, train
+
+
+VOCAB = ["speed", "aggression", "teamwork", "consistency"]
+VECTORS = np.array([[1, 0, 0], [0, 2, 0], [0, 0, 4], [2, 2, 2]], dtype=np.float32)
+
+
+def write_model(folder, vectors=VECTORS, vocab=VOCAB):
+    os.makedirs(folder, exist_ok=True)
+    np.save(os.path.join(folder, "vectors.npy"), vectors)
+    with open(os.path.join(folder, "vocab.json"), "w") as f:
+        json.dump(vocab, f)
+    return str(folder)
+
+
+def random_profiles(words, n, seed=0):
+    rng = np.random.default_rng(seed)
+    return [[words[i] for i in rng.integers(0, len(words), rng.integers(0, 8))] for _ in range(n)]
+
+
+@pytest.mark.parametrize("oov, expected", [
+    ("zero", [[1 / 3, 2 / 3, 0]]),      # the unknown trait counts as a zero vector
+    ("skip", [[1 / 2, 1, 0]]),
+])
+def test_oov_policies(oov, expected):
+    encoder = ProfileEncoder(VECTORS, VOCAB, oov)
+    assert np.allclose(encoder.encode([["speed", "aggression", "charisma"]]), expected)
+
+
+def test_raise_names_the_missing_traits():
+    encoder = ProfileEncoder(VECTORS, VOCAB, "raise")
+    with pytest.raises(KeyError, match="charisma"):
+        encoder.encode([["speed"], ["charisma", "speed"]])
+    assert encoder.missing([["speed"], ["charisma", "luck", "charisma"]]) == ["charisma", "luck"]
+
+
+def test_unknown_policy_raises():
+    with pytest.raises(ValueError):
+        ProfileEncoder(VECTORS, VOCAB, "ignore")
+
+
+def test_profiles_without_known_traits_are_zero():
+    for oov in ("zero", "skip"):
+        encoded = ProfileEncoder(VECTORS, VOCAB, oov).encode([[], ["luck"], ["teamwork"]])
+        assert np.array_equal(encoded[:2], np.zeros((2, 3)))
+        assert np.allclose(encoded[2], [0, 0, 4])
+
+
+@pytest.mark.parametrize("block", [1, 7, 8192])
+def test_batched_matches_the_notebook_loop(block):
+    encoder = ProfileEncoder(VECTORS, VOCAB)
+    profiles = [p for p in random_profiles(VOCAB + ["luck"], 50) if p]   # the loop can't average nothing
+    assert np.allclose(encoder.encode_ids(encoder.to_ids(profiles), block=block), profile_loop(encoder, profiles))
+
+
+def test_to_ids_marks_missing_and_padding():
+    ids = ProfileEncoder(VECTORS, VOCAB).to_ids([["teamwork", "luck"], ["speed"], []])
+    assert ids.tolist() == [[2, -1], [0, -2], [-2, -2]]
+
+
+def test_loaded_vectors_are_memory_mapped(tmp_path):
+    encoder = ProfileEncoder.load(write_model(tmp_path / "model"), oov="skip")
+    assert isinstance(encoder.vectors, np.memmap)
+    assert encoder.vocab == VOCAB and encoder.dim == 3 and "speed" in encoder
+    assert np.allclose(encoder.encode_one(["speed", "teamwork"]), [0.5, 0, 2])
+
+
+def test_trained_corpus_is_loaded_without_gensim(tmp_path, monkeypatch):
+    cache_dir = str(tmp_path / "cache")
+    write_model(os.path.join(cache_dir, corpus_hash(TRAINING, PARAMS)))
+    monkeypatch.setitem(sys.modules, "gensim", None)     # importing gensim would now fail
+    encoder = load_encoder(cache_dir=cache_dir)
+    assert encoder.vocab == VOCAB
+    assert train(cache_dir=cache_dir) == os.path.join(cache_dir, corpus_hash(TRAINING, PARAMS))
+
+
+def test_corpus_hash_follows_sentences_and_params():
+    base = corpus_hash(TRAINING, PARAMS)
+    assert corpus_hash([list(s) for s in TRAINING], dict(PARAMS)) == base
+    assert corpus_hash(TRAINING[:-1], PARAMS) != base
+    assert corpus_hash(TRAINING, dict(PARAMS, epochs=50)) != base
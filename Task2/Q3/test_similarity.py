@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from similarity import (METRICS, TeamMatcher, manhattan_distances, pairwise_loop, similarity, similarity_matrices,
+                        top_k, top_k_blocked)
+
+
+TEAMS = {
+    "Red_bull": [10, 9, 6, 7, 6, 9, 5],
+    "Ferrari": [9, 7, 6, 6, 7, 7, 5],
+    "Mercedes": [8, 6, 8, 9, 9, 5, 9],
+}
+HASSAN = [9, 8, 7, 6, 7, 8, 6]
+
+
+def profiles(n, d=7, seed=0):
+    # continuous values so there are no ties in the rankings
+    return np.random.default_rng(seed).uniform(1, 10, size=(n, d))
+
+
+def test_matrices_match_the_pair_loop():
+    A, B = profiles(40), profiles(25, seed=1)
+    looped = pairwise_loop(A, B)
+    batched = similarity_matrices(A, B)
+    for metric in METRICS:
+        assert np.allclose(batched[metric], looped[metric]), metric
+        assert np.allclose(similarity(A, B, metric), looped[metric]), metric
+
+
+def test_manhattan_blocks_do_not_change_the_result():
+    A, B = profiles(37), profiles(11, seed=1)
+    assert np.allclose(manhattan_distances(A, B, block_rows=5), manhattan_distances(A, B))
+
+
+def test_identical_vectors_are_most_similar():
+    sims = similarity_matrices(HASSAN, [HASSAN])
+    for metric in METRICS:
+        assert np.isclose(sims[metric][0, 0], 1.0)
+
+
+def test_zero_vector_has_cosine_zero():
+    assert similarity([0] * 7, [HASSAN], "cosine")[0, 0] == 0
+
+
+def test_unknown_metric_raises():
+    with pytest.raises(ValueError):
+        similarity(HASSAN, [HASSAN], "jaccard")
+
+
+def test_top_k_is_sorted_best_first():
+    S = similarity_matrices(profiles(30), profiles(20, seed=1))["cosine"]
+    idx, scores = top_k(S, 5)
+    assert np.array_equal(idx, np.argsort(-S, axis=1)[:, :5])
+    assert np.all(np.diff(scores, axis=1) <= 0)
+    assert top_k(S, 50)[0].shape == (30, 20)
+
+
+@pytest.mark.parametrize("metric", METRICS)
+@pytest.mark.parametrize("block_rows, block_cols", [(7, 6), (1, 100), (4096, 65536)])
+def test_blocked_top_k_matches_the_full_matrix(metric, block_rows, block_cols):
+    A, B = profiles(50), profiles(33, seed=1)
+    expected = top_k(similarity(A, B, metric), 4)
+    found = top_k_blocked(A, B, 4, metric, block_rows, block_cols)
+    assert np.array_equal(found[0], expected[0])
+    assert np.allclose(found[1], expected[1])
+
+
+def test_matcher_reproduces_the_notebook():
+    matcher = TeamMatcher(TEAMS)
+    sims = matcher.scores(HASSAN)
+    loop = pairwise_loop(np.array([HASSAN], dtype=float), matcher.profiles)
+    for metric in METRICS:
+        assert np.allclose(sims[metric], loop[metric])
+    assert np.allclose(sims["average"], sum(loop[metric] for metric in METRICS) / 3)
+    assert matcher.best(HASSAN)[0][0][0] == "Ferrari"
+
+
+def test_matcher_blocked_best_agrees():
+    matcher = TeamMatcher({f"team{i}": row for i, row in enumerate(profiles(20, seed=1))})
+    drivers = profiles(15)
+    assert matcher.best(drivers, 3, "euclidean", block_rows=4) == matcher.best(drivers, 3, "euclidean")
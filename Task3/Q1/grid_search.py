@@ -0,0 +1,178 @@
+"""
+    Batched version of the notebook's grid search.
+
+    Every (learning_rate, lambda_l1, weight_type) config is one column of a
+    weight matrix W, so one gradient descent step for all of them is one
+    X @ W product, one sigmoid over the n x configs matrix and one X.T @ E
+    product (in cache-sized row blocks), instead of a gradient_descent call
+    per config. num_iterations is not trained separately: the 1000, 2000
+    and 3000 iteration models are snapshots of the 5000 iteration run,
+    scored on the validation set as the run passes them. Column groups are
+    spread over a process pool.
+"""
+from concurrent.futures import ProcessPoolExecutor
+import os
+import sys
+import time
+
+import numpy as np
+
+from logistic import (compute_class_weights, evaluate_model, gradient_descent, init_weights,
+                      load_data, predict, sigmoid)
+
+
+PARAM_GRID = {
+    "learning_rate": [0.01, 0.1, 0.5, 1.0],
+    "lambda_l1": [0.0, 0.001, 0.01, 0.1],
+    "num_iterations": [1000, 2000, 3000, 5000],
+    "weight_type": ["uniform", "balanced", "inverse", "log"],
+}
+
+
+def train_columns(X, y, learning_rates, lambdas, weight_types, checkpoints, w0, b0=0.0, block_rows=1024):
+    """
+        Gradient descent for all configs at once. Returns {iterations: (W, b, costs)}
+        for every checkpoint, where column j of W / b / costs belongs to config j and
+        costs is the last cost the notebook would have logged (every 100 iterations)
+    """
+    n, d = X.shape
+    lrs = np.asarray(learning_rates, dtype=float)
+    lambdas = np.asarray(lambdas, dtype=float)
+    l1 = np.zeros((d + 1, len(lrs)))
+    l1[:d] = lambdas        # no L1 on the bias
+    SW = np.stack([compute_class_weights(y, weight_type)[0] for weight_type in weight_types], axis=1)
+    Y = y[:, None].astype(float)
+
+    # the bias is the last row of W, against a column of ones in X
+    X1 = np.hstack([X, np.ones((n, 1))])
+    # p - y is sign * sigmoid(sign * z) with sign = +1 for y = 0 and -1 for y = 1, so the
+    # weighted error is A / (1 + exp(-sign * z)) with A = sign * weights: one divide instead
+    # of a reciprocal, a subtraction and a product over the n x configs matrix
+    sign = 1 - 2 * Y
+    A = sign * SW
+    X_neg = -sign * X1
+    W = np.tile(np.append(np.asarray(w0, dtype=float), b0)[:, None], (1, len(lrs)))
+    costs = np.full(len(lrs), np.inf)
+    buffer = np.empty((block_rows, len(lrs)))
+    snapshots = {}
+
+    for i in range(max(checkpoints)):
+        if i % 100 == 0:
+            P = np.clip(sigmoid(X1 @ W), 1e-15, 1 - 1e-15)
+            costs = -np.mean(SW * (Y * np.log(P) + (1 - Y) * np.log(1 - P)), axis=0) + lambdas * np.abs(W[:d]).sum(axis=0)
+
+        # row blocks keep the n x configs temporaries in cache
+        grad = np.zeros_like(W)
+        for start in range(0, n, block_rows):
+            Z = buffer[:min(block_rows, n - start)]
+            np.matmul(X_neg[start:start + block_rows], W, out=Z)
+            np.clip(Z, -500, 500, out=Z)
+            np.exp(Z, out=Z)
+            Z += 1
+            np.divide(A[start:start + block_rows], Z, out=Z)
+            grad += X1[start:start + block_rows].T @ Z
+        W -= lrs * (grad / n + l1 * np.sign(W))
+
+        if i + 1 in checkpoints:
+            snapshots[i + 1] = (W[:d].copy(), W[d].copy(), costs.copy())
+    return snapshots
+
+
+def run_group(task):
+    """Worker entry point: trains one group of configs and scores every checkpoint"""
+    X_train, y_train, X_val, y_val, configs, checkpoints = task
+    w0, b0 = init_weights(X_train.shape[1])
+    lrs, lambdas, weight_types = zip(*configs)
+    snapshots = train_columns(X_train, y_train, lrs, lambdas, weight_types, checkpoints, w0, b0)
+
+    results = []
+    for iterations, (W, b, costs) in snapshots.items():
+        for j, (lr, lambda_l1, weight_type) in enumerate(configs):
+            y_pred, _ = predict(X_val, W[:, j], b[j], threshold=0.5)
+            metrics = evaluate_model(y_val, y_pred)
+            results.append({
+                "learning_rate": lr, "lambda_l1": lambda_l1, "num_iterations": iterations,
+                "weight_type": weight_type, "f1_score": metrics["f1_score"],
+                "accuracy": metrics["accuracy"], "precision": metrics["precision"],
+                "recall": metrics["recall"], "final_cost": costs[j],
+                "weights": W[:, j], "bias": b[j], "metrics": metrics,
+            })
+    return results
+
+
+def grid_search(X_train, y_train, X_val, y_val, param_grid=PARAM_GRID, workers=None):
+    """
+        (results_log, best_params) like the notebook's loop: results in the
+        notebook's order, best is the first config with the highest F1
+    """
+    configs = [(lr, lambda_l1, weight_type)
+               for lr in param_grid["learning_rate"]
+               for lambda_l1 in param_grid["lambda_l1"]
+               for weight_type in param_grid["weight_type"]]
+    checkpoints = sorted(param_grid["num_iterations"])
+    workers = min(workers or os.cpu_count() or 1, len(configs))
+    groups = [configs[k::workers] for k in range(workers)]
+    tasks = [(X_train, y_train, X_val, y_val, group, checkpoints) for group in groups]
+
+    if workers == 1:
+        found = [run_group(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            found = list(pool.map(run_group, tasks))
+
+    by_key = {(r["learning_rate"], r["lambda_l1"], r["num_iterations"], r["weight_type"]): r
+              for results in found for r in results}
+    results_log = [by_key[(lr, lambda_l1, iterations, weight_type)]
+                   for lr in param_grid["learning_rate"]
+                   for lambda_l1 in param_grid["lambda_l1"]
+                   for iterations in param_grid["num_iterations"]
+                   for weight_type in param_grid["weight_type"]]
+    best = max(results_log, key=lambda r: r["f1_score"])    # max keeps the first of equal scores
+    best_params = {key: best[key] for key in ("learning_rate", "lambda_l1", "num_iterations", "weight_type",
+                                              "weights", "bias", "metrics")}
+    return results_log, best_params
+
+
+def loop_search(X_train, y_train, X_val, y_val, configs):
+    """The notebook's way for the given (lr, lambda_l1, num_iterations, weight_type) configs"""
+    results = []
+    for lr, lambda_l1, num_iter, weight_type in configs:
+        sample_weights, _ = compute_class_weights(y_train, weight_type)
+        w, b = init_weights(X_train.shape[1])
+        w_trained, b_trained, cost_history = gradient_descent(
+            X_train, y_train, w, b, learning_rate=lr, lambda_l1=lambda_l1,
+            num_iterations=num_iter, sample_weights=sample_weights)
+        y_pred_val, _ = predict(X_val, w_trained, b_trained, threshold=0.5)
+        results.append((evaluate_model(y_val, y_pred_val)["f1_score"], cost_history[-1]))
+    return results
+
+
+if __name__ == "__main__":
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count()
+    X_train, X_val, y_train, y_val, _ = load_data()
+    n_configs = np.prod([len(values) for values in PARAM_GRID.values()])
+    total_iterations = n_configs // len(PARAM_GRID["num_iterations"]) * sum(PARAM_GRID["num_iterations"])
+
+    start = time.perf_counter()
+    results_log, best_params = grid_search(X_train, y_train, X_val, y_val, workers=workers)
+    batch_time = time.perf_counter() - start
+
+    # the notebook loop on a few configs, checked against the batched results and extrapolated
+    sample = [(0.5, 0.0, 1000, "uniform"), (0.1, 0.01, 1000, "balanced"), (1.0, 0.1, 2000, "inverse")]
+    start = time.perf_counter()
+    looped = loop_search(X_train, y_train, X_val, y_val, sample)
+    loop_time = (time.perf_counter() - start) / sum(config[2] for config in sample) * total_iterations
+    by_key = {(r["learning_rate"], r["lambda_l1"], r["num_iterations"], r["weight_type"]): r for r in results_log}
+    for config, (f1, cost) in zip(sample, looped):
+        assert np.isclose(by_key[config]["f1_score"], f1) and np.isclose(by_key[config]["final_cost"], cost)
+
+    print(f"{n_configs} configs, {len(X_train)} training rows")
+    print(f"notebook loop (extrapolated from {len(sample)} configs): {loop_time:.0f}s")
+    print(f"batched on {workers} worker(s): {batch_time:.1f}s ({loop_time / batch_time:.0f}x), same F1 and costs")
+    print("\nTop 5 configs by validation F1:")
+    for r in sorted(results_log, key=lambda r: -r["f1_score"])[:5]:
+        print(f"LR: {r['learning_rate']} | L1: {r['lambda_l1']} | Iter: {r['num_iterations']} | "
+              f"Weight: {r['weight_type']} | Error: {r['final_cost']:.4f} | F1: {r['f1_score']:.4f}")
+    print(f"\nBest F1 Score: {best_params['metrics']['f1_score']:.4f}")
+    for param in ("learning_rate", "lambda_l1", "num_iterations", "weight_type"):
+        print(f"  {param}: {best_params[param]}")
@@ -0,0 +1,238 @@
+"""
+    Logistic regression helpers from main.ipynb, importable by the scripts in
+    this folder. The functions are the notebook's own; load_data does the
+    notebook's preprocessing (standardize num_links, num_words and
+    sender_score, stratified 80/20 split) with numpy instead of sklearn.
+"""
+import numpy as np
+import pandas as pd
+
+
+FEATURES = ["num_links", "num_words", "has_offer", "sender_score", "all_caps"]
+NUMERICAL_FEATURES = ["num_links", "num_words", "sender_score"]
+WEIGHT_TYPES = ["uniform", "balanced", "inverse", "log"]
+
+
+def sigmoid(z):
+    """Sigmoid activation function"""
+    z = np.clip(z, -500, 500)  # Prevent overflow
+    return 1 / (1 + np.exp(-z))
+
+
+def class_weights_from_counts(class_counts, weight_type='balanced'):
+    """Per class weights from the class counts, so streamed data only needs the counts"""
+    class_counts = np.asarray(class_counts, dtype=float)
+    n_classes, n_samples = len(class_counts), class_counts.sum()
+
+    if weight_type == 'balanced':
+        # Standard balanced weights: n_samples / (n_classes * class_count)
+        weights = n_samples / (n_classes * class_counts)
+    elif weight_type == 'inverse':
+        # Simple inverse frequency
+        weights = 1.0 / class_counts
+        weights = weights / np.sum(weights) * n_classes  # Normalize
+    elif weight_type == 'log':
+        # Log-scaled weights for extreme imbalance
+        weights = np.log(n_samples / class_counts)
+    else:  # uniform
+        weights = np.ones(n_classes)
+    return weights
+
+
+def compute_class_weights(y, weight_type='balanced'):
+    """Compute dynamic class weights"""
+    classes = np.unique(y)
+    weights = class_weights_from_counts(np.bincount(y)[classes], weight_type)
+
+    # Create sample weights array
+    sample_weights = np.zeros(len(y))
+    for i, class_label in enumerate(classes):
+        sample_weights[y == class_label] = weights[i]
+
+    return sample_weights, weights
+
+
+def compute_cost(X, y, w, b, lambda_l1=0.0, sample_weights=None):
+    """Cost function with L1 regularization and class weights"""
+    z = np.dot(X, w) + b
+    y_pred = sigmoid(z)
+
+    # Prevent log(0) by clipping predictions
+    epsilon = 1e-15
+    y_pred = np.clip(y_pred, epsilon, 1 - epsilon)
+
+    # Cross-entropy cost with sample weights
+    if sample_weights is not None:
+        cost = -np.mean(sample_weights * (y * np.log(y_pred) + (1 - y) * np.log(1 - y_pred)))
+    else:
+        cost = -np.mean(y * np.log(y_pred) + (1 - y) * np.log(1 - y_pred))
+
+    # L1 regularization (Lasso)
+    l1_cost = lambda_l1 * np.sum(np.abs(w))
+
+    return cost + l1_cost
+
+
+def compute_gradients(X, y, w, b, lambda_l1=0.0, sample_weights=None):
+    """Compute gradients for gradient descent with class weights"""
+    m = X.shape[0]
+    z = np.dot(X, w) + b
+    y_pred = sigmoid(z)
+
+    # Gradients with sample weights
+    error = y_pred - y
+    if sample_weights is not None:
+        error = error * sample_weights
+
+    dw = (1/m) * np.dot(X.T, error) + lambda_l1 * np.sign(w)
+    db = (1/m) * np.sum(error)
+
+    return dw, db
+
+
+def gradient_descent(X, y, w, b, learning_rate=0.1, lambda_l1=0.0, num_iterations=1000,
+                     sample_weights=None):
+    """Gradient descent optimization with class weights"""
+    costs = []
+
+    for i in range(num_iterations):
+        # Compute cost and gradients
+        cost = compute_cost(X, y, w, b, lambda_l1, sample_weights)
+        dw, db = compute_gradients(X, y, w, b, lambda_l1, sample_weights)
+
+        # Update parameters
+        w = w - learning_rate * dw
+        b = b - learning_rate * db
+
+        # Store cost every 100 iterations
+        if i % 100 == 0:
+            costs.append(cost)
+
+    return w, b, costs
+
+
+def predict(X, w, b, threshold=0.5):
+    """Make predictions"""
+    z = np.dot(X, w) + b
+    y_pred_proba = sigmoid(z)
+    y_pred = (y_pred_proba >= threshold).astype(int)
+    return y_pred, y_pred_proba
+
+
+def evaluate_model(y_true, y_pred):
+    """Calculate evaluation metrics"""
+    tp = np.sum((y_true == 1) & (y_pred == 1))
+    fp = np.sum((y_true == 0) & (y_pred == 1))
+    fn = np.sum((y_true == 1) & (y_pred == 0))
+    tn = np.sum((y_true == 0) & (y_pred == 0))
+
+    accuracy = (tp + tn) / (tp + tn + fp + fn)
+    precision = tp / (tp + fp) if (tp + fp) > 0 else 0
+    recall = tp / (tp + fn) if (tp + fn) > 0 else 0
+    f1 = 2 * (precision * recall) / (precision + recall) if (precision + recall) > 0 else 0
+
+    return {
+        'accuracy': accuracy, 'precision': precision, 'recall': recall, 'f1_score': f1,
+        'tp': tp, 'fp': fp, 'fn': fn, 'tn': tn
+    }
+
+
+def log_loss(y_true, y_pred):
+    eps = 1e-15
+    y_pred = np.clip(y_pred, eps, 1 - eps)
+    return -np.mean(y_true*np.log(y_pred) + (1-y_true)*np.log(1 - y_pred))
+
+
+def print_results(metrics, title="Model Results"):
+    """Print evaluation metrics in a clean format"""
+    print(f"\n{title}")
+    print("="*50)
+    print(f"Accuracy:  {metrics['accuracy']:.4f} ({metrics['accuracy']*100:.2f}%)")
+    print(f"Precision: {metrics['precision']:.4f}")
+    print(f"Recall:    {metrics['recall']:.4f}")
+    print(f"F1 Score:  {metrics['f1_score']:.4f}")
+    print(f"\nConfusion Matrix:")
+    print(f"  TP: {metrics['tp']:4d} | FP: {metrics['fp']:4d}")
+    print(f"  FN: {metrics['fn']:4d} | TN: {metrics['tn']:4d}")
+
+
+def init_weights(n_features, seed=42):
+    """The notebook's starting point: np.random.seed(42) then N(0, 0.01) weights, bias 0"""
+    return np.random.RandomState(seed).normal(0, 0.01, n_features), 0.0
+
+
+class Scaler:
+    """StandardScaler's fit / transform (population std) on chosen columns"""
+    def __init__(self, columns=None):
+        self.columns = columns
+        self.mean_ = None
+        self.scale_ = None
+        self.n_samples_seen_ = 0
+        self._m2 = None     # sum of squared deviations from the mean (partial_fit)
+
+    def fit(self, X):
+        X = np.asarray(X, dtype=float)
+        columns = self.columns if self.columns is not None else list(range(X.shape[1]))
+        self.columns = columns
+        self.mean_ = X[:, columns].mean(axis=0)
+        self.scale_ = X[:, columns].std(axis=0)
+        self.scale_[self.scale_ == 0] = 1.0
+        self.n_samples_seen_ = len(X)
+        self._m2 = X[:, columns].var(axis=0) * len(X)
+        return self
+
+    def partial_fit(self, X):
+        """Folds in a batch of rows, for data that is only seen in chunks"""
+        X = np.asarray(X, dtype=float)
+        if self.columns is None:
+            self.columns = list(range(X.shape[1]))
+        m = len(X)
+        if m == 0:
+            return self
+        batch = X[:, self.columns]
+        batch_mean = batch.mean(axis=0)
+        batch_m2 = ((batch - batch_mean) ** 2).sum(axis=0)
+        if self.n_samples_seen_ == 0:
+            self.mean_, self._m2 = batch_mean, batch_m2
+        else:
+            # merge two groups' means and squared deviations (Chan et al.)
+            n = self.n_samples_seen_
+            delta = batch_mean - self.mean_
+            self._m2 = self._m2 + batch_m2 + delta ** 2 * n * m / (n + m)
+            self.mean_ = self.mean_ + delta * m / (n + m)
+        self.n_samples_seen_ += m
+        self.scale_ = np.sqrt(self._m2 / self.n_samples_seen_)
+        self.scale_[self.scale_ == 0] = 1.0
+        return self
+
+    def transform(self, X):
+        X = np.array(X, dtype=float)
+        X[:, self.columns] = (X[:, self.columns] - self.mean_) / self.scale_
+        return X
+
+    def fit_transform(self, X):
+        return self.fit(X).transform(X)
+
+
+def train_val_split(X, y, test_size=0.2, seed=45):
+    """Stratified shuffle split: every class keeps its share in both parts"""
+    rng = np.random.default_rng(seed)
+    val = []
+    for label in np.unique(y):
+        rows = rng.permutation(np.flatnonzero(y == label))
+        val.append(rows[:int(round(len(rows) * test_size))])
+    is_val = np.zeros(len(y), dtype=bool)
+    is_val[np.concatenate(val)] = True
+    train_rows, val_rows = rng.permutation(np.flatnonzero(~is_val)), rng.permutation(np.flatnonzero(is_val))
+    return X[train_rows], X[val_rows], y[train_rows], y[val_rows]
+
+
+def load_data(path="train.csv", test_size=0.2, seed=45):
+    """X_train, X_val, y_train, y_val and the fitted Scaler, prepared like the notebook"""
+    data = pd.read_csv(path)
+    X = data[FEATURES].to_numpy(dtype=float)
+    y = data["is_spam"].to_numpy(dtype=np.int64)
+    scaler = Scaler([FEATURES.index(name) for name in NUMERICAL_FEATURES])
+    X = scaler.fit_transform(X)
+    X_train, X_val, y_train, y_val = train_val_split(X, y, test_size, seed)
+    return X_train, X_val, y_train, y_val, scaler
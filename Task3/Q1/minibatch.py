@@ -0,0 +1,246 @@
+"""
+    Out-of-core mini-batch training for the spam classifier.
+
+    The CSV is never loaded whole: a first pass streams it in chunks to fit
+    the scaler (running mean / variance) and count the classes for the
+    notebook's class weights, then every epoch streams it again and runs
+    mini-batch SGD or Adam on the rows of each chunk. One sigmoid per batch
+    feeds both the loss and the gradient.
+
+    A fixed share of rows (picked by a hash of the row number, so the same
+    rows every epoch) is held out as validation, capped at max_val_rows.
+    Training stops once the validation loss hasn't improved by min_delta for
+    `patience` epochs and keeps the best weights. Memory depends on the chunk
+    size and the validation cap, not on the file size.
+
+        model = MiniBatchTrainer(optimizer="adam", weight_type="balanced").fit("train.csv")
+        y_pred, y_proba = model.predict(X)
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from logistic import (FEATURES, NUMERICAL_FEATURES, Scaler, class_weights_from_counts, evaluate_model,
+                      init_weights, sigmoid)
+
+
+OPTIMIZERS = ("sgd", "adam")
+_HASH = 2654435761     # Knuth's multiplicative hash, spreads row numbers over 32 bits
+
+
+def loss_and_gradients(X, y, w, b, lambda_l1=0.0, sample_weights=None):
+    """compute_cost and compute_gradients from a single forward pass"""
+    m = X.shape[0]
+    y_pred = sigmoid(X @ w + b)
+    p = np.clip(y_pred, 1e-15, 1 - 1e-15)
+    losses = -(y * np.log(p) + (1 - y) * np.log(1 - p))
+    error = y_pred - y
+    if sample_weights is not None:
+        losses = losses * sample_weights
+        error = error * sample_weights
+    loss = losses.mean() + lambda_l1 * np.abs(w).sum()
+    dw = X.T @ error / m + lambda_l1 * np.sign(w)
+    db = error.sum() / m
+    return loss, dw, db
+
+
+class SGD:
+    def __init__(self, learning_rate=0.1):
+        self.learning_rate = learning_rate
+
+    def step(self, params, grads):
+        return params - self.learning_rate * grads
+
+
+class Adam:
+    def __init__(self, learning_rate=0.01, beta1=0.9, beta2=0.999, eps=1e-8):
+        self.learning_rate = learning_rate
+        self.beta1, self.beta2, self.eps = beta1, beta2, eps
+        self.m = self.v = None
+        self.t = 0
+
+    def step(self, params, grads):
+        if self.m is None:
+            self.m, self.v = np.zeros_like(params), np.zeros_like(params)
+        self.t += 1
+        self.m = self.beta1 * self.m + (1 - self.beta1) * grads
+        self.v = self.beta2 * self.v + (1 - self.beta2) * grads ** 2
+        m_hat = self.m / (1 - self.beta1 ** self.t)
+        v_hat = self.v / (1 - self.beta2 ** self.t)
+        return params - self.learning_rate * m_hat / (np.sqrt(v_hat) + self.eps)
+
+
+def read_chunks(path, chunksize):
+    """(first row number, X, y) per chunk, X with the notebook's feature columns"""
+    row = 0
+    for chunk in pd.read_csv(path, usecols=FEATURES + ["is_spam"], chunksize=chunksize):
+        yield row, chunk[FEATURES].to_numpy(dtype=float), chunk["is_spam"].to_numpy(dtype=np.int64)
+        row += len(chunk)
+
+
+def is_validation(rows, val_fraction):
+    return (rows * _HASH) % (1 << 32) < val_fraction * (1 << 32)
+
+
+class MiniBatchTrainer:
+    def __init__(self, optimizer="adam", learning_rate=None, lambda_l1=0.0, weight_type="uniform",
+                 batch_size=256, chunksize=50000, max_epochs=50, patience=3, min_delta=1e-4,
+                 val_fraction=0.2, max_val_rows=100000, seed=42):
+        if optimizer not in OPTIMIZERS:
+            raise ValueError(f"optimizer should be one of {OPTIMIZERS}, got {optimizer!r}")
+        if not 0 < val_fraction < 1:
+            raise ValueError(f"val_fraction should be between 0 and 1 (exclusive), got {val_fraction}")
+        if max_epochs < 1:
+            raise ValueError(f"max_epochs should be at least 1, got {max_epochs}")
+        self.optimizer = optimizer
+        self.learning_rate = learning_rate or (0.01 if optimizer == "adam" else 0.1)
+        self.lambda_l1 = lambda_l1
+        self.weight_type = weight_type
+        self.batch_size = batch_size
+        self.chunksize = chunksize
+        self.max_epochs = max_epochs
+        self.patience = patience
+        self.min_delta = min_delta
+        self.val_fraction = val_fraction
+        self.max_val_rows = max_val_rows
+        self.seed = seed
+
+        self.scaler_ = None
+        self.class_weights_ = None
+        self.w_, self.b_ = None, 0.0
+        self.history_ = []          # (epoch, train loss, validation loss) per epoch
+        self.best_epoch_ = None
+        self.stopped_early_ = False
+
+    def _first_pass(self, path):
+        """Scaler fitted on every row (like the notebook), class counts of the training rows"""
+        self.scaler_ = Scaler([FEATURES.index(name) for name in NUMERICAL_FEATURES])
+        counts = np.zeros(2, dtype=np.int64)
+        val_X, val_y, stored = [], [], 0
+        for row, X, y in read_chunks(path, self.chunksize):
+            self.scaler_.partial_fit(X)
+            val = is_validation(np.arange(row, row + len(y)), self.val_fraction)
+            counts += np.bincount(y[~val], minlength=2)
+            # unscaled for now, the scaler is only final after the pass
+            keep = np.flatnonzero(val)[:max(0, self.max_val_rows - stored)]
+            val_X.append(X[keep])
+            val_y.append(y[keep])
+            stored += len(keep)
+        self.class_weights_ = class_weights_from_counts(counts, self.weight_type)
+        return self.scaler_.transform(np.concatenate(val_X)), np.concatenate(val_y)
+
+    def validation_loss(self, X, y):
+        loss, _, _ = loss_and_gradients(X, y, self.w_, self.b_, 0.0, self.class_weights_[y])
+        return loss
+
+    def fit(self, path):
+        X_val, y_val = self._first_pass(path)
+        self.w_, self.b_ = init_weights(len(FEATURES), self.seed)
+        optimizer = Adam(self.learning_rate) if self.optimizer == "adam" else SGD(self.learning_rate)
+        rng = np.random.default_rng(self.seed)
+        best_loss, best, waited = np.inf, None, 0
+        self.history_ = []
+        self.stopped_early_ = False
+
+        for epoch in range(1, self.max_epochs + 1):
+            total, batches = 0.0, 0
+            for row, X, y in read_chunks(path, self.chunksize):
+                train = np.flatnonzero(~is_validation(np.arange(row, row + len(y)), self.val_fraction))
+                # rows are shuffled within a chunk, the file order decides the rest
+                train = rng.permutation(train)
+                X = self.scaler_.transform(X[train])
+                y = y[train]
+                sample_weights = self.class_weights_[y]
+                for start in range(0, len(y), self.batch_size):
+                    batch = slice(start, start + self.batch_size)
+                    loss, dw, db = loss_and_gradients(X[batch], y[batch], self.w_, self.b_,
+                                                      self.lambda_l1, sample_weights[batch])
+                    params = optimizer.step(np.append(self.w_, self.b_), np.append(dw, db))
+                    self.w_, self.b_ = params[:-1], params[-1]
+                    total += loss
+                    batches += 1
+
+            val_loss = self.validation_loss(X_val, y_val)
+            self.history_.append((epoch, total / max(batches, 1), val_loss))
+            if val_loss < best_loss - self.min_delta:
+                best_loss, best, waited = val_loss, (self.w_.copy(), self.b_, epoch), 0
+            else:
+                waited += 1
+                if waited >= self.patience:
+                    self.stopped_early_ = True
+                    break
+
+        if best is None:
+            # no finite validation loss (e.g. the loss diverged): keep the last weights
+            best = (self.w_, self.b_, len(self.history_))
+        self.w_, self.b_, self.best_epoch_ = best
+        return self
+
+    def predict_proba(self, X):
+        return sigmoid(self.scaler_.transform(X) @ self.w_ + self.b_)
+
+    def predict(self, X, threshold=0.5):
+        y_pred_proba = self.predict_proba(X)
+        return (y_pred_proba >= threshold).astype(int), y_pred_proba
+
+
+def synthetic_log(source, path, copies, seed=0):
+    """A copies x bigger message log: the rows of source repeated with jittered counts and scores"""
+    data = pd.read_csv(source)
+    rng = np.random.default_rng(seed)
+    with open(path, "w", newline="") as f:
+        for k in range(copies):
+            part = data.copy()
+            part["message_id"] += k * len(data)
+            part["num_words"] = np.maximum(part["num_words"] + rng.integers(-5, 6, len(part)), 1)
+            part["sender_score"] = np.clip(part["sender_score"] + rng.normal(0, 0.02, len(part)), 0, 1)
+            part.to_csv(f, header=k == 0, index=False)
+
+
+def traced(fn):
+    """Result, seconds and peak traced MB of fn"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak / 1e6
+
+
+if __name__ == "__main__":
+    copies = [int(arg) for arg in sys.argv[1:]] or [1, 10, 40]
+
+    data = pd.read_csv("train.csv")
+    X, y = data[FEATURES].to_numpy(dtype=float), data["is_spam"].to_numpy(dtype=np.int64)
+    val = is_validation(np.arange(len(y)), 0.2)
+    print(f"{'Optimizer':<10} {'Weights':<9} {'Epochs':>6} {'Best':>5} {'Val loss':>9} {'Val F1':>7} {'Seconds':>8}")
+    for optimizer in OPTIMIZERS:
+        for weight_type in ("uniform", "balanced"):
+            start = time.perf_counter()
+            model = MiniBatchTrainer(optimizer, weight_type=weight_type).fit("train.csv")
+            elapsed = time.perf_counter() - start
+            f1 = evaluate_model(y[val], model.predict(X[val])[0])["f1_score"]
+            best_loss = min(loss for _, _, loss in model.history_)
+            print(f"{optimizer:<10} {weight_type:<9} {len(model.history_):>6} {model.best_epoch_:>5} "
+                  f"{best_loss:>9.4f} {f1:>7.4f} {elapsed:>8.2f}")
+
+    # same training on bigger logs: time grows with the rows, peak memory doesn't
+    folder = tempfile.mkdtemp()
+    try:
+        print(f"\n{'Rows':>9} {'File MB':>8} {'Seconds':>8} {'Peak MB':>8}")
+        for k in copies:
+            path = os.path.join(folder, f"log_{k}.csv")
+            synthetic_log("train.csv", path, k)
+            trainer = MiniBatchTrainer("adam", max_epochs=2, patience=10, max_val_rows=20000)
+            _, elapsed, peak = traced(lambda: trainer.fit(path))
+            print(f"{len(data) * k:>9} {os.path.getsize(path) / 1e6:>8.1f} {elapsed:>8.2f} {peak:>8.1f}")
+            os.remove(path)
+    finally:
+        shutil.rmtree(folder)
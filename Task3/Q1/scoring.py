@@ -0,0 +1,307 @@
+"""
+    Scoring service for the trained spam model.
+
+    export_model folds the scaler into the weights: for a standardized column
+    w * (x - mean) / std = (w / std) * x - w * mean / std, so raw feature rows
+    are scored with w' = w / std and b' = b - sum(w * mean / std) and no
+    scaling step. The artifact is a small .npz of float32 weights that only
+    needs numpy to load.
+
+    SpamScorer scores contiguous float32 (n, 5) arrays. MicroBatcher sits in
+    front of it for concurrent callers: requests arriving within max_wait_ms
+    of each other are scored as one batch. serve() is a local TCP stand-in for
+    the real service (request: uint32 row count + float32 rows, response:
+    float32 probabilities; a count of 0 or above max_batch closes the
+    connection).
+"""
+from concurrent.futures import Future
+import os
+import queue
+import socket
+import socketserver
+import struct
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+
+# logistic.FEATURES, repeated here: logistic imports pandas and scoring needs only numpy
+FEATURES = ["num_links", "num_words", "has_offer", "sender_score", "all_caps"]
+
+
+def scaled_columns(scaler, columns=None):
+    """
+        Indices into FEATURES of the columns scaler standardizes: columns if
+        given (names or indices), else the repo Scaler's columns, a fitted
+        sklearn StandardScaler's feature_names_in_, or every feature when the
+        scaler has one mean per feature
+    """
+    if columns is None:
+        columns = getattr(scaler, "columns", None)
+    if columns is None:
+        columns = getattr(scaler, "feature_names_in_", None)
+    if columns is None and len(scaler.mean_) == len(FEATURES):
+        columns = range(len(FEATURES))
+    if columns is None:
+        raise ValueError("can't tell which features the scaler standardizes, pass columns=")
+    columns = [FEATURES.index(c) if isinstance(c, str) else int(c) for c in columns]
+    if len(columns) != len(scaler.mean_):
+        raise ValueError(f"{len(columns)} columns for a scaler fitted on {len(scaler.mean_)}")
+    return columns
+
+
+def export_model(path, w, b, scaler, threshold=0.5, columns=None):
+    """Saves the model with the scaler folded into w and b (see scaled_columns for columns)"""
+    w = np.asarray(w, dtype=float).copy()
+    b = float(b)
+    columns = scaled_columns(scaler, columns)
+    b -= float(np.sum(w[columns] * scaler.mean_ / scaler.scale_))
+    w[columns] = w[columns] / scaler.scale_
+    np.savez(path, w=w.astype(np.float32), b=np.float32(b), threshold=np.float32(threshold),
+             features=np.array(FEATURES))
+
+
+class SpamScorer:
+    def __init__(self, w, b, threshold=0.5, features=FEATURES):
+        self.w = np.ascontiguousarray(w, dtype=np.float32)
+        self.b = np.float32(b)
+        self.threshold = float(threshold)
+        self.features = list(features)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as f:
+            return cls(f["w"], f["b"], f["threshold"], f["features"].tolist())
+
+    def score(self, X):
+        """Spam probabilities of raw (unscaled) feature rows"""
+        X = np.ascontiguousarray(X, dtype=np.float32).reshape(-1, len(self.w))
+        z = X @ self.w
+        z += self.b
+        # logistic.sigmoid clips at 500, too far for float32 (exp overflows past ~88); at 50
+        # the probabilities are already within 2e-22 of 0 or 1, so the two agree
+        np.clip(z, -50, 50, out=z)
+        return 1 / (1 + np.exp(-z))
+
+    def predict(self, X):
+        return (self.score(X) >= self.threshold).astype(np.int8)
+
+
+class MicroBatcher:
+    """
+        Collects concurrent score requests and runs them as one batch, up to
+        max_batch rows or max_wait_ms after the first request of the batch
+    """
+    def __init__(self, scorer, max_batch=1024, max_wait_ms=1.0):
+        self.scorer = scorer
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.batches = 0
+        self.requests = 0
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def submit(self, X):
+        """Future of the probabilities for rows X"""
+        future = Future()
+        self._queue.put((np.ascontiguousarray(X, dtype=np.float32).reshape(-1, len(self.scorer.w)), future))
+        return future
+
+    def score(self, X):
+        return self.submit(X).result()
+
+    def close(self):
+        self._queue.put(None)
+        self._worker.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            pending, rows = [item], len(item[0])
+            deadline = time.perf_counter() + self.max_wait
+            while rows < self.max_batch:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.perf_counter()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.put(None)
+                    break
+                pending.append(item)
+                rows += len(item[0])
+
+            try:
+                probabilities = self.scorer.score(np.concatenate([X for X, _ in pending]))
+            except Exception as e:
+                for _, future in pending:
+                    future.set_exception(e)
+                continue
+            start = 0
+            for X, future in pending:
+                future.set_result(probabilities[start:start + len(X)])
+                start += len(X)
+            self.batches += 1
+            self.requests += len(pending)
+
+
+def _recv_exactly(sock, n):
+    data = bytearray()
+    while len(data) < n:
+        chunk = sock.recv(n - len(data))
+        if not chunk:
+            raise ConnectionError("connection closed mid message")
+        data += chunk
+    return bytes(data)
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        sock, batcher = self.request, self.server.batcher
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        n_features = len(batcher.scorer.w)
+        while True:
+            header = sock.recv(4)
+            if not header:
+                return
+            if len(header) < 4:
+                header += _recv_exactly(sock, 4 - len(header))
+            (n,) = struct.unpack("<I", header)
+            if not 0 < n <= self.server.max_batch:
+                # the count decides how much is read next, a bad one ends the connection before any of it
+                return
+            rows = np.frombuffer(_recv_exactly(sock, 4 * n * n_features), dtype=np.float32)
+            sock.sendall(batcher.score(rows).astype(np.float32).tobytes())
+
+
+class ScoringServer(socketserver.ThreadingTCPServer):
+    """Requests of more than max_batch rows (default: the batcher's) are refused by closing the connection"""
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, batcher, address=("127.0.0.1", 0), max_batch=None):
+        super().__init__(address, _Handler)
+        self.batcher = batcher
+        self.max_batch = max_batch or batcher.max_batch
+
+
+def serve(batcher, address=("127.0.0.1", 0), max_batch=None):
+    """Starts the server on a background thread and returns it, server.server_address has the port"""
+    server = ScoringServer(batcher, address, max_batch)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class ScoringClient:
+    def __init__(self, address):
+        self.sock = socket.create_connection(address)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def score(self, X):
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        self.sock.sendall(struct.pack("<I", len(X)) + X.tobytes())
+        return np.frombuffer(_recv_exactly(self.sock, 4 * len(X)), dtype=np.float32)
+
+    def close(self):
+        self.sock.close()
+
+
+def load_test(address, X, n_clients=8, requests_per_client=500, rows_per_request=4, seed=0):
+    """n_clients threads each sending small requests; returns (latencies in seconds, wall time)"""
+    latencies = [[] for _ in range(n_clients)]
+
+    def client(k):
+        rng = np.random.default_rng(seed + k)
+        conn = ScoringClient(address)
+        try:
+            for _ in range(requests_per_client):
+                rows = X[rng.integers(0, len(X), rows_per_request)]
+                start = time.perf_counter()
+                conn.score(rows)
+                latencies[k].append(time.perf_counter() - start)
+        finally:
+            conn.close()
+
+    threads = [threading.Thread(target=client, args=(k,)) for k in range(n_clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return np.concatenate(latencies), time.perf_counter() - start
+
+
+def report(name, latencies, seconds, rows_per_request):
+    ms = latencies * 1000
+    print(f"{name:<24} {np.percentile(ms, 50):>8.3f} {np.percentile(ms, 99):>8.3f} "
+          f"{len(ms) / seconds:>10.0f} {len(ms) * rows_per_request / seconds:>10.0f}")
+
+
+if __name__ == "__main__":
+    import pandas as pd
+
+    import logistic
+    from logistic import NUMERICAL_FEATURES, gradient_descent, init_weights, load_data, predict
+
+    assert logistic.FEATURES == FEATURES
+
+    n_clients = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    rows_per_request = 4
+
+    # a model trained the notebook's way (best grid params, fewer iterations)
+    X_train, X_val, y_train, y_val, scaler = load_data()
+    w, b = init_weights(len(FEATURES))
+    w, b, _ = gradient_descent(X_train, y_train, w, b, learning_rate=0.5, num_iterations=1000)
+
+    path = os.path.join(tempfile.mkdtemp(), "spam_model.npz")
+    export_model(path, w, b, scaler)
+    scorer = SpamScorer.load(path)
+    os.remove(path)
+
+    test = pd.read_csv("test.csv")
+    X_test = test[FEATURES].to_numpy(dtype=np.float32)
+    _, reference = predict(scaler.transform(X_test), w, b)
+    print(f"Exported model, max |difference| from scaler + predict on test.csv: "
+          f"{np.abs(scorer.score(X_test) - reference).max():.2e}")
+
+    # the notebook's per-call path: DataFrame copy, scaler, predict
+    def notebook_score(frame):
+        scaled = frame.copy()
+        scaled[NUMERICAL_FEATURES] = (frame[NUMERICAL_FEATURES] - scaler.mean_) / scaler.scale_
+        return predict(scaled.values, w, b)[1]
+
+    rng = np.random.default_rng(0)
+    requests = [rng.integers(0, len(test), rows_per_request) for _ in range(2000)]
+    print(f"\n{'Path':<24} {'p50 ms':>8} {'p99 ms':>8} {'req/s':>10} {'rows/s':>10}")
+    for name, fn in (("pandas + scaler", lambda rows: notebook_score(test.iloc[rows][FEATURES])),
+                     ("exported, in process", lambda rows: scorer.score(X_test[rows]))):
+        latencies = []
+        start = time.perf_counter()
+        for rows in requests:
+            t = time.perf_counter()
+            fn(rows)
+            latencies.append(time.perf_counter() - t)
+        report(name, np.array(latencies), time.perf_counter() - start, rows_per_request)
+
+    with MicroBatcher(scorer, max_wait_ms=0.5) as batcher:
+        server = serve(batcher)
+        try:
+            latencies, seconds = load_test(server.server_address, X_test, n_clients,
+                                           rows_per_request=rows_per_request)
+        finally:
+            server.shutdown()
+            server.server_close()
+        report(f"socket, {n_clients} clients", latencies, seconds, rows_per_request)
+        print(f"\nMicro-batching: {batcher.requests} requests scored in {batcher.batches} batches "
+              f"({batcher.requests / batcher.batches:.1f} per batch)")
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from grid_search import grid_search, loop_search
+from logistic import load_data
+
+
+GRID = {
+    "learning_rate": [0.1, 1.0],
+    "lambda_l1": [0.0, 0.01],
+    "num_iterations": [100, 300],
+    "weight_type": ["uniform", "balanced", "log"],
+}
+
+
+@pytest.fixture(scope="module")
+def data():
+    X_train, X_val, y_train, y_val, _ = load_data()
+    return X_train[:2000], y_train[:2000], X_val, y_val
+
+
+@pytest.fixture(scope="module")
+def batched(data):
+    X_train, y_train, X_val, y_val = data
+    return grid_search(X_train, y_train, X_val, y_val, GRID, workers=1)
+
+
+def test_batched_matches_the_notebook_loop(data, batched):
+    X_train, y_train, X_val, y_val = data
+    results_log, _ = batched
+    configs = [(r["learning_rate"], r["lambda_l1"], r["num_iterations"], r["weight_type"]) for r in results_log]
+    assert len(configs) == 24 and configs[:2] == [(0.1, 0.0, 100, "uniform"), (0.1, 0.0, 100, "balanced")]
+    picked = [results_log[k] for k in (0, 7, 13, 23)]
+    looped = loop_search(X_train, y_train, X_val, y_val,
+                         [(r["learning_rate"], r["lambda_l1"], r["num_iterations"], r["weight_type"]) for r in picked])
+    for r, (f1, cost) in zip(picked, looped):
+        assert np.isclose(r["f1_score"], f1) and np.isclose(r["final_cost"], cost)
+
+
+def test_results_do_not_depend_on_the_worker_count(data, batched):
+    results_log, best = batched
+    again, best_again = grid_search(*data, GRID, workers=3)
+    for r, other in zip(results_log, again):
+        assert np.allclose(r["weights"], other["weights"]) and r["f1_score"] == other["f1_score"]
+    assert {key: best[key] for key in GRID} == {key: best_again[key] for key in GRID}
+
+
+def test_best_is_the_first_highest_f1(batched):
+    results_log, best = batched
+    top = max(r["f1_score"] for r in results_log)
+    first = next(r for r in results_log if r["f1_score"] == top)
+    assert {key: best[key] for key in GRID} == {key: first[key] for key in GRID}
@@ -0,0 +1,134 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from logistic import (FEATURES, NUMERICAL_FEATURES, Scaler, class_weights_from_counts, compute_class_weights,
+                      compute_cost, compute_gradients)
+from minibatch import SGD, Adam, MiniBatchTrainer, is_validation, loss_and_gradients, read_chunks
+
+
+@pytest.fixture(scope="module")
+def log(tmp_path_factory):
+    """The first 4000 rows of train.csv, enough to train on in well under a second"""
+    path = tmp_path_factory.mktemp("data") / "log.csv"
+    pd.read_csv("train.csv", nrows=4000).to_csv(path, index=False)
+    return str(path)
+
+
+def problem(n=300, d=5, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.normal(size=(n, d)), rng.integers(0, 2, n), rng.normal(size=d), 0.2
+
+
+@pytest.mark.parametrize("lambda_l1", [0.0, 0.05])
+@pytest.mark.parametrize("weighted", [False, True])
+def test_one_pass_matches_cost_and_gradients(lambda_l1, weighted):
+    X, y, w, b = problem()
+    sample_weights = compute_class_weights(y, "balanced")[0] if weighted else None
+    loss, dw, db = loss_and_gradients(X, y, w, b, lambda_l1, sample_weights)
+    assert np.isclose(loss, compute_cost(X, y, w, b, lambda_l1, sample_weights))
+    expected_dw, expected_db = compute_gradients(X, y, w, b, lambda_l1, sample_weights)
+    assert np.allclose(dw, expected_dw) and np.isclose(db, expected_db)
+
+
+@pytest.mark.parametrize("sizes", [[1000], [1, 999], [300, 0, 300, 400], [7] * 142 + [6]])
+def test_scaler_partial_fit_matches_fit(sizes):
+    X = np.random.default_rng(0).normal(50, 20, size=(1000, 4))
+    X[:, 2] = 3.0           # constant column keeps scale 1
+    streamed = Scaler([0, 2, 3])
+    start = 0
+    for size in sizes:
+        streamed.partial_fit(X[start:start + size])
+        start += size
+    full = Scaler([0, 2, 3]).fit(X)
+    assert streamed.n_samples_seen_ == 1000
+    assert np.allclose(streamed.mean_, full.mean_) and np.allclose(streamed.scale_, full.scale_)
+    assert streamed.scale_[1] == 1.0
+    assert np.allclose(streamed.transform(X), full.transform(X))
+
+
+@pytest.mark.parametrize("weight_type", ["uniform", "balanced", "inverse", "log"])
+def test_weights_from_counts_match_the_labels(weight_type):
+    y = np.array([0] * 90 + [1] * 10)
+    _, weights = compute_class_weights(y, weight_type)
+    assert np.allclose(class_weights_from_counts([90, 10], weight_type), weights)
+
+
+def test_validation_rows_are_a_stable_share():
+    rows = np.arange(100000)
+    val = is_validation(rows, 0.2)
+    assert abs(val.mean() - 0.2) < 0.01
+    assert np.array_equal(is_validation(rows[5000:6000], 0.2), val[5000:6000])
+
+
+def test_chunks_keep_row_numbers(log):
+    starts = [row for row, _, _ in read_chunks(log, 1500)]
+    assert starts == [0, 1500, 3000]
+    _, X, y = next(read_chunks(log, 10))
+    assert X.shape == (10, len(FEATURES)) and set(y) <= {0, 1}
+
+
+def test_adam_first_step_is_the_learning_rate():
+    params = Adam(0.01).step(np.zeros(3), np.array([5.0, -0.001, 2.0]))
+    assert np.allclose(params, [-0.01, 0.01, -0.01])
+    assert np.allclose(SGD(0.5).step(np.ones(2), np.array([1.0, -2.0])), [0.5, 2.0])
+
+
+def test_first_pass_is_independent_of_the_chunk_size(log):
+    small = MiniBatchTrainer(chunksize=333)
+    large = MiniBatchTrainer(chunksize=10000)
+    X_small, y_small = small._first_pass(log)
+    X_large, y_large = large._first_pass(log)
+    assert np.allclose(small.scaler_.mean_, large.scaler_.mean_)
+    assert np.allclose(small.scaler_.scale_, large.scaler_.scale_)
+    assert np.allclose(small.class_weights_, large.class_weights_)
+    assert np.allclose(X_small, X_large) and np.array_equal(y_small, y_large)
+
+    # the scaler sees every row, like the notebook's StandardScaler
+    data = pd.read_csv(log)[FEATURES].to_numpy(dtype=float)
+    columns = [FEATURES.index(name) for name in NUMERICAL_FEATURES]
+    assert np.allclose(small.scaler_.mean_, data[:, columns].mean(axis=0))
+
+
+def test_validation_is_capped(log):
+    model = MiniBatchTrainer(max_val_rows=100, chunksize=500)
+    X_val, y_val = model._first_pass(log)
+    assert len(X_val) == len(y_val) == 100
+
+
+def test_fit_keeps_the_best_epoch(log):
+    model = MiniBatchTrainer("sgd", learning_rate=0.5, max_epochs=6, patience=2, batch_size=64).fit(log)
+    losses = [loss for _, _, loss in model.history_]
+    assert model.best_epoch_ == 1 + int(np.argmin(losses))
+    X_val, y_val = MiniBatchTrainer()._first_pass(log)
+    assert np.isclose(model.validation_loss(X_val, y_val), min(losses))
+
+
+def test_plateau_stops_early(log):
+    # min_delta no epoch can beat: stops after the first epoch plus patience
+    model = MiniBatchTrainer(max_epochs=10, patience=2, min_delta=10.0).fit(log)
+    assert model.stopped_early_ and len(model.history_) == 3 and model.best_epoch_ == 1
+    # a refit that runs to max_epochs doesn't keep the early stop
+    model.min_delta, model.max_epochs = 0.0, 1
+    assert not model.fit(log).stopped_early_
+
+
+def test_fit_is_repeatable(log):
+    first = MiniBatchTrainer(max_epochs=2).fit(log)
+    second = MiniBatchTrainer(max_epochs=2).fit(log)
+    assert np.array_equal(first.w_, second.w_) and first.b_ == second.b_
+
+
+def test_predict(log):
+    model = MiniBatchTrainer(max_epochs=2).fit(log)
+    X = pd.read_csv(log, nrows=50)[FEATURES].to_numpy(dtype=float)
+    y_pred, y_proba = model.predict(X)
+    assert y_pred.shape == (50,) and np.array_equal(y_pred, (y_proba >= 0.5).astype(int))
+    assert ((0 <= y_proba) & (y_proba <= 1)).all()
+
+
+@pytest.mark.parametrize("settings", [{"optimizer": "rmsprop"}, {"val_fraction": 0}, {"val_fraction": 1},
+                                      {"max_epochs": 0}])
+def test_bad_settings_raise(settings):
+    with pytest.raises(ValueError):
+        MiniBatchTrainer(**settings)
@@ -0,0 +1,83 @@
+import socket
+import struct
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from logistic import FEATURES, NUMERICAL_FEATURES, Scaler, predict
+from scoring import MicroBatcher, ScoringClient, SpamScorer, export_model, serve
+
+
+def rows(n=200, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.column_stack([rng.integers(0, 10, n), rng.integers(5, 500, n), rng.integers(0, 2, n),
+                            rng.uniform(0, 1, n), rng.integers(0, 2, n)]).astype(float)
+
+
+def model(seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.normal(0, 2, len(FEATURES)), 0.3
+
+
+def test_export_matches_scaler_then_predict(tmp_path):
+    X, (w, b) = rows(), model()
+    scaler = Scaler([FEATURES.index(name) for name in NUMERICAL_FEATURES]).fit(X)
+    export_model(tmp_path / "m.npz", w, b, scaler)
+    _, reference = predict(scaler.transform(X), w, b)
+    assert np.allclose(SpamScorer.load(tmp_path / "m.npz").score(X), reference, atol=1e-5)
+
+
+def test_export_takes_a_standard_scaler_fitted_on_named_columns(tmp_path):
+    X, (w, b) = rows(), model()
+    ours = Scaler([FEATURES.index(name) for name in NUMERICAL_FEATURES]).fit(X)
+    # what sklearn's StandardScaler has after fit(df[NUMERICAL_FEATURES]), as in the notebook
+    sklearn_like = SimpleNamespace(mean_=ours.mean_, scale_=ours.scale_,
+                                   feature_names_in_=np.array(NUMERICAL_FEATURES, dtype=object))
+    export_model(tmp_path / "ours.npz", w, b, ours)
+    export_model(tmp_path / "sklearn.npz", w, b, sklearn_like)
+    assert np.array_equal(SpamScorer.load(tmp_path / "ours.npz").w, SpamScorer.load(tmp_path / "sklearn.npz").w)
+
+
+def test_export_needs_to_know_the_scaled_columns(tmp_path):
+    anonymous = SimpleNamespace(mean_=np.zeros(3), scale_=np.ones(3))
+    with pytest.raises(ValueError):
+        export_model(tmp_path / "m.npz", *model(), anonymous)
+    export_model(tmp_path / "m.npz", *model(), anonymous, columns=NUMERICAL_FEATURES)
+
+
+def test_extreme_logits_agree_with_predict():
+    w, b = np.array([40.0, -40.0, 0, 0, 0]), 0.0
+    X = np.array([[10, 0, 0, 0, 0], [0, 10, 0, 0, 0], [0.01, 0, 0, 0, 0]], dtype=float)
+    _, reference = predict(X, w, b)
+    assert np.allclose(SpamScorer(w, b).score(X), reference, atol=1e-7)
+
+
+@pytest.fixture
+def server():
+    scorer = SpamScorer(np.array([0.5, -0.1, 1.0, 2.0, 0.3]), -1.0)
+    with MicroBatcher(scorer, max_batch=64, max_wait_ms=0.5) as batcher:
+        server = serve(batcher)
+        yield server
+        server.shutdown()
+        server.server_close()
+
+
+def test_socket_scores_match_in_process(server):
+    X = np.random.default_rng(0).uniform(0, 5, (10, 5)).astype(np.float32)
+    client = ScoringClient(server.server_address)
+    try:
+        assert np.allclose(client.score(X), server.batcher.scorer.score(X))
+    finally:
+        client.close()
+
+
+@pytest.mark.parametrize("n", [0, 65, 2 ** 32 - 1])
+def test_bad_row_count_closes_the_connection(server, n):
+    sock = socket.create_connection(server.server_address)
+    sock.settimeout(5)
+    try:
+        sock.sendall(struct.pack("<I", n))
+        assert sock.recv(1) == b""
+    finally:
+        sock.close()
@@ -0,0 +1,288 @@
+"""
+    Feature pipeline and parallel k-fold CV for the calorie notebook.
+
+    build_features makes the notebook's columns (Sex encoded, BMI, the three
+    interaction terms and the three squares) in one pass over row blocks,
+    writing straight into a preallocated float32 matrix, then standardizes
+    every column except Sex like the notebook's StandardScaler.
+
+    cached_features keys the result by a hash of the CSV bytes: the matrix is
+    written once to .features_cache/<hash>/ and later runs memory-map it.
+    cross_validate hands the cached paths and each fold's validation row
+    indices (not the arrays) to worker processes, which memory-map the same
+    file and copy out their fold's rows block by block, so the 750k x 14
+    matrix is never pickled.
+
+        X, y, _, folder = cached_features("train.csv")
+        scores = cross_validate(["linear", "lgbm", "xgb"], folder)
+"""
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import importlib
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+
+RAW = ["Sex", "Age", "Height", "Weight", "Duration", "Heart_Rate", "Body_Temp"]
+FEATURES = RAW + ["BMI", "Duration_HeartRate", "Duration_BodyTemp", "Heart_BodyTemp",
+                  "Duration_squared", "BodyTemp_squared", "HeartRate_squared"]
+SCALED = [j for j, name in enumerate(FEATURES) if name != "Sex"]
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".features_cache")
+VERSION = "1"       # bump when the features change, old cache entries then stop matching
+
+# module, class and arguments of the candidate regressors (the notebook's base models)
+CANDIDATES = {
+    "least_squares": ("features", "LeastSquares", {}),
+    "linear": ("sklearn.linear_model", "LinearRegression", {}),
+    "lgbm": ("lightgbm", "LGBMRegressor", {"n_estimators": 200, "random_state": 42, "verbose": -1}),
+    "xgb": ("xgboost", "XGBRegressor", {"n_estimators": 200, "random_state": 42}),
+}
+
+
+def _raw_columns(df):
+    sex = df["Sex"] if pd.api.types.is_numeric_dtype(df["Sex"]) else df["Sex"].map({"female": 0, "male": 1})
+    columns = {"Sex": sex.to_numpy(dtype=np.float64)}
+    for name in RAW[1:]:
+        columns[name] = df[name].to_numpy(dtype=np.float64)
+    return columns
+
+
+def build_features(df, scaler=None, block_rows=65536):
+    """
+        (n, 14) float32 matrix in FEATURES order, and the (mean, std) it was
+        scaled with: fitted on df, or the given one for test data
+    """
+    columns = _raw_columns(df)
+    n = len(df)
+    X = np.empty((n, len(FEATURES)), dtype=np.float32)
+    mean = np.zeros(len(FEATURES))
+    m2 = np.zeros(len(FEATURES))     # sum of squared deviations from the mean so far
+
+    for start in range(0, n, block_rows):
+        stop = min(start + block_rows, n)
+        sex, age, height, weight, duration, heart, temp = (columns[name][start:stop] for name in RAW)
+        block = np.column_stack([
+            sex, age, height, weight, duration, heart, temp,
+            weight / (height / 100) ** 2,
+            duration * heart, duration * temp, heart * temp,
+            duration * duration, temp * temp, heart * heart,
+        ])
+        # statistics from the float64 block, before it's rounded to float32: two-pass
+        # within the block, merged with Chan et al.'s update (E[x^2] - E[x]^2 cancels
+        # badly on columns like BodyTemp_squared, whose mean is large next to its spread)
+        seen, rows = start, stop - start
+        block_mean = block.mean(axis=0)
+        delta = block_mean - mean
+        m2 += ((block - block_mean) ** 2).sum(axis=0) + delta ** 2 * seen * rows / (seen + rows)
+        mean += delta * rows / (seen + rows)
+        X[start:stop] = block
+
+    if scaler is None:
+        std = np.sqrt(m2 / n)
+        std[std == 0] = 1.0
+        scaler = (mean, std)
+    mean, std = scaler
+    for start in range(0, n, block_rows):
+        block = X[start:start + block_rows]
+        block[:, SCALED] = (block[:, SCALED] - mean[SCALED]) / std[SCALED]
+    return X, scaler
+
+
+def notebook_features(train_df):
+    """The notebook's pandas version, for comparison (numpy standardization instead of sklearn)"""
+    df = train_df.copy()
+    df["BMI"] = df["Weight"] / ((df["Height"] / 100) ** 2)
+    df["Sex"] = df["Sex"].map({"female": 0, "male": 1})
+    df["Duration_HeartRate"] = df["Duration"] * df["Heart_Rate"]
+    df["Duration_BodyTemp"] = df["Duration"] * df["Body_Temp"]
+    df["Heart_BodyTemp"] = df["Heart_Rate"] * df["Body_Temp"]
+    df["Duration_squared"] = df["Duration"] ** 2
+    df["BodyTemp_squared"] = df["Body_Temp"] ** 2
+    df["HeartRate_squared"] = df["Heart_Rate"] ** 2
+    feature_col = [col for col in df.columns if col not in ["Sex", "id", "Calories"]]
+    df[feature_col] = (df[feature_col] - df[feature_col].mean()) / df[feature_col].std(ddof=0)
+    return df.drop(["id", "Calories"], axis=1)
+
+
+def file_hash(path, block=1 << 20):
+    digest = hashlib.sha256(VERSION.encode())
+    with open(path, "rb") as f:
+        while chunk := f.read(block):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+def cached_features(path, cache_dir=CACHE_DIR):
+    """
+        (X, y, scaler, folder) for a training CSV, X and y memory-mapped from
+        the cache. Built only when no cache entry matches the file's hash
+    """
+    folder = os.path.join(cache_dir, file_hash(path))
+    if not os.path.exists(os.path.join(folder, "scaler.npz")):
+        df = pd.read_csv(path)
+        X, (mean, std) = build_features(df)
+        os.makedirs(cache_dir, exist_ok=True)
+        # written next to the final folder and renamed, so a crash never leaves half an entry
+        tmp = tempfile.mkdtemp(dir=cache_dir)
+        np.save(os.path.join(tmp, "X.npy"), X)
+        np.save(os.path.join(tmp, "y.npy"), df["Calories"].to_numpy(dtype=np.float32))
+        np.savez(os.path.join(tmp, "scaler.npz"), mean=mean, std=std)
+        try:
+            os.replace(tmp, folder)
+        except OSError:
+            shutil.rmtree(tmp)
+    X = np.load(os.path.join(folder, "X.npy"), mmap_mode="r")
+    y = np.load(os.path.join(folder, "y.npy"), mmap_mode="r")
+    with np.load(os.path.join(folder, "scaler.npz")) as f:
+        scaler = (f["mean"], f["std"])
+    return X, y, scaler, folder
+
+
+class LeastSquares:
+    """Ordinary least squares with an intercept, numpy only"""
+    def fit(self, X, y):
+        X1 = np.column_stack([X, np.ones(len(X))]).astype(np.float64)
+        coef = np.linalg.lstsq(X1, y, rcond=None)[0]
+        self.coef_, self.intercept_ = coef[:-1], coef[-1]
+        return self
+
+    def predict(self, X):
+        return np.asarray(X, dtype=np.float64) @ self.coef_ + self.intercept_
+
+
+def rmse(y_true, y_pred):
+    return float(np.sqrt(np.mean((np.asarray(y_true, dtype=np.float64) - y_pred) ** 2)))
+
+
+def r2(y_true, y_pred):
+    y_true = np.asarray(y_true, dtype=np.float64)
+    return float(1 - np.sum((y_true - y_pred) ** 2) / np.sum((y_true - y_true.mean()) ** 2))
+
+
+def available(name):
+    try:
+        importlib.import_module(CANDIDATES[name][0])
+        return True
+    except ImportError:
+        return False
+
+
+def make_model(name):
+    module, cls, kwargs = CANDIDATES[name]
+    return getattr(importlib.import_module(module), cls)(**kwargs)
+
+
+def fold_indices(n, n_splits=5, seed=42):
+    """Shuffled k-fold split like KFold(shuffle=True): list of validation row indices, each sorted"""
+    return [np.sort(val) for val in np.array_split(np.random.default_rng(seed).permutation(n), n_splits)]
+
+
+def take_rows(X, rows, block_rows=65536):
+    """X[rows] for sorted rows, gathered block by block so a memory map is read in order"""
+    out = np.empty((len(rows), X.shape[1]), dtype=X.dtype)
+    for start in range(0, len(rows), block_rows):
+        chunk = rows[start:start + block_rows]
+        out[start:start + len(chunk)] = X[chunk[0]:chunk[-1] + 1][chunk - chunk[0]]
+    return out
+
+
+def run_fold(task):
+    """Worker entry point: memory-maps the cached matrix and fits one model on one fold"""
+    folder, name, fold, val = task
+    X = np.load(os.path.join(folder, "X.npy"), mmap_mode="r")
+    y = np.load(os.path.join(folder, "y.npy"), mmap_mode="r")
+    is_train = np.ones(len(y), dtype=bool)
+    is_train[val] = False
+    train = np.flatnonzero(is_train)
+
+    start = time.perf_counter()
+    model = make_model(name).fit(take_rows(X, train), take_rows(y[:, None], train)[:, 0])
+    pred = model.predict(take_rows(X, val))
+    y_val = take_rows(y[:, None], val)[:, 0]
+    return name, fold, rmse(y_val, pred), r2(y_val, pred), time.perf_counter() - start
+
+
+def cross_validate(names, folder, n_splits=5, seed=42, workers=None):
+    """{model: {"rmse": [...], "r2": [...]}} per fold, every (model, fold) pair a separate task"""
+    n = len(np.load(os.path.join(folder, "y.npy"), mmap_mode="r"))
+    folds = fold_indices(n, n_splits, seed)
+    tasks = [(folder, name, fold, folds[fold]) for name in names for fold in range(n_splits)]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        results = [run_fold(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(run_fold, tasks))
+
+    scores = {name: {"rmse": [None] * n_splits, "r2": [None] * n_splits} for name in names}
+    for name, fold, fold_rmse, fold_r2, _ in results:
+        scores[name]["rmse"][fold] = fold_rmse
+        scores[name]["r2"][fold] = fold_r2
+    return scores
+
+
+def synthetic_train(path, n=750000, seed=0):
+    """A train.csv shaped like the competition's, for when the real one isn't here"""
+    rng = np.random.default_rng(seed)
+    sex = rng.choice(["male", "female"], n)
+    height = np.where(sex == "male", rng.normal(182, 8, n), rng.normal(168, 7, n)).round()
+    weight = (height - 100 + rng.normal(0, 8, n)).round()
+    duration = rng.integers(1, 31, n).astype(float)
+    heart = (80 + duration * 1.2 + rng.normal(0, 6, n)).round()
+    temp = (37 + duration * 0.1 + rng.normal(0, 0.3, n)).round(1)
+    age = rng.integers(20, 80, n)
+    calories = np.maximum(1, duration * (heart - 70) * 0.35 + (temp - 37) * 8 + rng.normal(0, 8, n)).round()
+    pd.DataFrame({"id": np.arange(n), "Sex": sex, "Age": age, "Height": height, "Weight": weight,
+                  "Duration": duration, "Heart_Rate": heart, "Body_Temp": temp,
+                  "Calories": calories}).to_csv(path, index=False)
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else "train.csv"
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+    cache_dir = tempfile.mkdtemp()
+    try:
+        if not os.path.exists(path):
+            path = os.path.join(cache_dir, "train.csv")
+            synthetic_train(path)
+            print("train.csv not found, using a synthetic 750k row file")
+
+        df = pd.read_csv(path)
+        start = time.perf_counter()
+        reference = notebook_features(df)
+        pandas_time = time.perf_counter() - start
+        start = time.perf_counter()
+        X, _ = build_features(df)
+        fused_time = time.perf_counter() - start
+        assert list(reference.columns) == FEATURES
+        assert np.allclose(X, reference.to_numpy(dtype=np.float64), atol=1e-4)
+        print(f"{len(df)} rows: pandas columns {pandas_time:.2f}s "
+              f"({reference.memory_usage(deep=True).sum() / 1e6:.0f} MB), "
+              f"fused float32 {fused_time:.2f}s ({X.nbytes / 1e6:.0f} MB), same values")
+
+        for label in ("first run (build + write)", "second run (memory-map)"):
+            start = time.perf_counter()
+            X, y, _, folder = cached_features(path, cache_dir)
+            print(f"cached_features, {label}: {time.perf_counter() - start:.2f}s")
+
+        names = [name for name in CANDIDATES if available(name)]
+        skipped = [name for name in CANDIDATES if name not in names]
+        if skipped:
+            print(f"not installed, skipped: {', '.join(skipped)}")
+        timings = {}
+        for n_workers in sorted({1, workers}):
+            start = time.perf_counter()
+            scores = cross_validate(names, folder, workers=n_workers)
+            timings[n_workers] = time.perf_counter() - start
+        print(f"\n5-fold CV: " + ", ".join(f"{n} worker(s) {t:.2f}s" for n, t in timings.items()))
+        for name, result in scores.items():
+            print(f"{name:<14} RMSE {np.mean(result['rmse']):.4f} +- {np.std(result['rmse']):.4f}   "
+                  f"R2 {np.mean(result['r2']):.4f}")
+    finally:
+        shutil.rmtree(cache_dir)
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from features import (FEATURES, build_features, cached_features, cross_validate, fold_indices, notebook_features,
+                      synthetic_train, take_rows)
+
+
+@pytest.fixture(scope="module")
+def train(tmp_path_factory):
+    path = tmp_path_factory.mktemp("data") / "train.csv"
+    synthetic_train(path, n=20000)
+    return path
+
+
+@pytest.mark.parametrize("block_rows", [7, 1000, 65536])
+def test_build_features_matches_the_notebook(train, block_rows):
+    df = pd.read_csv(train)
+    reference = notebook_features(df)
+    X, _ = build_features(df, block_rows=block_rows)
+    assert list(reference.columns) == FEATURES
+    assert np.allclose(X, reference.to_numpy(dtype=np.float64), atol=1e-4)
+
+
+def test_std_keeps_its_precision_on_large_means():
+    rng = np.random.default_rng(0)
+    n = 50000
+    # a mean of 1e4 next to a spread of 1e-3: E[x^2] - E[x]^2 of the square has no digits left
+    temp = 1e4 + rng.normal(0, 1e-3, n)
+    df = pd.DataFrame({"Sex": rng.integers(0, 2, n), "Age": rng.integers(20, 80, n),
+                       "Height": rng.normal(175, 8, n), "Weight": rng.normal(75, 8, n),
+                       "Duration": rng.integers(1, 31, n), "Heart_Rate": rng.normal(95, 6, n), "Body_Temp": temp})
+    _, (mean, std) = build_features(df, block_rows=4096)
+    for name, column in (("Body_Temp", temp), ("BodyTemp_squared", temp * temp)):
+        j = FEATURES.index(name)
+        assert mean[j] == pytest.approx(column.mean(), rel=1e-12)
+        assert std[j] == pytest.approx(column.std(), rel=1e-6)
+
+
+def test_given_scaler_is_used_as_is(train):
+    df = pd.read_csv(train)
+    _, scaler = build_features(df)
+    X, again = build_features(df.iloc[:100], scaler)
+    assert again is scaler
+    assert np.allclose(X, build_features(df)[0][:100])
+
+
+def test_folds_partition_the_rows():
+    folds = fold_indices(1003, 5, seed=1)
+    assert [len(val) for val in folds] == [201, 201, 201, 200, 200]
+    assert all((np.diff(val) > 0).all() for val in folds)
+    assert np.array_equal(np.sort(np.concatenate(folds)), np.arange(1003))
+
+
+@pytest.mark.parametrize("block_rows", [1, 3, 1000])
+def test_take_rows_matches_fancy_indexing(block_rows):
+    X = np.arange(200 * 3, dtype=np.float32).reshape(200, 3)
+    rows = np.sort(np.random.default_rng(0).choice(200, 57, replace=False))
+    assert np.array_equal(take_rows(X, rows, block_rows), X[rows])
+
+
+def test_cache_is_reused_and_cv_does_not_depend_on_workers(train, tmp_path):
+    X, y, scaler, folder = cached_features(train, tmp_path)
+    again = cached_features(train, tmp_path)
+    assert again[3] == folder and np.array_equal(again[0], X)
+    assert isinstance(X, np.memmap)
+    one = cross_validate(["least_squares"], folder, workers=1)
+    two = cross_validate(["least_squares"], folder, workers=2)
+    assert one == two
+    assert np.mean(one["least_squares"]["r2"]) > 0.99
@@ -0,0 +1,278 @@
+"""
+    Benchmark suite for the hot paths of every task.
+
+    Each workload is repeatable and offline: seeded race policies, the fake
+    microphone and recognizer from Task1/Q3/fake_audio.py, seeded command
+    lists, and the CSVs that ship with the repo. Several task folders have a
+    module called main, so every workload runs in its own subprocess with
+    its task folder as working directory and first on sys.path.
+
+    Results (median / min seconds per repeat, plus the commit and machine)
+    are written as JSON, and --compare flags workloads that got slower than a
+    previous results file:
+
+        python benchmarks.py --out before.json
+        git checkout my-branch
+        python benchmarks.py --out after.json --compare before.json
+
+    --instrument runs the workloads with instrument.enable() and stores the
+    per-stage latency histograms next to the timings.
+"""
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def race_turns(quick):
+    import random
+    from race_engine import BatchRaceEngine, RandomPolicy, hassan_factory, max_factory
+
+    n = 200 if quick else 2000
+
+    def run():
+        BatchRaceEngine(max_factory(RandomPolicy(random.Random(1))),
+                        hassan_factory(RandomPolicy(random.Random(2)))).run(n)
+    return run, n, "races"
+
+
+def speech_commands(quick):
+    from fake_audio import FakeMicrophone, FakeRecognizer
+    from speech_handler import SpeechHandler
+
+    n = 10 if quick else 50
+    phrases = ["turbo start", "slipstream cut", "mercedes charge", "block", "corner", None]
+    script = [phrases[i % len(phrases)] for i in range(n)]
+
+    def run():
+        # short fixed delays stand in for speaking and the network; cache off so every command is recognized
+        handler = SpeechHandler(FakeRecognizer(script, 0.001, 0.002), FakeMicrophone(), cache_size=0)
+        for _ in range(n):
+            handler.listen_for_command()
+    return run, n, "commands"
+
+
+def _commands(n):
+    import random
+    rng = random.Random(0)
+    alphabet = "abcdefghijklmnopqrstuvwxyz :,0123456789"
+    return ["".join(rng.choice(alphabet) for _ in range(rng.randint(0, 40))) for _ in range(n)]
+
+
+def codec_encode(quick):
+    from main import Codec
+
+    n = 10000 if quick else 100000
+    commands = _commands(n)
+    return lambda: Codec().encode(commands), n, "commands"
+
+
+def codec_decode(quick):
+    from main import Codec
+
+    n = 10000 if quick else 100000
+    encoded = Codec().encode(_commands(n))
+    return lambda: Codec().decode(encoded), n, "commands"
+
+
+def gear_display(quick):
+    from main import display_gear
+
+    n = 900 if quick else 9000
+
+    def run():
+        for i in range(n):
+            display_gear(i % 9)
+    return run, n, "gears"
+
+
+def csv_parse(quick):
+    import ergast
+
+    def run():
+        for name in ergast.SCHEMAS:
+            ergast.read_csv(name)
+    return run, len(ergast.SCHEMAS), "files"
+
+
+def csv_load_cached(quick):
+    import atexit
+    import tempfile
+    import ergast
+
+    # workloads run in their own worker process, the cache goes when it exits
+    cache = tempfile.TemporaryDirectory()
+    atexit.register(cache.cleanup)
+    ergast.load_all(cache_dir=cache.name)
+
+    def run():
+        ergast.load_all(cache_dir=cache.name)
+    return run, len(ergast.SCHEMAS), "files"
+
+
+def gradient_descent(quick):
+    from logistic import FEATURES, compute_class_weights, gradient_descent, init_weights, load_data
+
+    iterations = 100 if quick else 1000
+    X_train, _, y_train, _, _ = load_data()
+    sample_weights, _ = compute_class_weights(y_train, "balanced")
+
+    def run():
+        w, b = init_weights(len(FEATURES))
+        gradient_descent(X_train, y_train, w, b, learning_rate=0.5, lambda_l1=0.01,
+                         num_iterations=iterations, sample_weights=sample_weights)
+    return run, iterations, "iterations"
+
+
+# name: (task folder, workload); a workload builds its inputs and returns (run, units per run, unit)
+WORKLOADS = {
+    "race.simulate_turn": ("Task1/Q3", race_turns),
+    "speech.listen_for_command": ("Task1/Q3", speech_commands),
+    "codec.encode": ("Task1/Q2", codec_encode),
+    "codec.decode": ("Task1/Q2", codec_decode),
+    "gear.display_gear": ("Task1/Q1", gear_display),
+    "csv.read_csv": ("Task2/Q1", csv_parse),
+    "csv.load_cached": ("Task2/Q1", csv_load_cached),
+    "logistic.gradient_descent": ("Task3/Q1", gradient_descent),
+}
+
+
+def run_workload(name, repeat, quick=False, instrumented=False):
+    """Runs one workload in this process (cwd should be its task folder): timings and stage histograms"""
+    folder, workload = WORKLOADS[name]
+    sys.path.insert(0, os.path.join(ROOT, folder))
+    import instrument
+    if instrumented:
+        instrument.enable()
+
+    # the hot paths print (gears, "Listening..."), that output isn't what's measured
+    with contextlib.redirect_stdout(io.StringIO()):
+        run, units, unit = workload(quick)
+        run()                       # warm-up, not timed
+        instrument.reset()
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            times.append(time.perf_counter() - start)
+
+    median = statistics.median(times)
+    result = {"units": units, "unit": unit, "repeat": repeat, "times": times,
+              "median_s": median, "min_s": min(times), "us_per_unit": median / units * 1e6}
+    if instrumented:
+        result["stages"] = instrument.snapshot()
+    return result
+
+
+def run_isolated(name, repeat, quick=False, instrumented=False):
+    folder = os.path.join(ROOT, WORKLOADS[name][0])
+    command = [sys.executable, os.path.abspath(__file__), "--worker", name, "--repeat", str(repeat)]
+    command += ["--quick"] * quick + ["--instrument"] * instrumented
+    done = subprocess.run(command, cwd=folder, capture_output=True, text=True)
+    if done.returncode != 0:
+        return {"error": done.stderr.strip().splitlines()[-1] if done.stderr.strip() else "failed"}
+    return json.loads(done.stdout)
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(names, repeat, quick=False, instrumented=False):
+    import numpy as np
+    import pandas as pd
+
+    results = {}
+    for name in names:
+        results[name] = run_isolated(name, repeat, quick, instrumented)
+        print(format_row(name, results[name]), flush=True)
+    return {
+        "commit": git_commit(),
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": f"{platform.system()} {platform.machine()}, {os.cpu_count()} CPUs",
+        "quick": quick,
+        "instrumented": instrumented,
+        "workloads": results,
+    }
+
+
+def format_row(name, result):
+    if "error" in result:
+        return f"{name:<28} error: {result['error']}"
+    return (f"{name:<28} {result['median_s'] * 1000:>10.2f} {result['min_s'] * 1000:>10.2f} "
+            f"{result['us_per_unit']:>12.2f} us/{result['unit'][:-1]}")
+
+
+def compare(current, baseline, threshold=0.10):
+    """Lines comparing medians with a previous run; returns (lines, names that got slower than threshold)"""
+    lines = [f"\nAgainst {(baseline.get('commit') or 'unknown')[:10]} ({baseline.get('timestamp')}):",
+             f"{'Workload':<28} {'Before ms':>10} {'After ms':>10} {'Change':>8}"]
+    slower = []
+    for name, result in current["workloads"].items():
+        before = baseline.get("workloads", {}).get(name)
+        if not before or "error" in before or "error" in result:
+            lines.append(f"{name:<28} {'-':>10} {'-':>10} {'n/a':>8}")
+            continue
+        if before["units"] != result["units"]:
+            lines.append(f"{name:<28} workload sizes differ (one run used --quick), not compared")
+            continue
+        change = result["median_s"] / before["median_s"] - 1
+        flag = "  SLOWER" if change > threshold else ""
+        if flag:
+            slower.append(name)
+        lines.append(f"{name:<28} {before['median_s'] * 1000:>10.2f} {result['median_s'] * 1000:>10.2f} "
+                     f"{change * 100:>+7.1f}%{flag}")
+    return lines, slower
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks for the hot paths of every task")
+    parser.add_argument("names", nargs="*", help=f"workloads to run (default all): {', '.join(WORKLOADS)}")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--quick", action="store_true", help="smaller workloads, for a fast check")
+    parser.add_argument("--instrument", action="store_true", help="record per-stage latency histograms too")
+    parser.add_argument("--out", help="results JSON (default benchmarks-<commit>.json)")
+    parser.add_argument("--compare", help="previous results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="slowdown flagged as a regression")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        json.dump(run_workload(args.worker, args.repeat, args.quick, args.instrument), sys.stdout)
+        sys.exit(0)
+
+    unknown = [name for name in args.names if name not in WORKLOADS]
+    if unknown:
+        parser.error(f"unknown workloads {unknown}, pick from {list(WORKLOADS)}")
+
+    print(f"{'Workload':<28} {'Median ms':>10} {'Min ms':>10} {'Per unit':>12}")
+    results = run_suite(args.names or list(WORKLOADS), args.repeat, args.quick, args.instrument)
+    out = args.out or f"benchmarks-{(results['commit'] or 'local')[:10]}.json"
+    with open(out, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            lines, slower = compare(results, json.load(f), args.threshold)
+        print("\n".join(lines))
+        if slower:
+            print(f"\n{len(slower)} workload(s) more than {args.threshold:.0%} slower: {', '.join(slower)}")
+            sys.exit(1)
@@ -0,0 +1,60 @@
+"""
+    Lets pytest run the tests of every task folder in one session.
+
+    The task folders are flat script folders that import each other's
+    modules by bare name, and several have a module with the same name
+    (main.py in all three Task1 folders). So every test module is imported,
+    and every test runs, with its own folder as working directory and first
+    on sys.path, and with the modules imported from other task folders taken
+    out of sys.modules (and put back when their folder's tests run again).
+
+        python -m pytest -q                 # everything
+        python -m pytest -q Task1/Q3        # one task
+"""
+import os
+import sys
+
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+_cwd = os.getcwd()
+_stashed = {}       # task folder: {module name: module} taken out of sys.modules
+_current = None
+
+
+def _task_folder(module):
+    path = getattr(module, "__file__", None)
+    if not path:
+        return None
+    folder = os.path.dirname(os.path.abspath(path))
+    if folder == ROOT or not folder.startswith(ROOT + os.sep):
+        return None
+    return folder
+
+
+def _switch(folder):
+    global _current
+    if folder == _current:
+        return
+    for name, module in list(sys.modules.items()):
+        owner = _task_folder(module)
+        # test modules have unique names and pytest keeps its own references to them
+        if owner is not None and owner != folder and not name.startswith(("test_", "conftest")):
+            _stashed.setdefault(owner, {})[name] = sys.modules.pop(name)
+    sys.modules.update(_stashed.pop(folder, {}))
+    sys.path[:] = [folder] + [p for p in sys.path if os.path.abspath(p or ".") != folder]
+    os.chdir(folder)
+    _current = folder
+
+
+def pytest_collectstart(collector):
+    path = getattr(collector, "path", None)
+    if path is not None and path.suffix == ".py":
+        _switch(str(path.parent))
+
+
+def pytest_runtest_setup(item):
+    _switch(str(item.path.parent))
+
+
+def pytest_sessionfinish(session):
+    os.chdir(_cwd)
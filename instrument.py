@@ -0,0 +1,301 @@
+"""
+    Timers and counters for the hot paths of every task.
+
+    Nothing is instrumented until enable() is called: the hot paths run their
+    own functions untouched, so disabled instrumentation costs nothing.
+    enable() wraps the functions listed in HOOKS with a timer, in modules that
+    are already imported and in the ones imported later. Every call then goes
+    into a latency histogram for its stage (quarter-octave buckets, so
+    percentiles are within ~19%), and exceptions are counted per stage.
+
+        import instrument
+        instrument.enable()
+        ...                         # run races, load CSVs, train...
+        print(instrument.report())
+        instrument.dump("stages.json")
+
+    Or from the command line, for any script in the repo:
+
+        python instrument.py [--json stages.json] Task1/Q3/race_engine.py 20000
+"""
+import ast
+from collections import Counter
+import functools
+import importlib.abc
+import json
+import os
+import sys
+import time
+
+
+# (module, attribute, stage); modules are the task folders' own module names
+HOOKS = [
+    ("main", "Race.simulate_turn", "race.turn"),
+    ("main", "Codec.encode", "codec.encode"),
+    ("main", "Codec.decode", "codec.decode"),
+    ("main", "display_gear", "gear.display"),
+    ("speech_handler", "SpeechHandler.listen_for_command", "speech.command"),
+    ("fake_audio", "FakeRecognizer.listen", "speech.capture"),
+    ("speech_recognition", "Recognizer.listen", "speech.capture"),
+    ("recognizers", "CachedRecognizer.recognize", "speech.recognize"),
+    ("ergast", "parse_csv", "csv.parse"),
+    ("ergast", "load", "csv.load"),
+    ("logistic", "load_data", "csv.load_spam"),
+    ("logistic", "gradient_descent", "logistic.gradient_descent"),
+    ("logistic", "compute_cost", "logistic.cost"),
+    ("logistic", "compute_gradients", "logistic.gradients"),
+]
+
+ENABLED = False
+_histograms = {}
+_counters = Counter()
+_patched = []           # (owner, name, original) to undo
+_finder = None
+
+
+class Histogram:
+    """Latency histogram in nanoseconds, 4 buckets per power of two"""
+    def __init__(self):
+        self.buckets = Counter()
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    def add(self, ns):
+        self.count += 1
+        self.total += ns
+        self.max = max(self.max, ns)
+        self.min = ns if self.min is None else min(self.min, ns)
+        bits = ns.bit_length()
+        self.buckets[(bits - 1) * 4 + ((ns >> (bits - 3)) & 3) if bits >= 3 else ns] += 1
+
+    @staticmethod
+    def upper(bucket):
+        """Upper bound in ns of a bucket"""
+        if bucket < 8:
+            return bucket + 1
+        octave, quarter = divmod(bucket, 4)
+        return (1 << octave) + (quarter + 1) * (1 << (octave - 2))
+
+    def percentile(self, p):
+        seen, target = 0, p / 100 * self.count
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= target:
+                return min(self.upper(bucket), self.max)
+        return self.max
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "total_ms": self.total / 1e6,
+            "mean_us": self.total / self.count / 1e3 if self.count else 0.0,
+            "p50_us": self.percentile(50) / 1e3,
+            "p90_us": self.percentile(90) / 1e3,
+            "p99_us": self.percentile(99) / 1e3,
+            "max_us": self.max / 1e3,
+            "buckets_us": {f"{self.upper(b) / 1e3:.3f}": n for b, n in sorted(self.buckets.items())},
+        }
+
+
+def record(stage, ns):
+    histogram = _histograms.get(stage)
+    if histogram is None:
+        histogram = _histograms[stage] = Histogram()
+    histogram.add(ns)
+
+
+def count(name, n=1):
+    _counters[name] += n
+
+
+class timer:
+    """Context manager timing a block into stage, for code that isn't one function"""
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        record(self.stage, time.perf_counter_ns() - self.start)
+        if exc_type is not None:
+            _counters[self.stage + ".errors"] += 1
+
+
+def timed(fn, stage):
+    perf_counter_ns = time.perf_counter_ns
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = perf_counter_ns()
+        try:
+            return fn(*args, **kwargs)
+        except BaseException:
+            _counters[stage + ".errors"] += 1
+            raise
+        finally:
+            record(stage, perf_counter_ns() - start)
+    wrapper.__instrumented__ = stage
+    return wrapper
+
+
+def _resolve(namespace, attribute):
+    """(owner, name, value) of a dotted attribute, None if namespace doesn't have it"""
+    *path, name = attribute.split(".")
+    owner = namespace
+    for part in path:
+        owner = owner.get(part) if isinstance(owner, dict) else getattr(owner, part, None)
+        if owner is None:
+            return None
+    value = owner.get(name) if isinstance(owner, dict) else getattr(owner, name, None)
+    if not callable(value) or hasattr(value, "__instrumented__"):
+        return None
+    return owner, name, value
+
+
+def _set(owner, name, value):
+    if isinstance(owner, dict):
+        owner[name] = value
+    else:
+        setattr(owner, name, value)
+
+
+def patch_namespace(module_name, namespace):
+    """Wraps the hooks of module_name found in namespace (a module or a dict)"""
+    for module, attribute, stage in HOOKS:
+        if module != module_name:
+            continue
+        found = _resolve(namespace, attribute)
+        if found is None:
+            continue
+        owner, name, original = found
+        wrapper = timed(original, stage)
+        _set(owner, name, wrapper)
+        _patched.append((owner, name, original))
+        if "." not in attribute:
+            # `from module import fn` copies made before enable() point at the original
+            for other in list(sys.modules.values()):
+                if other is not None and getattr(other, name, None) is original and other is not namespace:
+                    setattr(other, name, wrapper)
+                    _patched.append((other, name, original))
+
+
+class _PatchOnImport(importlib.abc.MetaPathFinder):
+    """Wraps a hooked module's functions right after it is imported"""
+    def find_spec(self, fullname, path, target=None):
+        if fullname not in {module for module, _, _ in HOOKS}:
+            return None
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None and spec.loader is not None:
+                break
+        else:
+            return None
+        exec_module = spec.loader.exec_module
+
+        def exec_and_patch(module):
+            exec_module(module)
+            if ENABLED:
+                patch_namespace(fullname, module)
+        spec.loader.exec_module = exec_and_patch
+        return spec
+
+
+def enable():
+    global ENABLED, _finder
+    if ENABLED:
+        return
+    ENABLED = True
+    for module in {module for module, _, _ in HOOKS}:
+        if module in sys.modules:
+            patch_namespace(module, sys.modules[module])
+    _finder = _PatchOnImport()
+    sys.meta_path.insert(0, _finder)
+
+
+def disable():
+    """Puts the original functions back (recorded stats are kept until reset())"""
+    global ENABLED, _finder
+    ENABLED = False
+    if _finder in sys.meta_path:
+        sys.meta_path.remove(_finder)
+    _finder = None
+    while _patched:
+        owner, name, original = _patched.pop()
+        _set(owner, name, original)
+
+
+def reset():
+    _histograms.clear()
+    _counters.clear()
+
+
+def snapshot():
+    return {
+        "stages": {stage: histogram.as_dict() for stage, histogram in sorted(_histograms.items())},
+        "counters": dict(sorted(_counters.items())),
+    }
+
+
+def report():
+    lines = [f"{'Stage':<28} {'Calls':>9} {'Mean us':>10} {'p50 us':>10} {'p99 us':>10} {'Max us':>10}"]
+    for stage, h in sorted(_histograms.items()):
+        d = h.as_dict()
+        lines.append(f"{stage:<28} {d['count']:>9} {d['mean_us']:>10.2f} {d['p50_us']:>10.2f} "
+                     f"{d['p99_us']:>10.2f} {d['max_us']:>10.2f}")
+    for name, n in sorted(_counters.items()):
+        lines.append(f"{name:<28} {n:>9}")
+    return "\n".join(lines)
+
+
+def dump(path):
+    with open(path, "w") as f:
+        json.dump(snapshot(), f, indent=2)
+
+
+def run_script(path, argv=()):
+    """
+        Runs a script as __main__ with instrumentation on. The script's own
+        definitions are wrapped before its `if __name__ == "__main__":` block runs
+    """
+    path = os.path.abspath(path)
+    folder, module_name = os.path.dirname(path), os.path.splitext(os.path.basename(path))[0]
+    sys.path.insert(0, folder)
+    sys.argv = [path, *argv]
+    with open(path) as f:
+        tree = ast.parse(f.read(), path)
+    split = next((i for i, node in enumerate(tree.body) if isinstance(node, ast.If)
+                  and "__main__" in ast.unparse(node.test)), len(tree.body))
+    namespace = {"__name__": "__main__", "__file__": path, "__builtins__": __builtins__}
+    cwd = os.getcwd()
+    os.chdir(folder)
+    try:
+        enable()
+        exec(compile(ast.Module(tree.body[:split], []), path, "exec"), namespace)
+        patch_namespace(module_name, namespace)
+        exec(compile(ast.Module(tree.body[split:], []), path, "exec"), namespace)
+    finally:
+        os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    out = None
+    if args[:1] == ["--json"]:
+        out, args = args[1], args[2:]
+    if not args:
+        print("usage: python instrument.py [--json stages.json] script.py [args...]")
+        sys.exit(2)
+    out = os.path.abspath(out) if out else None
+    try:
+        run_script(args[0], args[1:])
+    finally:
+        print("\n" + report())
+        if out:
+            dump(out)
+            print(f"\nStage histograms written to {out}")
@@ -0,0 +1,33 @@
+import pytest
+
+from benchmarks import WORKLOADS, compare, run_isolated
+
+
+def results(**medians):
+    return {"commit": "abc", "timestamp": "now",
+            "workloads": {name: {"median_s": median, "units": 10} for name, median in medians.items()}}
+
+
+def test_compare_flags_only_slowdowns_past_the_threshold():
+    lines, slower = compare(results(a=1.2, b=1.05, c=0.5), results(a=1.0, b=1.0, c=1.0), threshold=0.10)
+    assert slower == ["a"]
+    assert any(line.startswith("a ") and "SLOWER" in line for line in lines)
+
+
+def test_compare_skips_missing_failed_and_resized_workloads():
+    current = results(a=1.0, b=1.0, c=9.0)
+    current["workloads"]["b"] = {"error": "failed"}
+    baseline = results(b=1.0, c=1.0)
+    baseline["workloads"]["c"]["units"] = 99
+    lines, slower = compare(current, baseline)
+    assert slower == []
+    assert any("not compared" in line for line in lines)
+
+
+@pytest.mark.parametrize("name", ["gear.display_gear", "codec.encode"])
+def test_workload_runs_in_its_own_task_folder(name):
+    result = run_isolated(name, repeat=2, quick=True, instrumented=True)
+    assert "error" not in result, result
+    assert len(result["times"]) == 2 and result["units"] > 0
+    assert result["stages"]["stages"]
+    assert name in WORKLOADS
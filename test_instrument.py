@@ -0,0 +1,128 @@
+import sys
+import types
+
+import pytest
+
+import instrument
+from instrument import Histogram
+
+
+@pytest.fixture(autouse=True)
+def clean():
+    yield
+    instrument.disable()
+    instrument.reset()
+
+
+def bucket(ns):
+    h = Histogram()
+    h.add(ns)
+    return next(iter(h.buckets))
+
+
+@pytest.mark.parametrize("ns", [0, 1, 3, 4, 7, 8, 9, 15, 16, 1000, 123456, 10 ** 9 + 7])
+def test_bucket_bounds_the_value_within_a_quarter_octave(ns):
+    upper = Histogram.upper(bucket(ns))
+    assert ns < upper <= max(ns + 1, ns * 1.25 + 1)
+
+
+def test_buckets_grow_with_the_value():
+    buckets = [bucket(ns) for ns in range(0, 5000)]
+    assert buckets == sorted(buckets)
+    assert len(set(bucket(ns) for ns in range(1 << 20, 1 << 21))) == 4
+
+
+def test_percentiles_and_counts():
+    h = Histogram()
+    for us in range(1, 1001):
+        h.add(us * 1000)
+    d = h.as_dict()
+    assert d["count"] == 1000 and d["max_us"] == 1000 and h.min == 1000
+    assert d["mean_us"] == pytest.approx(500.5)
+    assert 500 <= d["p50_us"] <= 500 * 1.25
+    assert 990 <= d["p99_us"] <= 1000
+    assert sum(d["buckets_us"].values()) == 1000
+
+
+def fake_module(name):
+    module = types.ModuleType(name)
+
+    def work(x):
+        return x * 2
+
+    class Engine:
+        def step(self):
+            raise RuntimeError("boom")
+
+    module.work, module.Engine = work, Engine
+    return module
+
+
+@pytest.fixture
+def hooked(monkeypatch):
+    monkeypatch.setattr(instrument, "HOOKS", [("fake_hooked", "work", "fake.work"),
+                                              ("fake_hooked", "Engine.step", "fake.step")])
+    module = fake_module("fake_hooked")
+    monkeypatch.setitem(sys.modules, "fake_hooked", module)
+    return module
+
+
+def test_enable_wraps_and_disable_restores(hooked):
+    work, step = hooked.work, hooked.Engine.step
+    copy = types.ModuleType("fake_user")
+    copy.work = work                        # `from fake_hooked import work` made before enable()
+    sys.modules["fake_user"] = copy
+    try:
+        instrument.enable()
+        assert hooked.work is not work and copy.work is hooked.work
+        assert hooked.work(3) == 6 and copy.work(4) == 8
+        with pytest.raises(RuntimeError):
+            hooked.Engine().step()
+        snapshot = instrument.snapshot()
+        assert snapshot["stages"]["fake.work"]["count"] == 2
+        assert snapshot["stages"]["fake.step"]["count"] == 1
+        assert snapshot["counters"] == {"fake.step.errors": 1}
+
+        instrument.disable()
+        assert hooked.work is work and copy.work is work and hooked.Engine.step is step
+        assert instrument._finder not in sys.meta_path
+    finally:
+        del sys.modules["fake_user"]
+
+
+def test_enable_twice_does_not_wrap_twice(hooked):
+    instrument.enable()
+    instrument.enable()
+    hooked.work(1)
+    assert instrument.snapshot()["stages"]["fake.work"]["count"] == 1
+
+
+def test_modules_imported_after_enable_are_patched(monkeypatch, tmp_path):
+    (tmp_path / "late_hooked.py").write_text("def work(x):\n    return x + 1\n")
+    monkeypatch.setattr(instrument, "HOOKS", [("late_hooked", "work", "late.work")])
+    monkeypatch.syspath_prepend(str(tmp_path))
+    instrument.enable()
+    try:
+        import late_hooked
+        assert late_hooked.work(1) == 2
+        assert hasattr(late_hooked.work, "__instrumented__")
+        assert instrument.snapshot()["stages"]["late.work"]["count"] == 1
+        instrument.disable()
+        assert not hasattr(late_hooked.work, "__instrumented__")
+    finally:
+        sys.modules.pop("late_hooked", None)
+
+
+def test_nothing_is_recorded_while_disabled(hooked):
+    hooked.work(1)
+    assert instrument.snapshot() == {"stages": {}, "counters": {}}
+
+
+def test_timer_records_the_block_and_its_errors():
+    with instrument.timer("block"):
+        pass
+    with pytest.raises(KeyError):
+        with instrument.timer("block"):
+            raise KeyError
+    snapshot = instrument.snapshot()
+    assert snapshot["stages"]["block"]["count"] == 2 and snapshot["counters"] == {"block.errors": 1}